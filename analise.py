@@ -0,0 +1,333 @@
+"""Análise vetorizada dos movimentos de muitos processos.
+
+Os documentos (saída NDJSON do modo lote, exportações JSONL ou resultados
+da API em Python) são achatados uma única vez em duas tabelas colunares de
+arrays NumPy: uma linha por processo e uma por movimento, ligadas pela
+posição do processo. Tempo até o julgamento, intervalos entre movimentos,
+percentis e contagens por tribunal, classe ou órgão julgador são calculados
+sobre os arrays inteiros, sem laços por processo. As tabelas podem ser
+gravadas em CSV ou Parquet (este com pyarrow).
+
+NumPy é opcional: pip install "judinfo-cli[analise]".
+"""
+import csv
+from datetime import timezone
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Sequence, TextIO, Union
+
+try:
+    import numpy as np
+except ImportError:  # Opcional: só a análise precisa dele
+    np = None  # type: ignore[assignment]
+
+if TYPE_CHECKING:
+    import numpy.typing as npt
+
+from lote import ler_documentos
+from modelo import Processo, converter_data
+
+# Movimentos da TPU (CNJ) que marcam o julgamento: 193 (Julgamento) e os
+# mais comuns abaixo dele (procedência, improcedência, procedência em parte)
+CODIGOS_JULGAMENTO = (193, 219, 220, 221)
+
+PERCENTIS = (50, 90, 95)
+AGRUPAMENTOS = ('tribunal', 'classe', 'orgao_julgador', 'grau')
+FORMATOS = ('csv', 'parquet')
+
+# Colunas das tabelas (textos como object, datas como datetime64[ms])
+Colunas = Dict[str, 'npt.NDArray[Any]']
+
+MS_POR_DIA = 24 * 60 * 60 * 1000
+# Marca de "sem movimento" nas reduções por processo (maior que qualquer data)
+_SEM_DATA = 2 ** 63 - 1
+
+
+def _exigir_numpy():
+    if np is None:
+        raise ImportError('A análise requer NumPy: pip install "judinfo-cli[analise]"')
+
+
+def _nome(valor: Any) -> str:
+    return (valor.get('nome') or '') if isinstance(valor, dict) else ''
+
+
+def _codigo(movimento: Dict[str, Any]) -> int:
+    """Código TPU do movimento; -1 se ausente ou não inteiro."""
+    codigo = movimento.get('codigo')
+    return codigo if isinstance(codigo, int) else -1
+
+
+def _iso(texto: Any) -> str:
+    """Data da API no formato do datetime64 (UTC, sem fuso); 'NaT' se ausente."""
+    if not texto or not isinstance(texto, str):
+        return 'NaT'
+    if texto.endswith('Z'):
+        return texto[:-1]
+    # Alguns tribunais enviam AAAAMMDDhhmmss
+    if len(texto) == 14 and texto.isdigit():
+        return f"{texto[:4]}-{texto[4:6]}-{texto[6:8]}T{texto[8:10]}:{texto[10:12]}:{texto[12:]}"
+    if len(texto) > 19 and texto[-6] in '+-':
+        data = converter_data(texto)
+        return data.astimezone(timezone.utc).replace(tzinfo=None).isoformat() if data else 'NaT'
+    return texto
+
+
+def _datas(textos: List[str]) -> 'npt.NDArray[np.datetime64]':
+    try:
+        return np.array(textos, dtype='datetime64[ms]')
+    except ValueError:
+        # Algum valor fora do padrão: converte um a um, com NaT nos inválidos
+        def converter(texto):
+            try:
+                return np.datetime64(texto, 'ms')
+            except ValueError:
+                return np.datetime64('NaT', 'ms')
+        return np.array([converter(t) for t in textos], dtype='datetime64[ms]')
+
+
+def _percentis(valores: 'npt.NDArray[np.float64]') -> Dict[str, Optional[float]]:
+    """Quantidade, média e percentis (em dias) dos valores não nulos."""
+    valores = valores[~np.isnan(valores)]
+    resumo: Dict[str, Any] = {'quantidade': int(valores.size)}
+    if not valores.size:
+        return {**resumo, 'media': None, **{f"p{p}": None for p in PERCENTIS}, 'maximo': None}
+    resumo['media'] = float(valores.mean())
+    resumo.update((f"p{p}", float(v)) for p, v in zip(PERCENTIS, np.percentile(valores, PERCENTIS)))
+    resumo['maximo'] = float(valores.max())
+    return resumo
+
+
+def _percentis_por_grupo(grupos: 'npt.NDArray[np.intp]', valores: 'npt.NDArray[np.float64]', total: int) -> Colunas:
+    """Média e percentis de `valores` para cada grupo, de uma vez só.
+
+    Ordena por (grupo, valor) e interpola dentro de cada faixa, como o
+    método linear de `np.percentile`.
+    """
+    validos = ~np.isnan(valores)
+    grupos, valores = grupos[validos], valores[validos]
+    contagem = np.bincount(grupos, minlength=total)
+    resultado: Colunas = {'quantidade': contagem}
+    with np.errstate(invalid='ignore', divide='ignore'):
+        resultado['media'] = np.bincount(grupos, weights=valores, minlength=total) / contagem
+
+    valores = valores[np.lexsort((valores, grupos))]
+    inicio = np.cumsum(contagem) - contagem
+    vazio = contagem == 0
+    for p in PERCENTIS:
+        posicao = np.maximum(contagem - 1, 0) * (p / 100)
+        baixo = np.floor(posicao).astype(np.int64)
+        alto = np.minimum(baixo + 1, np.maximum(contagem - 1, 0))
+        if valores.size:
+            i_baixo = np.where(vazio, 0, inicio + baixo)
+            i_alto = np.where(vazio, 0, inicio + alto)
+            percentil = valores[i_baixo] + (valores[i_alto] - valores[i_baixo]) * (posicao - baixo)
+        else:
+            percentil = np.zeros(total)
+        percentil[vazio] = np.nan
+        resultado[f"p{p}"] = percentil
+    return resultado
+
+
+class TabelaMovimentos:
+    """Processos e movimentos de um lote em colunas (arrays NumPy).
+
+    `processos` tem uma posição por processo; `movimentos`, uma por
+    movimento, com a coluna `processo` indicando a posição do processo.
+    Textos ausentes viram '' e datas ausentes, NaT.
+    """
+
+    def __init__(self, processos: Colunas, movimentos: Colunas):
+        self.processos = processos
+        self.movimentos = movimentos
+
+    @classmethod
+    def de_processos(cls, documentos: Iterable[Union[Dict[str, Any], Processo]]) -> 'TabelaMovimentos':
+        """Achata documentos da API (dicts ou `Processo`) em colunas."""
+        _exigir_numpy()
+        numero: List[str] = []
+        tribunal: List[str] = []
+        grau: List[str] = []
+        classe: List[str] = []
+        orgao: List[str] = []
+        ajuizamento: List[str] = []
+        atualizacao: List[str] = []
+        total: List[int] = []
+        codigos: List[int] = []
+        nomes: List[str] = []
+        datas: List[str] = []
+        for documento in documentos:
+            dados = documento.dados if isinstance(documento, Processo) else documento
+            do_processo = [m for m in dados.get('movimentos') or [] if isinstance(m, dict)]
+            numero.append(dados.get('numeroProcesso') or '')
+            tribunal.append((dados.get('tribunal') or '').lower())
+            grau.append(dados.get('grau') or '')
+            classe.append(_nome(dados.get('classe')))
+            orgao.append(_nome(dados.get('orgaoJulgador')))
+            ajuizamento.append(_iso(dados.get('dataAjuizamento')))
+            atualizacao.append(_iso(dados.get('dataHoraUltimaAtualizacao')))
+            total.append(len(do_processo))
+            codigos.extend(_codigo(m) for m in do_processo)
+            nomes.extend(m.get('nome') or '' for m in do_processo)
+            datas.extend(_iso(m.get('dataHora')) for m in do_processo)
+
+        total_movimentos = np.array(total, dtype=np.int64)
+        processos = {
+            'numero': np.array(numero, dtype=object),
+            'tribunal': np.array(tribunal, dtype=object),
+            'grau': np.array(grau, dtype=object),
+            'classe': np.array(classe, dtype=object),
+            'orgao_julgador': np.array(orgao, dtype=object),
+            'data_ajuizamento': _datas(ajuizamento),
+            'data_atualizacao': _datas(atualizacao),
+            'total_movimentos': total_movimentos,
+        }
+        movimentos = {
+            'processo': np.repeat(np.arange(len(numero), dtype=np.int64), total_movimentos),
+            'codigo': np.array(codigos, dtype=np.int64),
+            'nome': np.array(nomes, dtype=object),
+            'data_hora': _datas(datas),
+        }
+        return cls(processos, movimentos)
+
+    @classmethod
+    def de_arquivo(cls, arquivo: TextIO) -> 'TabelaMovimentos':
+        """Lê um arquivo JSONL (exportação) ou NDJSON do modo lote."""
+        return cls.de_processos(ler_documentos(arquivo))
+
+    def __len__(self) -> int:
+        return len(self.processos['numero'])
+
+    def _primeiro(self, codigos: Sequence[int]) -> 'npt.NDArray[np.int64]':
+        """Data (ms) do primeiro movimento com um dos `codigos` em cada processo."""
+        datas = self.movimentos['data_hora']
+        escolhidos = np.isin(self.movimentos['codigo'], codigos) & ~np.isnat(datas)
+        primeiro = np.full(len(self), _SEM_DATA, dtype=np.int64)
+        np.minimum.at(primeiro, self.movimentos['processo'][escolhidos], datas[escolhidos].astype(np.int64))
+        return primeiro
+
+    def julgados(self, codigos: Sequence[int] = CODIGOS_JULGAMENTO) -> 'npt.NDArray[np.bool_]':
+        """Máscara dos processos com algum movimento de julgamento."""
+        marcados = np.zeros(len(self), dtype=bool)
+        marcados[self.movimentos['processo'][np.isin(self.movimentos['codigo'], codigos)]] = True
+        return marcados
+
+    def dias_ate(self, codigos: Sequence[int] = CODIGOS_JULGAMENTO) -> 'npt.NDArray[np.float64]':
+        """Dias do ajuizamento ao primeiro movimento com um dos `codigos` (NaN se não houver)."""
+        primeiro = self._primeiro(codigos)
+        inicio = self.processos['data_ajuizamento']
+        validos = (primeiro != _SEM_DATA) & ~np.isnat(inicio)
+        dias = np.full(len(self), np.nan)
+        dias[validos] = (primeiro[validos] - inicio[validos].astype(np.int64)) / MS_POR_DIA
+        return dias
+
+    def intervalos(self) -> Colunas:
+        """Dias entre movimentos consecutivos (por data) de um mesmo processo.
+
+        Retorna `processo` (posição) e `dias`, um item por par de movimentos.
+        """
+        datas = self.movimentos['data_hora']
+        validos = ~np.isnat(datas)
+        processo = self.movimentos['processo'][validos]
+        instantes = datas[validos].astype(np.int64)
+        ordem = np.lexsort((instantes, processo))
+        processo, instantes = processo[ordem], instantes[ordem]
+        mesmo = processo[1:] == processo[:-1]
+        return {'processo': processo[1:][mesmo], 'dias': (np.diff(instantes)[mesmo]) / MS_POR_DIA}
+
+    def intervalo_medio(self) -> 'npt.NDArray[np.float64]':
+        """Intervalo médio entre movimentos de cada processo, em dias (NaN com menos de dois)."""
+        intervalos = self.intervalos()
+        soma = np.bincount(intervalos['processo'], weights=intervalos['dias'], minlength=len(self))
+        quantidade = np.bincount(intervalos['processo'], minlength=len(self))
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return soma / quantidade
+
+    def agrupar(self, por: str, valores: Optional['npt.ArrayLike'] = None) -> Colunas:
+        """Processos por valor da coluna `por` e, com `valores` (um por processo),
+        média e percentis de cada grupo. Colunas alinhadas, do maior grupo ao menor."""
+        if por not in AGRUPAMENTOS:
+            raise ValueError(f"Agrupamento inválido: {por} (use {', '.join(AGRUPAMENTOS)})")
+        chaves, grupos = np.unique(self.processos[por], return_inverse=True)
+        grupos = grupos.reshape(-1)
+        resultado: Colunas = {'chave': chaves, 'processos': np.bincount(grupos, minlength=len(chaves))}
+        if valores is not None:
+            resultado.update(_percentis_por_grupo(grupos, np.asarray(valores, dtype=float), len(chaves)))
+        ordem = np.argsort(-resultado['processos'], kind='stable')
+        return {nome: coluna[ordem] for nome, coluna in resultado.items()}
+
+    def acervo(self, por: str = 'orgao_julgador', codigos: Sequence[int] = CODIGOS_JULGAMENTO) -> Colunas:
+        """Processos ainda sem julgamento por grupo (o acervo de cada órgão, por padrão)."""
+        pendentes = ~self.julgados(codigos)
+        chaves, grupos = np.unique(self.processos[por][pendentes], return_inverse=True)
+        quantidade = np.bincount(grupos.reshape(-1), minlength=len(chaves))
+        ordem = np.argsort(-quantidade, kind='stable')
+        return {'chave': chaves[ordem], 'pendentes': quantidade[ordem]}
+
+    def relatorio(self, por: str = 'tribunal', codigos: Sequence[int] = CODIGOS_JULGAMENTO, limite: int = 10) -> Dict[str, Any]:
+        """Resumo serializável em JSON: tempos, intervalos, grupos e acervo."""
+        dias = self.dias_ate(codigos)
+        return {
+            'processos': len(self),
+            'movimentos': int(self.movimentos['processo'].size),
+            'dias_ate_julgamento': _percentis(dias),
+            'intervalo_entre_movimentos': _percentis(self.intervalos()['dias']),
+            'por_' + por: _linhas(self.agrupar(por, dias), limite),
+            'acervo_por_orgao': _linhas(self.acervo('orgao_julgador', codigos), limite),
+        }
+
+    def colunas(self, tabela: str = 'processos') -> Colunas:
+        """Colunas de `tabela` para gravação; movimentos ganham número e tribunal."""
+        if tabela == 'processos':
+            return self.processos
+        if tabela != 'movimentos':
+            raise ValueError(f"Tabela inválida: {tabela} (use processos ou movimentos)")
+        posicao = self.movimentos['processo']
+        return {
+            'numero': self.processos['numero'][posicao],
+            'tribunal': self.processos['tribunal'][posicao],
+            **{nome: coluna for nome, coluna in self.movimentos.items() if nome != 'processo'},
+        }
+
+    def gravar(self, caminho: str, tabela: str = 'processos', formato: Optional[str] = None):
+        """Grava a tabela em CSV ou Parquet (formato pela extensão, se omitido)."""
+        formato = formato or ('parquet' if caminho.endswith('.parquet') else 'csv')
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato inválido: {formato} (use {', '.join(FORMATOS)})")
+        colunas = self.colunas(tabela)
+        if formato == 'parquet':
+            _gravar_parquet(caminho, colunas)
+            return
+        textos = []
+        for coluna in colunas.values():
+            if np.issubdtype(coluna.dtype, np.datetime64):
+                # Mesmo formato da API; NaT vira campo vazio
+                datas = np.char.add(np.datetime_as_string(coluna, unit='ms'), 'Z')
+                coluna = np.where(np.isnat(coluna), '', datas)
+            textos.append(coluna.tolist())
+        with open(caminho, 'w', encoding='utf-8', newline='') as arquivo:
+            escritor = csv.writer(arquivo)
+            escritor.writerow(colunas.keys())
+            escritor.writerows(zip(*textos))
+
+
+def _linhas(colunas: Colunas, limite: int) -> List[Dict[str, Any]]:
+    """As primeiras `limite` linhas de um agrupamento, com NaN como None."""
+    def valor(item):
+        if isinstance(item, float) and item != item:
+            return None
+        return item
+    nomes = list(colunas)
+    return [
+        {nome: valor(item) for nome, item in zip(nomes, linha)}
+        for linha in zip(*(colunas[nome][:limite].tolist() for nome in nomes))
+    ]
+
+
+def _gravar_parquet(caminho: str, colunas: Colunas):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError('Gravar Parquet requer pyarrow: pip install "judinfo-cli[parquet]"') from None
+    # from_pandas=True converte NaT e NaN em nulos
+    tabela = pa.table({nome: pa.array(coluna, from_pandas=True) for nome, coluna in colunas.items()})
+    pq.write_table(tabela, caminho)
@@ -0,0 +1,288 @@
+"""Benchmarks do judinfo contra o servidor falso do DataJud, sem acesso à rede.
+
+Mede o tempo de início da CLI, a latência de uma consulta, a varredura de todos os tribunais (`-t all`),
+a vazão de `/search` e `/status` com clientes simultâneos e a memória usada
+por documentos grandes. O resultado é gravado em JSON para comparar commits:
+
+    python -m benchmarks.executar -o bench.json
+    python -m benchmarks.executar -o novo.json --comparar bench.json
+"""
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+import click
+import requests
+
+from benchmarks.servidor_falso import PerfilTribunal, iniciar_em_processo, numero_cnj
+from judinfo_cli import DataJudSimple, get_all_courts
+from resiliencia import LimitadorAdaptativo
+from saude import percentil
+
+VERSAO_FORMATO = 1
+
+# Latência simulada de cada consulta (segundos)
+LATENCIA = 0.02
+# Número presente em todos os índices do servidor falso
+NUMERO = numero_cnj(1)
+
+
+def _cliente(url: str, taxa: float, pool: int = 16) -> DataJudSimple:
+    return DataJudSimple(
+        base_url=url,
+        pool_size=pool,
+        backoff_base=0,
+        limitador=LimitadorAdaptativo(taxa=taxa, rajada=int(taxa) * 2, concorrencia_max=pool),
+    )
+
+
+def _resumo_ms(amostras: List[float]) -> Dict[str, Any]:
+    return {
+        "p50_ms": round((percentil(amostras, 50) or 0.0) * 1000, 3),
+        "p95_ms": round((percentil(amostras, 95) or 0.0) * 1000, 3),
+        "amostras": len(amostras),
+    }
+
+
+def medir_inicializacao(repeticoes: int) -> Dict[str, Any]:
+    """Tempo de processo (Python incluso) de comandos que não acessam a rede."""
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    comandos = {
+        "python_vazio_ms": [sys.executable, '-c', 'pass'],
+        "importar_cli_ms": [sys.executable, '-c', 'import judinfo_cli'],
+        "listar_tribunais_ms": [sys.executable, 'judinfo_cli.py', '-lt'],
+    }
+    resultado: Dict[str, Any] = {}
+    for nome, comando in comandos.items():
+        tempos = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            subprocess.run(comando, cwd=raiz, stdout=subprocess.DEVNULL, check=True)
+            tempos.append(time.perf_counter() - inicio)
+        resultado[nome] = round(statistics.median(tempos) * 1000, 2)
+    return resultado
+
+
+def medir_consulta_unica(taxa: float, repeticoes: int) -> Dict[str, Any]:
+    """Consultas sequenciais a um tribunal; o excedente sobre a latência simulada é o custo do cliente."""
+    url, encerrar = iniciar_em_processo(padrao=PerfilTribunal(latencia=LATENCIA))
+    try:
+        client = _cliente(url, taxa)
+        client.consultar_processo(NUMERO, 'tjsp')  # Abre a conexão antes de medir
+        amostras = []
+        for _ in range(repeticoes):
+            inicio = time.perf_counter()
+            client.consultar_processo(NUMERO, 'tjsp')
+            amostras.append(time.perf_counter() - inicio)
+    finally:
+        encerrar()
+    resultado = _resumo_ms(amostras)
+    resultado["excedente_p50_ms"] = round(resultado["p50_ms"] - LATENCIA * 1000, 3)
+    return resultado
+
+
+def medir_varredura(taxa: float, repeticoes: int) -> Dict[str, Any]:
+    """`-t all`: todos os tribunais com latências variadas, alguns com erros e 429."""
+    tribunais = get_all_courts()
+    perfis = {
+        tribunal: PerfilTribunal(
+            latencia=LATENCIA * (1 + i % 5),
+            variacao=LATENCIA,
+            taxa_erro=0.05 if i % 7 == 0 else 0.0,
+            taxa_429=0.05 if i % 11 == 0 else 0.0,
+        )
+        for i, tribunal in enumerate(tribunais)
+    }
+    url, encerrar = iniciar_em_processo(perfis=perfis)
+    resultado: Dict[str, Any] = {"tribunais": len(tribunais)}
+    try:
+        for concorrencia in (8, 16):
+            tempos = []
+            for _ in range(repeticoes):
+                client = _cliente(url, taxa)
+                inicio = time.perf_counter()
+                client.consultar_em_tribunais(NUMERO, tribunais, concorrencia, parar_no_primeiro=False)
+                tempos.append(time.perf_counter() - inicio)
+                client.close()
+            resultado[f"segundos_c{concorrencia}"] = round(statistics.median(tempos), 4)
+    finally:
+        encerrar()
+    return resultado
+
+
+def _carga(url: str, corpo: Dict[str, Any], clientes: int, requisicoes: int) -> Dict[str, Any]:
+    """`clientes` threads fazendo `requisicoes` POSTs cada; retorna vazão e latência."""
+    def cliente(_):
+        session = requests.Session()
+        latencias = []
+        for _ in range(requisicoes):
+            inicio = time.perf_counter()
+            session.post(url, json=corpo, timeout=60).raise_for_status()
+            latencias.append(time.perf_counter() - inicio)
+        return latencias
+
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clientes) as executor:
+        latencias = [l for parte in executor.map(cliente, range(clientes)) for l in parte]
+    decorrido = time.perf_counter() - inicio
+    resultado = _resumo_ms(latencias)
+    resultado["requisicoes_por_s"] = round(len(latencias) / decorrido, 2)
+    resultado["clientes"] = clientes
+    return resultado
+
+
+def medir_web(taxa: float, clientes: int, requisicoes: int) -> Dict[str, Any]:
+    """Vazão de /search e /status no servidor de desenvolvimento (com threads) do Flask."""
+    from werkzeug.serving import make_server
+
+    import judinfo_web
+
+    url, encerrar = iniciar_em_processo(padrao=PerfilTribunal(latencia=LATENCIA))
+    judinfo_web.client = _cliente(url, taxa)
+    # Sem cache, para medir a consulta; o monitor em segundo plano (desligado sem
+    # JUDINFO_MONITOR_INTERVALO) não compete com a medição e o estado dos tribunais é preenchido antes
+    judinfo_web.monitor.client = judinfo_web.client
+    judinfo_web.client.monitor = judinfo_web.monitor
+    judinfo_web.monitor.verificar()
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    servidor = make_server('127.0.0.1', 0, judinfo_web.app, threaded=True)
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{servidor.server_port}"
+    try:
+        return {
+            "search": _carga(
+                f"{base}/search", {"numero": NUMERO, "tribunais": ["tjsp", "tjmg", "tjrj"]}, clientes, requisicoes
+            ),
+            "status": _carga(f"{base}/status", {"tribunais": get_all_courts()}, clientes, requisicoes),
+        }
+    finally:
+        servidor.shutdown()
+        encerrar()
+
+
+def medir_documento_grande(taxa: float, movimentos: int) -> Dict[str, Any]:
+    """Pico de memória (tracemalloc) e tempo para obter um processo com `movimentos` movimentos."""
+    url, encerrar = iniciar_em_processo(padrao=PerfilTribunal(processos=1, movimentos=movimentos))
+    try:
+        client = _cliente(url, taxa)
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        processo = client.consultar_processo(NUMERO, 'tjsp')
+        decorrido = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        tamanho = len(json.dumps(processo, ensure_ascii=False).encode('utf-8'))
+    finally:
+        encerrar()
+    return {
+        "movimentos": movimentos,
+        "resposta_mib": round(tamanho / 1024 ** 2, 3),
+        "pico_memoria_mib": round(pico / 1024 ** 2, 3),
+        "segundos": round(decorrido, 4),
+    }
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def _valores(resultados: Dict[str, Any], prefixo: str = '') -> Dict[str, float]:
+    """Achata os resultados em {"grupo.metrica": valor} com os valores numéricos."""
+    valores = {}
+    for chave, valor in resultados.items():
+        if isinstance(valor, dict):
+            valores.update(_valores(valor, f"{prefixo}{chave}."))
+        elif isinstance(valor, (int, float)) and not isinstance(valor, bool):
+            valores[prefixo + chave] = float(valor)
+    return valores
+
+
+def comparar(anterior: Dict[str, Any], atual: Dict[str, Any], limiar: float) -> List[Tuple[str, float, float, float, bool]]:
+    """[(métrica, antes, depois, variação, regressão)] das métricas presentes nos dois resultados.
+
+    Métricas de vazão (`_por_s`) regridem quando caem; as demais (tempo, memória) quando sobem.
+    Contagens fixas de configuração (amostras, clientes, etc.) são ignoradas.
+    """
+    ignoradas = ('amostras', 'clientes', 'tribunais', 'movimentos')
+    antes, depois = _valores(anterior['resultados']), _valores(atual['resultados'])
+    linhas = []
+    for nome in sorted(set(antes) & set(depois)):
+        if nome.rsplit('.', 1)[-1] in ignoradas or not antes[nome]:
+            continue
+        variacao = (depois[nome] - antes[nome]) / abs(antes[nome])
+        piora = -variacao if nome.endswith('_por_s') else variacao
+        linhas.append((nome, antes[nome], depois[nome], variacao, piora > limiar))
+    return linhas
+
+
+MEDICOES: Dict[str, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+    'inicializacao': lambda o: medir_inicializacao(o['repeticoes'] * 5),
+    'consulta_unica': lambda o: medir_consulta_unica(o['taxa'], o['repeticoes'] * 10),
+    'varredura_todos': lambda o: medir_varredura(o['taxa'], o['repeticoes']),
+    'web': lambda o: medir_web(o['taxa'], o['clientes'], o['repeticoes'] * 5),
+    'documento_grande': lambda o: medir_documento_grande(o['taxa'], o['movimentos']),
+}
+
+
+@click.command()
+@click.option('-o', '--arquivo-saida', type=click.Path(dir_okay=False), help='Grava os resultados em JSON.')
+@click.option('--comparar', 'base', type=click.Path(exists=True, dir_okay=False),
+              help='Resultado anterior (JSON) para comparar; sai com código 1 se houver regressão.')
+@click.option('--limiar', default=0.2, show_default=True, help='Variação considerada regressão (0.2 = 20%).')
+@click.option('--somente', multiple=True, type=click.Choice(list(MEDICOES)), help='Executa apenas estas medições.')
+@click.option('--repeticoes', default=3, show_default=True, help='Repetições de cada medição.')
+@click.option('--clientes', default=8, show_default=True, help='Clientes simultâneos nos testes do app web.')
+@click.option('--movimentos', default=50000, show_default=True, help='Movimentos do documento grande.')
+@click.option('--taxa', default=1000.0, show_default=True,
+              help='Requisições/s do limitador do cliente (o padrão de produção, 20, dominaria a medição).')
+def main(arquivo_saida, base, limiar, somente, repeticoes, clientes, movimentos, taxa):
+    """Executa os benchmarks contra o servidor falso do DataJud."""
+    opcoes = {'repeticoes': repeticoes, 'clientes': clientes, 'movimentos': movimentos, 'taxa': taxa}
+    resultados = {}
+    for nome in somente or MEDICOES:
+        click.echo(f"⏱️  {nome}...", err=True)
+        resultados[nome] = MEDICOES[nome](opcoes)
+
+    saida = {
+        "versao": VERSAO_FORMATO,
+        "commit": _commit(),
+        "data": datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "parametros": opcoes,
+        "resultados": resultados,
+    }
+    texto = json.dumps(saida, indent=2, ensure_ascii=False)
+    if arquivo_saida:
+        with open(arquivo_saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + '\n')
+    click.echo(texto)
+
+    if base:
+        with open(base, encoding='utf-8') as arquivo:
+            linhas = comparar(json.load(arquivo), saida, limiar)
+        for nome, antes, depois, variacao, regressao in linhas:
+            marca = '❌' if regressao else '  '
+            click.echo(f"{marca} {nome:40} {antes:12.3f} -> {depois:12.3f} ({variacao:+.1%})", err=True)
+        if any(regressao for *_, regressao in linhas):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,267 @@
+"""Servidor local que imita a API pública do DataJud (`/api_publica_<tribunal>/_search`).
+
+Responde às mesmas consultas que o `DataJudSimple` envia (match por número,
+`bool`/`should` de lotes, `match_all` da verificação de status, `filter` com
+`search_after` da exportação e projeção de `_source`). Cada tribunal tem um
+perfil com latência, taxas de erro e de 429 e o tamanho dos documentos,
+incluindo listas enormes de `movimentos`.
+
+Uso avulso:
+
+    python -m benchmarks.servidor_falso --porta 9200 --movimentos 5000
+    JUDINFO_BASE_URL=http://127.0.0.1:9200 judinfo -p NUMERO -t tjsp
+"""
+import json
+import multiprocessing
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import click
+
+from cnj import calcular_digito_verificador, somente_digitos
+
+
+class PerfilTribunal(NamedTuple):
+    """Comportamento simulado de um tribunal."""
+    latencia: float = 0.0      # segundos por resposta
+    variacao: float = 0.0      # desvio (uniforme) somado à latência
+    taxa_erro: float = 0.0     # fração de respostas 500
+    taxa_429: float = 0.0      # fração de respostas 429 (com Retry-After: 0)
+    processos: int = 10        # documentos no índice
+    movimentos: int = 20       # movimentos por documento
+
+
+def numero_cnj(sequencial: int, segmento: str = '8', tribunal: str = '26', ano: int = 2020) -> str:
+    """Número CNJ válido (20 dígitos) para o sequencial dado."""
+    seq, ano_txt, origem = f"{sequencial:07d}", str(ano), '0001'
+    dv = calcular_digito_verificador(seq, ano_txt, segmento, tribunal, origem)
+    return f"{seq}{dv}{ano_txt}{segmento}{tribunal}{origem}"
+
+
+def gerar_processo(numero: str, tribunal: str, movimentos: int, sequencial: int = 0) -> Dict[str, Any]:
+    """Documento no formato do DataJud, com `movimentos` movimentos."""
+    return {
+        "id": f"{tribunal.upper()}_{numero}",
+        "numeroProcesso": numero,
+        "tribunal": tribunal.upper(),
+        "grau": "G1",
+        "@timestamp": f"2024-01-01T00:00:{sequencial % 60:02d}.000Z",
+        "dataAjuizamento": "2020-03-10T00:00:00.000Z",
+        "dataHoraUltimaAtualizacao": "2024-05-01T12:00:00.000Z",
+        "classe": {"codigo": 7, "nome": "Procedimento Comum Cível"},
+        "sistema": {"codigo": 1, "nome": "PJe"},
+        "formato": {"codigo": 1, "nome": "Eletrônico"},
+        "orgaoJulgador": {"codigo": 1234, "nome": "1ª Vara Cível", "codigoMunicipioIBGE": 3550308},
+        "assuntos": [{"codigo": 10433, "nome": "Indenização por Dano Moral"}],
+        "movimentos": [
+            {
+                "codigo": 60 + i % 900,
+                "nome": f"Movimento {i}",
+                "dataHora": f"2021-{1 + i % 12:02d}-{1 + i % 28:02d}T10:00:00.000Z",
+                "complementosTabelados": [{"codigo": 2, "valor": 1, "nome": "complemento", "descricao": "tipo"}],
+            }
+            for i in range(movimentos)
+        ],
+    }
+
+
+def _projetar(valor: Any, caminhos: List[List[str]]) -> Any:
+    """Aplica a projeção de `_source` (campos com ponto, inclusive dentro de listas)."""
+    if isinstance(valor, list):
+        return [_projetar(item, caminhos) for item in valor]
+    if not isinstance(valor, dict):
+        return valor
+    resultado = {}
+    for chave in {caminho[0] for caminho in caminhos}:
+        if chave not in valor:
+            continue
+        restantes = [caminho[1:] for caminho in caminhos if caminho[0] == chave]
+        resultado[chave] = valor[chave] if any(not r for r in restantes) else _projetar(valor[chave], restantes)
+    return resultado
+
+
+def _numeros_da_consulta(consulta: Dict[str, Any]) -> Optional[List[str]]:
+    """Números pedidos na consulta; None quando ela não filtra por número."""
+    if 'match' in consulta:
+        return [somente_digitos(str(consulta['match'].get('numeroProcesso', '')))]
+    booleana = consulta.get('bool') or {}
+    if booleana.get('should'):
+        return [somente_digitos(str(c['match']['numeroProcesso'])) for c in booleana['should'] if 'match' in c]
+    return None
+
+
+class ServidorFalso:
+    """Servidor HTTP falso do DataJud; `iniciar()` sobe em uma thread e retorna a URL."""
+
+    def __init__(
+        self,
+        perfis: Optional[Dict[str, PerfilTribunal]] = None,
+        padrao: PerfilTribunal = PerfilTribunal(),
+        encontrados: Optional[Dict[str, List[str]]] = None,
+        porta: int = 0,
+        semente: int = 0,
+    ):
+        self.perfis = perfis or {}
+        self.padrao = padrao
+        # Números extras presentes em cada tribunal, além dos gerados pelo perfil
+        self.encontrados = encontrados or {}
+        self.porta = porta
+        self.requisicoes = 0
+        self._aleatorio = random.Random(semente)
+        self._indices: Dict[str, List[Dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._servidor: Optional[ThreadingHTTPServer] = None
+
+    def perfil(self, tribunal: str) -> PerfilTribunal:
+        return self.perfis.get(tribunal, self.padrao)
+
+    def indice(self, tribunal: str) -> List[Dict[str, Any]]:
+        """Documentos do tribunal, gerados uma única vez."""
+        with self._lock:
+            documentos = self._indices.get(tribunal)
+            if documentos is None:
+                perfil = self.perfil(tribunal)
+                numeros = [numero_cnj(i + 1) for i in range(perfil.processos)] + self.encontrados.get(tribunal, [])
+                documentos = self._indices[tribunal] = [
+                    gerar_processo(numero, tribunal, perfil.movimentos, i) for i, numero in enumerate(numeros)
+                ]
+            return documentos
+
+    def buscar(self, tribunal: str, corpo: Dict[str, Any]) -> Dict[str, Any]:
+        """Resposta do `_search` para o corpo da requisição."""
+        documentos = self.indice(tribunal)
+        numeros = _numeros_da_consulta(corpo.get('query') or {})
+        if numeros is not None:
+            pedidos = set(numeros)
+            posicoes = [i for i, d in enumerate(documentos) if d['numeroProcesso'] in pedidos]
+        else:
+            posicoes = list(range(len(documentos)))
+        if corpo.get('search_after'):
+            posicoes = [i for i in posicoes if i > corpo['search_after'][-1]]
+        total = len(posicoes)
+        posicoes = posicoes[:corpo.get('size', 10)]
+
+        campos = corpo.get('_source')
+        caminhos = [campo.split('.') for campo in campos] if isinstance(campos, list) else None
+        hits = []
+        for i in posicoes:
+            hit = {
+                "_index": f"api_publica_{tribunal}",
+                "_id": documentos[i]['id'],
+                "_source": _projetar(documentos[i], caminhos) if caminhos else documentos[i],
+            }
+            if 'sort' in corpo:
+                hit["sort"] = [documentos[i]['@timestamp'], i]
+            hits.append(hit)
+        return {"took": 1, "timed_out": False, "hits": {"total": {"value": total, "relation": "eq"}, "hits": hits}}
+
+    def sortear(self, tribunal: str) -> Optional[int]:
+        """Status de falha simulada (500 ou 429), ou None para responder normalmente."""
+        perfil = self.perfil(tribunal)
+        with self._lock:
+            self.requisicoes += 1
+            sorteio = self._aleatorio.random()
+            atraso = perfil.latencia + self._aleatorio.uniform(0, perfil.variacao)
+        if atraso:
+            time.sleep(atraso)
+        if sorteio < perfil.taxa_erro:
+            return 500
+        if sorteio < perfil.taxa_erro + perfil.taxa_429:
+            return 429
+        return None
+
+    def iniciar(self) -> str:
+        servidor_falso = self
+
+        class Manipulador(BaseHTTPRequestHandler):
+            # HTTP/1.1 mantém a conexão aberta, como a API real, para medir o pool do cliente
+            protocol_version = 'HTTP/1.1'
+            # Cabeçalho e corpo saem em escritas separadas; com Nagle, o ACK atrasado
+            # do cliente somaria ~40 ms a cada resposta
+            disable_nagle_algorithm = True
+
+            def do_POST(self):
+                corpo = json.loads(self.rfile.read(int(self.headers.get('Content-Length') or 0)) or b'{}')
+                partes = self.path.strip('/').split('/')
+                if len(partes) != 2 or partes[1] != '_search' or not partes[0].startswith('api_publica_'):
+                    return self._responder(404, {"error": "index_not_found_exception"})
+                tribunal = partes[0][len('api_publica_'):]
+                falha = servidor_falso.sortear(tribunal)
+                if falha:
+                    return self._responder(falha, {"error": "simulado"}, {"Retry-After": "0"} if falha == 429 else None)
+                self._responder(200, servidor_falso.buscar(tribunal, corpo))
+
+            def _responder(self, status, dados, cabecalhos=None):
+                conteudo = json.dumps(dados, ensure_ascii=False).encode('utf-8')
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json; charset=UTF-8')
+                self.send_header('Content-Length', str(len(conteudo)))
+                for nome, valor in (cabecalhos or {}).items():
+                    self.send_header(nome, valor)
+                self.end_headers()
+                self.wfile.write(conteudo)
+
+            def log_message(self, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(('127.0.0.1', self.porta), Manipulador)
+        self._servidor.daemon_threads = True
+        self.porta = self._servidor.server_address[1]
+        threading.Thread(target=self._servidor.serve_forever, name='servidor-falso', daemon=True).start()
+        return self.url
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.porta}"
+
+    def parar(self):
+        if self._servidor:
+            self._servidor.shutdown()
+            self._servidor.server_close()
+            self._servidor = None
+
+
+def _servir(conexao, argumentos):
+    conexao.send(ServidorFalso(**argumentos).iniciar())
+    conexao.recv()  # Bloqueia até o processo pai pedir para encerrar
+
+
+def iniciar_em_processo(**argumentos) -> Tuple[str, Any]:
+    """Sobe o servidor em outro processo, para que ele não dispute o GIL nem a
+    memória medida com o cliente. Retorna (url, encerrar)."""
+    pai, filho = multiprocessing.Pipe()
+    processo = multiprocessing.Process(target=_servir, args=(filho, argumentos), daemon=True)
+    processo.start()
+    url = pai.recv()
+
+    def encerrar():
+        pai.send(None)
+        processo.join(5)
+    return url, encerrar
+
+
+@click.command()
+@click.option('--porta', default=9200, show_default=True, type=int)
+@click.option('--latencia', default=0.05, show_default=True, type=float, help='Latência por resposta, em segundos.')
+@click.option('--taxa-erro', default=0.0, type=float, help='Fração de respostas 500.')
+@click.option('--taxa-429', default=0.0, type=float, help='Fração de respostas 429.')
+@click.option('--processos', default=10, show_default=True, type=int, help='Processos por tribunal.')
+@click.option('--movimentos', default=20, show_default=True, type=int, help='Movimentos por processo.')
+def main(porta, latencia, taxa_erro, taxa_429, processos, movimentos):
+    """Sobe o servidor falso até Ctrl+C."""
+    servidor = ServidorFalso(
+        padrao=PerfilTribunal(latencia, 0.0, taxa_erro, taxa_429, processos, movimentos), porta=porta
+    )
+    click.echo(f"Servidor falso do DataJud em {servidor.iniciar()} (primeiro número: {numero_cnj(1)})")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        servidor.parar()
+
+
+if __name__ == '__main__':
+    main()
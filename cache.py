@@ -0,0 +1,184 @@
+"""Cache local (SQLite) das consultas de processos.
+
+Guarda tanto os processos encontrados quanto os "não encontrado no tribunal X"
+(cache negativo), para que buscas repetidas em todos os tribunais não voltem a
+consultar tribunais onde o processo já se sabe ausente. O banco usa WAL e
+timeout de bloqueio, podendo ser compartilhado por vários workers do gunicorn.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from cnj import somente_digitos
+
+CACHE_PADRAO = os.environ.get(
+    'JUDINFO_CACHE', os.path.join(os.path.expanduser('~'), '.cache', 'judinfo', 'processos.db')
+)
+TTL_PADRAO = 24 * 60 * 60           # processos encontrados: 1 dia
+TTL_NEGATIVO_PADRAO = 6 * 60 * 60   # "não encontrado": 6 horas
+TAMANHO_MAX_PADRAO = 256 * 1024 * 1024  # bytes de documentos JSON armazenados
+
+# Versão do esquema: ao mudar, a tabela antiga é descartada (é apenas cache)
+_VERSAO_ESQUEMA = 3
+
+# O total de bytes fica na tabela `uso`, mantida por gatilhos: conferir o limite
+# a cada gravação não exige somar a tabela, e o valor vale para todas as
+# instâncias e processos que abrem o mesmo banco
+_ESQUEMA = """
+DROP TABLE IF EXISTS processos;
+DROP TABLE IF EXISTS uso;
+CREATE TABLE processos (
+    tribunal TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    projecao TEXT NOT NULL,
+    documento TEXT,
+    tamanho INTEGER NOT NULL,
+    criado_em REAL NOT NULL,
+    acessado_em REAL NOT NULL,
+    PRIMARY KEY (tribunal, numero, projecao)
+);
+CREATE INDEX processos_acessado_em ON processos (acessado_em);
+CREATE TABLE uso (id INTEGER PRIMARY KEY CHECK (id = 0), tamanho INTEGER NOT NULL);
+INSERT INTO uso VALUES (0, 0);
+CREATE TRIGGER processos_inserido AFTER INSERT ON processos BEGIN
+    UPDATE uso SET tamanho = tamanho + NEW.tamanho;
+END;
+CREATE TRIGGER processos_removido AFTER DELETE ON processos BEGIN
+    UPDATE uso SET tamanho = tamanho - OLD.tamanho;
+END;
+"""
+
+# Projeção que representa o documento completo
+COMPLETO = '*'
+
+
+class CacheProcessos:
+    """Cache persistente de resultados, indexado por (tribunal, numero, projeção).
+
+    Um documento completo atende qualquer projeção; um documento parcial só
+    atende a mesma projeção com que foi obtido. Entradas negativas valem para
+    qualquer projeção.
+    """
+
+    def __init__(
+        self,
+        caminho: str = CACHE_PADRAO,
+        ttl: float = TTL_PADRAO,
+        ttl_negativo: float = TTL_NEGATIVO_PADRAO,
+        tamanho_max: int = TAMANHO_MAX_PADRAO,
+    ):
+        self.caminho = caminho
+        self.ttl = ttl
+        self.ttl_negativo = ttl_negativo
+        self.tamanho_max = tamanho_max
+        self._local = threading.local()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (conexões SQLite não são compartilháveis)."""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            # Faz o INSERT OR REPLACE disparar o gatilho de remoção da linha substituída
+            conexao.execute("PRAGMA recursive_triggers=ON")
+            (versao,) = conexao.execute("PRAGMA user_version").fetchone()
+            if versao != _VERSAO_ESQUEMA:
+                conexao.executescript(_ESQUEMA)
+                conexao.execute(f"PRAGMA user_version = {_VERSAO_ESQUEMA}")
+            self._local.conexao = conexao
+        return conexao
+
+    def obter(
+        self, tribunal: str, numero: str, projecao: str = COMPLETO
+    ) -> Optional[Tuple[bool, Optional[Dict[str, Any]]]]:
+        """Retorna (encontrado, processo) se houver entrada válida, ou None."""
+        chave = (tribunal.lower(), somente_digitos(numero) or numero)
+        try:
+            conexao = self._conexao()
+            linhas = conexao.execute(
+                "SELECT projecao, documento, criado_em FROM processos "
+                "WHERE tribunal = ? AND numero = ? AND projecao IN (?, ?)",
+                chave + (projecao, COMPLETO),
+            ).fetchall()
+            agora = time.time()
+            for projecao_salva, documento, criado_em in linhas:
+                ttl = self.ttl if documento is not None else self.ttl_negativo
+                if agora - criado_em <= ttl:
+                    break
+            else:
+                return None
+            conexao.execute(
+                "UPDATE processos SET acessado_em = ? WHERE tribunal = ? AND numero = ? AND projecao = ?",
+                (agora,) + chave + (projecao_salva,),
+            )
+        except sqlite3.Error:
+            # Falhas no cache nunca impedem a consulta à API
+            return None
+        if documento is None:
+            return (False, None)
+        return (True, json.loads(documento))
+
+    def salvar(self, tribunal: str, numero: str, processo: Optional[Dict[str, Any]], projecao: str = COMPLETO):
+        """Grava um processo encontrado, ou a ausência dele quando `processo` é None."""
+        chave = (tribunal.lower(), somente_digitos(numero) or numero)
+        documento = json.dumps(processo, ensure_ascii=False) if processo is not None else None
+        if documento is None:
+            projecao = COMPLETO
+        # Entradas negativas também ocupam espaço: contam pelo tamanho da chave
+        tamanho = len(documento) if documento is not None else len(chave[0]) + len(chave[1])
+        agora = time.time()
+        try:
+            conexao = self._conexao()
+            # Um resultado completo (ou negativo) substitui todas as entradas do
+            # processo; um parcial substitui apenas um "não encontrado" anterior
+            if projecao == COMPLETO:
+                conexao.execute("DELETE FROM processos WHERE tribunal = ? AND numero = ?", chave)
+            else:
+                conexao.execute(
+                    "DELETE FROM processos WHERE tribunal = ? AND numero = ? AND documento IS NULL", chave
+                )
+            conexao.execute(
+                "INSERT OR REPLACE INTO processos VALUES (?, ?, ?, ?, ?, ?, ?)",
+                chave + (projecao, documento, tamanho, agora, agora),
+            )
+            (total,) = conexao.execute("SELECT tamanho FROM uso").fetchone()
+        except sqlite3.Error:
+            return
+        if total > self.tamanho_max:
+            self.remover_excedente()
+
+    def remover_excedente(self):
+        """Remove as entradas menos usadas até o cache caber em `tamanho_max`."""
+        try:
+            conexao = self._conexao()
+            (total,) = conexao.execute("SELECT tamanho FROM uso").fetchone()
+            excedente = total - self.tamanho_max
+            if excedente <= 0:
+                return
+            remover = []
+            for rowid, tamanho in conexao.execute("SELECT rowid, tamanho FROM processos ORDER BY acessado_em"):
+                if excedente <= 0:
+                    break
+                remover.append((rowid,))
+                excedente -= tamanho
+            conexao.executemany("DELETE FROM processos WHERE rowid = ?", remover)
+        except sqlite3.Error:
+            return
+
+    def limpar(self):
+        """Remove todas as entradas do cache."""
+        self._conexao().execute("DELETE FROM processos")
+
+    def fechar(self):
+        """Fecha a conexão da thread atual."""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
@@ -0,0 +1,95 @@
+"""Numeração única de processos do CNJ (Resolução CNJ nº 65/2008).
+
+Formato: NNNNNNN-DD.AAAA.J.TR.OOOO, onde J é o segmento da justiça e TR o
+tribunal. Este módulo valida o dígito verificador (módulo 97) e mapeia J.TR
+para o código do tribunal usado pela API DataJud, evitando varrer todos os
+tribunais quando o próprio número já diz onde o processo tramita.
+"""
+import re
+from typing import Dict, NamedTuple, Tuple
+
+from tribunais import TRIBUNAIS
+
+_PADRAO = re.compile(r'^(\d{7})-?(\d{2})\.?(\d{4})\.?(\d)\.?(\d{2})\.?(\d{4})$')
+
+
+class NumeroInvalido(ValueError):
+    """Número de processo fora do padrão CNJ ou sem tribunal correspondente."""
+
+
+class NumeroCNJ(NamedTuple):
+    sequencial: str
+    digito: str
+    ano: str
+    segmento: str
+    tribunal: str
+    origem: str
+
+    @property
+    def digitos(self) -> str:
+        """Número com 20 dígitos, como armazenado no DataJud."""
+        return ''.join(self)
+
+    @property
+    def formatado(self) -> str:
+        return f"{self.sequencial}-{self.digito}.{self.ano}.{self.segmento}.{self.tribunal}.{self.origem}"
+
+
+def _montar_tabela() -> Dict[Tuple[str, str], str]:
+    """Monta a tabela J.TR -> código de tribunal da API DataJud a partir do catálogo."""
+    tabela = {(t.segmento, t.tr): t.codigo for t in TRIBUNAIS.values()}
+    # Auditorias da Justiça Militar da União (TR = CJM) são atendidas pelo STM
+    for cjm in range(1, 13):
+        tabela[('7', f"{cjm:02d}")] = 'stm'
+    return tabela
+
+
+TABELA_ROTEAMENTO = _montar_tabela()
+
+
+def somente_digitos(numero: str) -> str:
+    """Remove pontuação e espaços do número do processo."""
+    return re.sub(r'\D', '', numero or '')
+
+
+def calcular_digito_verificador(sequencial: str, ano: str, segmento: str, tribunal: str, origem: str) -> str:
+    """Calcula o dígito verificador (DD) pelo algoritmo módulo 97 (ISO 7064)."""
+    resto = int(f"{sequencial}{ano}{segmento}{tribunal}{origem}00") % 97
+    return f"{98 - resto:02d}"
+
+
+def parse_numero_cnj(numero: str) -> NumeroCNJ:
+    """Decompõe e valida um número CNJ, com ou sem pontuação."""
+    texto = (numero or '').strip()
+    if re.fullmatch(r'[\d\s.\-/]+', texto):
+        # Aceita qualquer pontuação, desde que restem os 20 dígitos
+        texto = somente_digitos(texto)
+    partes = _PADRAO.match(texto)
+    if not partes:
+        raise NumeroInvalido(f"Número fora do padrão CNJ (NNNNNNN-DD.AAAA.J.TR.OOOO): {numero}")
+
+    cnj = NumeroCNJ(*partes.groups())
+    esperado = calcular_digito_verificador(cnj.sequencial, cnj.ano, cnj.segmento, cnj.tribunal, cnj.origem)
+    if cnj.digito != esperado:
+        raise NumeroInvalido(f"Dígito verificador inválido em {cnj.formatado} (esperado {esperado})")
+    return cnj
+
+
+def validar_numero_cnj(numero: str) -> bool:
+    """Retorna True se o número segue o padrão CNJ e o dígito confere."""
+    try:
+        parse_numero_cnj(numero)
+    except NumeroInvalido:
+        return False
+    return True
+
+
+def tribunal_por_numero(numero: str) -> str:
+    """Retorna o código do tribunal (ex: tjmg) indicado pelo número CNJ."""
+    cnj = parse_numero_cnj(numero)
+    try:
+        return TABELA_ROTEAMENTO[(cnj.segmento, cnj.tribunal)]
+    except KeyError:
+        raise NumeroInvalido(
+            f"Segmento {cnj.segmento}, tribunal {cnj.tribunal} não corresponde a nenhum tribunal da API DataJud"
+        ) from None
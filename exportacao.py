@@ -0,0 +1,142 @@
+"""Exportação de todos os processos de um tribunal para JSONL ou CSV.
+
+As páginas obtidas com `search_after` são gravadas direto no arquivo, sem
+acumular o resultado em memória. Após cada página, um arquivo de cursor
+registra a posição atual, permitindo retomar uma exportação interrompida.
+"""
+import csv
+import json
+import os
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# Colunas do CSV: caminho do campo no documento -> nome da coluna
+COLUNAS_CSV = [
+    ('numeroProcesso', 'numeroProcesso'),
+    ('tribunal', 'tribunal'),
+    ('grau', 'grau'),
+    ('classe.codigo', 'classe_codigo'),
+    ('classe.nome', 'classe_nome'),
+    ('orgaoJulgador.codigo', 'orgaoJulgador_codigo'),
+    ('orgaoJulgador.nome', 'orgaoJulgador_nome'),
+    ('dataAjuizamento', 'dataAjuizamento'),
+    ('dataHoraUltimaAtualizacao', 'dataHoraUltimaAtualizacao'),
+]
+
+
+def montar_filtros(
+    classe: Optional[int] = None,
+    orgao_julgador: Optional[int] = None,
+    desde: Optional[str] = None,
+    ate: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    """Monta os filtros da busca (código da classe, do órgão julgador e período de ajuizamento)."""
+    filtros = []  # type: List[Dict[str, Any]]
+    if classe is not None:
+        filtros.append({"match": {"classe.codigo": classe}})
+    if orgao_julgador is not None:
+        filtros.append({"match": {"orgaoJulgador.codigo": orgao_julgador}})
+    if desde or ate:
+        periodo = {}
+        if desde:
+            periodo["gte"] = desde
+        if ate:
+            periodo["lte"] = ate
+        filtros.append({"range": {"dataAjuizamento": periodo}})
+    return filtros
+
+
+def _campo(documento: Dict[str, Any], caminho: str) -> Any:
+    valor = documento  # type: Any
+    for parte in caminho.split('.'):
+        if not isinstance(valor, dict):
+            return None
+        valor = valor.get(parte)
+    return valor
+
+
+def linha_csv(documento: Dict[str, Any]) -> List[Any]:
+    """Achata o documento nas colunas de COLUNAS_CSV, mais assuntos e total de movimentos."""
+    linha = [_campo(documento, caminho) for caminho, _ in COLUNAS_CSV]
+    linha.append('; '.join(a.get('nome', '') for a in documento.get('assuntos') or [] if isinstance(a, dict)))
+    linha.append(len(documento.get('movimentos') or []))
+    return linha
+
+
+def cabecalho_csv() -> List[str]:
+    return [coluna for _, coluna in COLUNAS_CSV] + ['assuntos', 'total_movimentos']
+
+
+def ler_cursor(caminho: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(caminho):
+        return None
+    with open(caminho, encoding='utf-8') as arquivo:
+        return json.load(arquivo)
+
+
+def gravar_cursor(caminho: str, cursor: Dict[str, Any]):
+    # Grava em arquivo temporário e renomeia para nunca deixar um cursor pela metade
+    temporario = caminho + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as arquivo:
+        json.dump(cursor, arquivo)
+    os.replace(temporario, caminho)
+
+
+def exportar(
+    client,
+    tribunal: str,
+    destino: str,
+    formato: str = 'jsonl',
+    filtros: Optional[List[Dict[str, Any]]] = None,
+    caminho_cursor: Optional[str] = None,
+    tamanho_pagina: int = 1000,
+    ao_gravar_pagina: Optional[Callable[[int, float], None]] = None,
+) -> Dict[str, Any]:
+    """Exporta os processos do tribunal para `destino`, retomando do cursor se houver.
+
+    `ao_gravar_pagina(total, docs_por_segundo)` é chamado após cada página.
+    Retorna o total exportado, o tempo decorrido e a vazão média.
+    """
+    caminho_cursor = caminho_cursor or destino + '.cursor'
+    filtros = filtros or []
+    cursor = ler_cursor(caminho_cursor)
+    # Cursores antigos não registram o formato: valem para o formato pedido
+    if cursor and (cursor.get('tribunal') != tribunal or cursor.get('filtros') != filtros
+                   or cursor.get('formato', formato) != formato):
+        raise ValueError(f"O cursor {caminho_cursor} pertence a outra exportação; remova-o ou escolha outro destino.")
+
+    retomando = cursor is not None
+    total = cursor['exportados'] if cursor else 0
+    apos = cursor['search_after'] if cursor else None
+    exportados_agora = 0
+    inicio = time.monotonic()
+
+    with open(destino, 'a' if retomando else 'w', encoding='utf-8', newline='') as arquivo:
+        escritor = csv.writer(arquivo) if formato == 'csv' else None
+        if escritor and not retomando:
+            escritor.writerow(cabecalho_csv())
+
+        for documentos, apos in client.exportar_processos(tribunal, filtros, tamanho_pagina, apos):
+            for documento in documentos:
+                if escritor:
+                    escritor.writerow(linha_csv(documento))
+                else:
+                    arquivo.write(json.dumps(documento, ensure_ascii=False) + '\n')
+            arquivo.flush()
+            total += len(documentos)
+            exportados_agora += len(documentos)
+            # O cursor só avança depois que a página está no disco
+            gravar_cursor(caminho_cursor, {
+                "tribunal": tribunal, "filtros": filtros, "formato": formato,
+                "search_after": apos, "exportados": total,
+            })
+            if ao_gravar_pagina:
+                decorrido = time.monotonic() - inicio
+                ao_gravar_pagina(total, exportados_agora / decorrido if decorrido else 0.0)
+
+    decorrido = time.monotonic() - inicio
+    return {
+        "exportados": total,
+        "segundos": decorrido,
+        "docs_por_segundo": exportados_agora / decorrido if decorrido else 0.0,
+    }
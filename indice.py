@@ -0,0 +1,224 @@
+"""Índice local (SQLite FTS5) dos processos já consultados.
+
+Cada processo obtido da API é indexado por classe, assuntos, órgão julgador,
+tribunal e nomes dos movimentos, permitindo encontrá-lo de novo sem acesso à
+rede (ex: "quais processos estão nesta vara" ou "quais têm o assunto X").
+O índice cresce a cada consulta e pode ser refeito a partir de exportações
+JSONL ou saídas NDJSON do modo lote. Ao contrário do cache, não expira.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional, TextIO
+
+from cnj import somente_digitos
+from lote import ler_documentos
+
+INDICE_PADRAO = os.environ.get(
+    'JUDINFO_INDICE', os.path.join(os.path.expanduser('~'), '.cache', 'judinfo', 'indice.db')
+)
+
+# Colunas pesquisáveis: nome da opção -> coluna do FTS
+CAMPOS_BUSCA = {
+    'tribunal': 'tribunal',
+    'classe': 'classe',
+    'assunto': 'assuntos',
+    'orgao': 'orgao_julgador',
+    'movimento': 'movimentos',
+}
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS processos (
+    id INTEGER PRIMARY KEY,
+    tribunal TEXT NOT NULL,
+    numero TEXT NOT NULL,
+    grau TEXT NOT NULL,
+    classe TEXT,
+    orgao_julgador TEXT,
+    assuntos TEXT,
+    movimentos TEXT,
+    data_ajuizamento TEXT,
+    atualizado_em TEXT,
+    indexado_em REAL NOT NULL,
+    UNIQUE (tribunal, numero, grau)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS busca USING fts5(
+    tribunal, classe, assuntos, orgao_julgador, movimentos,
+    content='processos', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS processos_ai AFTER INSERT ON processos BEGIN
+    INSERT INTO busca (rowid, tribunal, classe, assuntos, orgao_julgador, movimentos)
+    VALUES (new.id, new.tribunal, new.classe, new.assuntos, new.orgao_julgador, new.movimentos);
+END;
+CREATE TRIGGER IF NOT EXISTS processos_ad AFTER DELETE ON processos BEGIN
+    INSERT INTO busca (busca, rowid, tribunal, classe, assuntos, orgao_julgador, movimentos)
+    VALUES ('delete', old.id, old.tribunal, old.classe, old.assuntos, old.orgao_julgador, old.movimentos);
+END;
+CREATE TRIGGER IF NOT EXISTS processos_au AFTER UPDATE ON processos BEGIN
+    INSERT INTO busca (busca, rowid, tribunal, classe, assuntos, orgao_julgador, movimentos)
+    VALUES ('delete', old.id, old.tribunal, old.classe, old.assuntos, old.orgao_julgador, old.movimentos);
+    INSERT INTO busca (rowid, tribunal, classe, assuntos, orgao_julgador, movimentos)
+    VALUES (new.id, new.tribunal, new.classe, new.assuntos, new.orgao_julgador, new.movimentos);
+END;
+"""
+
+# Campos ausentes no documento (ex: obtido com projeção) preservam o valor já indexado
+_GRAVAR = """
+INSERT INTO processos (tribunal, numero, grau, classe, orgao_julgador, assuntos, movimentos,
+                       data_ajuizamento, atualizado_em, indexado_em)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (tribunal, numero, grau) DO UPDATE SET
+    classe = COALESCE(excluded.classe, classe),
+    orgao_julgador = COALESCE(excluded.orgao_julgador, orgao_julgador),
+    assuntos = COALESCE(excluded.assuntos, assuntos),
+    movimentos = COALESCE(excluded.movimentos, movimentos),
+    data_ajuizamento = COALESCE(excluded.data_ajuizamento, data_ajuizamento),
+    atualizado_em = COALESCE(excluded.atualizado_em, atualizado_em),
+    indexado_em = excluded.indexado_em
+"""
+
+# Separador dos nomes de assuntos e movimentos dentro de uma coluna
+SEPARADOR = ' | '
+
+
+def _nome(valor: Any) -> Optional[str]:
+    return valor.get('nome') if isinstance(valor, dict) else None
+
+
+def _nomes(itens: Any) -> Optional[str]:
+    """Nomes distintos de uma lista de objetos, na ordem em que aparecem; None se ausente."""
+    if itens is None:
+        return None
+    vistos = dict.fromkeys(n for n in (_nome(i) for i in itens) if n)
+    return SEPARADOR.join(vistos)
+
+
+def linha_indice(processo: Dict[str, Any], tribunal: Optional[str] = None) -> Optional[tuple]:
+    """Valores de uma linha do índice para o documento; None se não houver número."""
+    numero = somente_digitos(processo.get('numeroProcesso') or '')
+    tribunal = (tribunal or processo.get('tribunal') or '').lower()
+    if not numero or not tribunal:
+        return None
+    return (
+        tribunal,
+        numero,
+        processo.get('grau') or '',
+        _nome(processo.get('classe')),
+        _nome(processo.get('orgaoJulgador')),
+        _nomes(processo.get('assuntos')),
+        _nomes(processo.get('movimentos')),
+        processo.get('dataAjuizamento'),
+        processo.get('dataHoraUltimaAtualizacao'),
+        time.time(),
+    )
+
+
+def montar_consulta(texto: Optional[str] = None, **campos: Optional[str]) -> str:
+    """Consulta FTS5 a partir de texto livre e filtros por campo (ver CAMPOS_BUSCA).
+
+    Cada palavra vira um prefixo entre aspas (sem operadores do FTS), e todas
+    precisam aparecer: "vara civel" encontra "1ª Vara Cível".
+    """
+    def termos(valor):
+        return ' '.join('"{}"*'.format(p.replace('"', '""')) for p in re.findall(r'\w+', valor))
+
+    partes = [termos(texto)] if texto and termos(texto) else []
+    for campo, valor in campos.items():
+        if valor and termos(valor):
+            partes.append(f"{CAMPOS_BUSCA[campo]} : ({termos(valor)})")
+    return ' AND '.join(partes)
+
+
+class IndiceLocal:
+    """Índice FTS5 dos processos consultados; seguro para uso por várias threads."""
+
+    def __init__(self, caminho: str = INDICE_PADRAO):
+        self.caminho = caminho
+        self._local = threading.local()
+
+    def _conexao(self) -> sqlite3.Connection:
+        """Conexão da thread atual (conexões SQLite não são compartilháveis)."""
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is None:
+            diretorio = os.path.dirname(self.caminho)
+            if diretorio:
+                os.makedirs(diretorio, exist_ok=True)
+            conexao = sqlite3.connect(self.caminho, timeout=30, isolation_level=None)
+            conexao.execute("PRAGMA journal_mode=WAL")
+            conexao.execute("PRAGMA synchronous=NORMAL")
+            conexao.executescript(_ESQUEMA)
+            self._local.conexao = conexao
+        return conexao
+
+    def indexar(self, processo: Dict[str, Any], tribunal: Optional[str] = None):
+        """Inclui ou atualiza o processo no índice; falhas são ignoradas."""
+        linha = linha_indice(processo, tribunal)
+        if linha is None:
+            return
+        try:
+            self._conexao().execute(_GRAVAR, linha)
+        except sqlite3.Error:
+            # Falhas no índice nunca impedem a consulta
+            return
+
+    def indexar_varios(self, processos: Iterable[Dict[str, Any]], tamanho_bloco: int = 1000) -> int:
+        """Indexa muitos processos em transações de `tamanho_bloco`; retorna quantos foram indexados."""
+        conexao = self._conexao()
+        total = 0
+        bloco = []  # type: List[tuple]
+
+        def gravar():
+            conexao.execute("BEGIN")
+            try:
+                conexao.executemany(_GRAVAR, bloco)
+            except BaseException:
+                conexao.execute("ROLLBACK")
+                raise
+            conexao.execute("COMMIT")
+            bloco.clear()
+
+        for processo in processos:
+            linha = linha_indice(processo)
+            if linha is None:
+                continue
+            bloco.append(linha)
+            total += 1
+            if len(bloco) >= tamanho_bloco:
+                gravar()
+        if bloco:
+            gravar()
+        return total
+
+    def reindexar(self, arquivo: TextIO) -> int:
+        """Indexa um arquivo JSONL (exportação) ou NDJSON do modo lote."""
+        return self.indexar_varios(ler_documentos(arquivo))
+
+    def buscar(self, texto: Optional[str] = None, limite: int = 50, **campos: Optional[str]) -> List[Dict[str, Any]]:
+        """Processos que atendem à busca, do mais relevante ao menos relevante."""
+        consulta = montar_consulta(texto, **campos)
+        if not consulta:
+            return []
+        cursor = self._conexao().execute(
+            "SELECT p.tribunal, p.numero, p.grau, p.classe, p.orgao_julgador, p.assuntos, "
+            "p.data_ajuizamento, p.atualizado_em "
+            "FROM busca JOIN processos p ON p.id = busca.rowid "
+            "WHERE busca MATCH ? ORDER BY bm25(busca) LIMIT ?",
+            (consulta, limite),
+        )
+        colunas = [c[0] for c in cursor.description]
+        resultados = [dict(zip(colunas, linha)) for linha in cursor]
+        for resultado in resultados:
+            resultado['assuntos'] = resultado['assuntos'].split(SEPARADOR) if resultado['assuntos'] else []
+        return resultados
+
+    def total(self) -> int:
+        (total,) = self._conexao().execute("SELECT COUNT(*) FROM processos").fetchone()
+        return total
+
+    def fechar(self):
+        conexao = getattr(self._local, 'conexao', None)
+        if conexao is not None:
+            conexao.close()
+            self._local.conexao = None
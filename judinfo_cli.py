@@ -1,61 +1,574 @@
 import click
-import requests
+import importlib.util
 import json
-from typing import Optional, Dict, Any
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FuturesTimeout
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, Callable, Iterator, Union
 
 # Importa a chave de API do novo arquivo de configuração
 from config import API_KEY
+from cnj import NumeroInvalido, parse_numero_cnj, somente_digitos, tribunal_por_numero
+from tribunais import CODIGOS, POR_CATEGORIA, TRIBUNAIS
+from modelo import Processo, converter_data
+from cache import COMPLETO, CacheProcessos
+from indice import IndiceLocal
+from saude import JANELA_AMOSTRAS, MonitorTribunais, percentil
+from metricas import metricas
+from situacoes import ENCONTRADO, ERRO, IGNORADO, NAO_ENCONTRADO
+from resiliencia import (
+    STATUS_REPETIVEIS,
+    STATUS_SOBRECARGA,
+    LimitadorAdaptativo,
+    espera_backoff,
+    espera_retry_after,
+)
+
+def _importar_sob_demanda(nome: str):
+    """Importa o módulo só no primeiro acesso a um atributo.
+
+    A pilha HTTP (requests, urllib3, certifi...) é a maior parte do tempo de
+    início da CLI; comandos que não acessam a rede, como `-lt`, não a carregam.
+    """
+    if nome in sys.modules:
+        return sys.modules[nome]
+    spec = importlib.util.find_spec(nome)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Módulo não encontrado: {nome}", name=nome)
+    carregador = importlib.util.LazyLoader(spec.loader)
+    spec.loader = carregador
+    modulo = importlib.util.module_from_spec(spec)
+    sys.modules[nome] = modulo
+    carregador.exec_module(modulo)
+    return modulo
+
+if TYPE_CHECKING:
+    import requests
+else:
+    requests = _importar_sob_demanda('requests')
+
+# Número padrão de consultas simultâneas na busca em vários tribunais
+CONCORRENCIA_PADRAO = 8
+
+# Conexões mantidas abertas (keep-alive) com a API, compartilhadas entre threads
+POOL_PADRAO = 16
+
+# Timeouts em segundos: conexão (TCP+TLS) e leitura da resposta
+TIMEOUT_CONEXAO = 5
+TIMEOUT_LEITURA = 30
+TIMEOUT_STATUS = 10
+
+# Tentativas por busca (a primeira + novas tentativas em 429/5xx e falhas de rede)
+TENTATIVAS_PADRAO = 3
+BACKOFF_BASE = 0.5
+
+# Requisições "hedged": amostras mínimas de latência antes de usar o p95 do tribunal
+AMOSTRAS_MIN_HEDGE = 10
+
+# Limite de documentos por busca imposto pelo Elasticsearch (index.max_result_window)
+TAMANHO_MAX_BUSCA = 10000
+
+# Ordenação estável usada na paginação com search_after (o id desempata
+# documentos com o mesmo @timestamp)
+ORDENACAO_EXPORTACAO = [
+    {"@timestamp": {"order": "asc"}},
+    {"id.keyword": {"order": "asc", "unmapped_type": "keyword"}},
+]
+
+# Campos do `_source` que cada formato de saída precisa. O Elasticsearch não
+# fatia listas no `_source`, então `resumo` e `completo` trazem todos os
+# movimentos, mas apenas nome e data de cada um. Só `json` baixa o documento inteiro.
+CAMPOS_RESUMO = [
+    'numeroProcesso', 'tribunal', 'classe.nome', 'dataAjuizamento', 'grau',
+    'sistema.nome', 'formato.nome', 'orgaoJulgador.nome', 'assuntos.nome',
+    'movimentos.nome', 'movimentos.dataHora',
+]
+# Campos de primeiro nível dos documentos do DataJud (raiz de qualquer projeção válida)
+CAMPOS_DATAJUD = frozenset({
+    'id', '@timestamp', 'numeroProcesso', 'tribunal', 'grau', 'nivelSigilo', 'dataAjuizamento',
+    'dataHoraUltimaAtualizacao', 'classe', 'sistema', 'formato', 'orgaoJulgador', 'assuntos', 'movimentos',
+})
+CAMPOS_POR_SAIDA = {
+    'resumo': CAMPOS_RESUMO,
+    'completo': CAMPOS_RESUMO,
+    'json': None,
+}
+
+# Projeção aceita pelo `_source`: lista de campos ou {"includes": [...], "excludes": [...]}
+Projecao = Optional[Union[List[str], Dict[str, List[str]]]]
+
+# Endereço da API; JUDINFO_BASE_URL aponta para outro servidor (ex: o falso de benchmarks/)
+BASE_URL_PADRAO = os.environ.get('JUDINFO_BASE_URL', "https://api-publica.datajud.cnj.jus.br")
+
+class ErroDataJud(RuntimeError):
+    """Falha da API que impede a continuidade de uma operação (ex: exportação)."""
 
 class DataJudSimple:
-    def __init__(self):
+    def __init__(
+        self,
+        pool_size: int = POOL_PADRAO,
+        timeout_conexao: float = TIMEOUT_CONEXAO,
+        timeout_leitura: float = TIMEOUT_LEITURA,
+        timeout_status: float = TIMEOUT_STATUS,
+        cache: Optional[CacheProcessos] = None,
+        atualizar_cache: bool = False,
+        monitor=None,
+        tentativas: int = TENTATIVAS_PADRAO,
+        backoff_base: float = BACKOFF_BASE,
+        limitador: Optional[LimitadorAdaptativo] = None,
+        hedge: bool = False,
+        base_url: str = BASE_URL_PADRAO,
+        indice=None,
+    ):
         # Usa a chave de API importada do arquivo config.py
         self.api_key = API_KEY
-        self.base_url = "https://api-publica.datajud.cnj.jus.br"
+        self.base_url = base_url.rstrip('/')
+        self.timeout = (timeout_conexao, timeout_leitura)
+        self.timeout_status = (timeout_conexao, timeout_status)
+        # O pool de conexões fica no adapter, que é thread-safe e reaproveitado
+        # por todas as sessões; cada thread recebe a sua própria Session.
+        self._adapter = requests.adapters.HTTPAdapter(
+            pool_connections=1, pool_maxsize=pool_size
+        )
+        self._local = threading.local()
+        # Com `atualizar_cache`, o cache é ignorado na leitura mas continua sendo gravado
+        self.cache = cache
+        self.atualizar_cache = atualizar_cache
+        # IndiceLocal opcional: cada processo obtido da API é indexado para busca offline
+        self.indice = indice
+        # MonitorTribunais opcional: recebe o resultado de cada busca e indica
+        # quais tribunais estão com o circuito aberto
+        self.monitor = monitor
+        self.tentativas = max(1, tentativas)
+        self.backoff_base = backoff_base
+        self.limitador = limitador or LimitadorAdaptativo(concorrencia_max=pool_size)
+        # Com `hedge`, uma segunda requisição idêntica é disparada quando a
+        # primeira passa do p95 de latência do tribunal; vale a que chegar antes
+        self.hedge = hedge
+        self._pool_size = pool_size
+        self._executor_hedge: Optional[ThreadPoolExecutor] = None
+        self._latencias: Dict[str, deque] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def session(self) -> 'requests.Session':
+        """Sessão HTTP da thread atual, ligada ao pool compartilhado."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = requests.Session()
+            session.mount('https://', self._adapter)
+            session.mount('http://', self._adapter)
+            session.headers.update({
+                "Authorization": f"APIKey {self.api_key}",
+                "Content-Type": "application/json",
+                "Accept-Encoding": "gzip",
+            })
+            self._local.session = session
+        return session
+
+    def fechar(self):
+        """Encerra o executor das requisições "hedged", a sessão da thread atual, as
+        conexões do pool, o cache e o índice. Um novo uso recria o que for preciso."""
+        with self._lock:
+            executor, self._executor_hedge = self._executor_hedge, None
+        if executor is not None:
+            # Requisições ainda em andamento terminam sozinhas; não há o que esperar
+            executor.shutdown(wait=False)
+        session = getattr(self._local, 'session', None)
+        if session is not None:
+            session.close()
+            self._local.session = None
+        self._adapter.close()
+        if self.cache:
+            self.cache.fechar()
+        if self.indice:
+            self.indice.fechar()
+
+    close = fechar
+
+    def __enter__(self) -> 'DataJudSimple':
+        return self
+
+    def __exit__(self, *_excecao):
+        self.fechar()
+
+    def consultar_processo(self, numero: str, tribunal: str, campos: Projecao = None) -> Optional[Dict[str, Any]]:
+        """Função para consultar processos.
+
+        `campos` restringe o `_source` retornado (ver CAMPOS_POR_SAIDA); sem ele,
+        o documento completo é baixado. Retorna None tanto quando o processo não
+        existe quanto em caso de erro; use `consultar_status` para distingui-los.
+        """
+        return self.consultar_status(numero, tribunal, campos)[1]
+
+    def consultar_status(
+        self, numero: str, tribunal: str, campos: Projecao = None, cancelado: Optional[threading.Event] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Consulta um processo e retorna (situação, processo).
+
+        A situação é ENCONTRADO, NAO_ENCONTRADO ou ERRO (falha de rede ou da API
+        após as novas tentativas). Com `cancelado` sinalizado, as novas tentativas
+        são abandonadas e a consulta termina como ERRO.
+        """
+        projecao = chave_projecao(campos)
+        if self.cache and not self.atualizar_cache:
+            em_cache = self.cache.obter(tribunal, numero, projecao)
+            metricas.incrementar('judinfo_cache_total', resultado='falta' if em_cache is None else 'acerto')
+            if em_cache is not None:
+                return (ENCONTRADO if em_cache[0] else NAO_ENCONTRADO), em_cache[1]
+
+        situacao, processo = self._consultar_api(numero, tribunal, campos, cancelado)
+        # Erros de rede ou da API não são gravados, apenas respostas conclusivas
+        if self.cache and situacao != ERRO:
+            self.cache.salvar(tribunal, numero, processo, projecao)
+        if self.indice and processo:
+            self.indice.indexar(processo, tribunal)
+        return situacao, processo
+
+    def _consultar_api(
+        self, numero: str, tribunal: str, campos: Projecao = None, cancelado: Optional[threading.Event] = None
+    ) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """Consulta a API e retorna (situação, processo)."""
+        corpo = {"query": {"match": {"numeroProcesso": numero}}}  # type: Dict[str, Any]
+        if campos is not None:
+            corpo["_source"] = campos
+        data = self._buscar(tribunal, corpo, cancelado)
+        if data is None:
+            return ERRO, None
+
+        # Se não encontrar resultados, retorna None
+        if data['hits']['total']['value'] == 0:
+            return NAO_ENCONTRADO, None
+
+        # Retorna o primeiro resultado encontrado
+        return ENCONTRADO, data['hits']['hits'][0]['_source']
+
+    def consultar_lote(self, numeros: List[str], tribunal: str) -> Dict[str, Tuple[str, Optional[Dict[str, Any]]]]:
+        """Consulta vários processos de um mesmo tribunal em uma única requisição.
+
+        Retorna {numero: (situação, processo)} para cada número informado.
+        """
+        resultados = {}
+        faltantes = []
+        for numero in numeros:
+            em_cache = self.cache.obter(tribunal, numero) if self.cache and not self.atualizar_cache else None
+            if self.cache and not self.atualizar_cache:
+                metricas.incrementar('judinfo_cache_total', resultado='falta' if em_cache is None else 'acerto')
+            if em_cache is None:
+                faltantes.append(numero)
+            else:
+                resultados[numero] = (ENCONTRADO if em_cache[0] else NAO_ENCONTRADO, em_cache[1])
+
+        if faltantes:
+            for numero, (situacao, processo) in self._consultar_api_lote(faltantes, tribunal).items():
+                resultados[numero] = (situacao, processo)
+                if self.cache and situacao != ERRO:
+                    self.cache.salvar(tribunal, numero, processo)
+                if self.indice and processo:
+                    self.indice.indexar(processo, tribunal)
+        return resultados
+
+    def _consultar_api_lote(self, numeros: List[str], tribunal: str) -> Dict[str, Tuple[str, Optional[Dict[str, Any]]]]:
+        """Uma única busca com um `match` por número, combinados em `should`."""
+        corpo = {
+            "query": {"bool": {"should": [{"match": {"numeroProcesso": numero}} for numero in numeros]}},
+            # Um mesmo número pode ter documentos em mais de um grau
+            "size": min(TAMANHO_MAX_BUSCA, len(numeros) * 10),
+        }
+        data = self._buscar(tribunal, corpo)
+        if data is None:
+            return {numero: (ERRO, None) for numero in numeros}
+
+        # Mantém o primeiro documento de cada número, como em consultar_processo
+        por_numero: Dict[str, Dict[str, Any]] = {}
+        for hit in data['hits']['hits']:
+            chave = somente_digitos(hit['_source'].get('numeroProcesso', ''))
+            por_numero.setdefault(chave, hit['_source'])
+
+        resultados: Dict[str, Tuple[str, Optional[Dict[str, Any]]]] = {}
+        for numero in numeros:
+            processo = por_numero.get(somente_digitos(numero))
+            resultados[numero] = (ENCONTRADO, processo) if processo else (NAO_ENCONTRADO, None)
+        return resultados
+
+    def buscar_atualizados(
+        self, tribunal: str, numeros: List[str], desde: Optional[str] = None
+    ) -> Optional[List[Dict[str, Any]]]:
+        """Documentos dos `numeros` atualizados depois de `desde`, em uma única busca.
+
+        Sem `desde`, retorna todos os documentos dos números. Retorna None em caso de erro.
+        """
+        consulta = {
+            "should": [{"match": {"numeroProcesso": numero}} for numero in numeros],
+            "minimum_should_match": 1,
+        }  # type: Dict[str, Any]
+        if desde:
+            consulta["filter"] = [{"range": {"dataHoraUltimaAtualizacao": {"gt": desde}}}]
+        data = self._buscar(tribunal, {
+            "query": {"bool": consulta},
+            "size": min(TAMANHO_MAX_BUSCA, len(numeros) * 10),
+        })
+        if data is None:
+            return None
+        return [hit['_source'] for hit in data['hits']['hits']]
+
+    def exportar_processos(
+        self,
+        tribunal: str,
+        filtros: Optional[List[Dict[str, Any]]] = None,
+        tamanho_pagina: int = 1000,
+        apos: Optional[List[Any]] = None,
+    ) -> Iterator[Tuple[List[Dict[str, Any]], List[Any]]]:
+        """Percorre todo o índice do tribunal com `search_after`.
+
+        Gera uma página por vez como (documentos, cursor), em que o cursor é o
+        valor de ordenação do último documento; passá-lo em `apos` retoma a
+        exportação da página seguinte. Levanta ErroDataJud se a API falhar.
+        """
+        while True:
+            corpo = {
+                "query": {"bool": {"filter": filtros or []}},
+                "size": tamanho_pagina,
+                "sort": ORDENACAO_EXPORTACAO,
+                "track_total_hits": False,
+            }
+            if apos:
+                corpo["search_after"] = apos
+            data = self._buscar(tribunal, corpo)
+            if data is None:
+                raise ErroDataJud(f"Falha ao exportar {tribunal.upper()} após o cursor {apos}")
 
-    def consultar_processo(self, numero: str, tribunal: str) -> Optional[Dict[str, Any]]:
-        """Função para consultar processos."""
+            hits = data['hits']['hits']
+            if not hits:
+                return
+            apos = hits[-1]['sort']
+            yield [hit['_source'] for hit in hits], apos
+            if len(hits) < tamanho_pagina:
+                return
+
+    def _buscar(
+        self, tribunal: str, corpo: Dict[str, Any], cancelado: Optional[threading.Event] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Executa uma busca no índice do tribunal; retorna None em caso de erro.
+
+        Respostas 429/5xx e falhas de rede são repetidas com backoff exponencial
+        e jitter (respeitando Retry-After), até `tentativas` vezes. Quando
+        `cancelado` é sinalizado, nenhuma nova tentativa é feita e a espera do
+        backoff é interrompida.
+        """
         url = f"{self.base_url}/api_publica_{tribunal}/_search"
-        try:
-            response = requests.post(
-                url,
-                headers={
-                    "Authorization": f"APIKey {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={"query": {"match": {"numeroProcesso": numero}}},
-                timeout=30
-            )
-            
-            if response.status_code != 200:
-                click.echo(f"Erro na API ao consultar {tribunal.upper()}: {response.status_code}", err=True)
+        for tentativa in range(self.tentativas):
+            if cancelado is not None and cancelado.is_set():
                 return None
-            
-            data = response.json()
-            
-            # Se não encontrar resultados, retorna None
-            if data['hits']['total']['value'] == 0:
+            ultima = tentativa + 1 == self.tentativas
+            inicio = time.monotonic()
+            try:
+                response = self._post(tribunal, url, corpo)
+            except requests.exceptions.RequestException as e:
+                if not ultima:
+                    metricas.incrementar('judinfo_novas_tentativas_total', tribunal=tribunal)
+                    if _aguardar(espera_backoff(tentativa, self.backoff_base), cancelado):
+                        return None
+                    continue
+                self._registrar(tribunal, False)
+                metricas.incrementar('judinfo_erros_total', tribunal=tribunal)
+                click.echo(f"Erro de conexão ao consultar {tribunal.upper()}: {e}", err=True)
                 return None
-            
-            # Retorna o primeiro resultado encontrado
-            return data['hits']['hits'][0]['_source']
-            
-        except requests.exceptions.RequestException as e:
-            click.echo(f"Erro de conexão ao consultar {tribunal.upper()}: {e}", err=True)
+
+            if response.status_code == 200:
+                latencia = time.monotonic() - inicio
+                self._registrar(tribunal, True, latencia)
+                if not metricas.ativo:
+                    return response.json()
+                metricas.observar('judinfo_resposta_bytes', len(response.content), tribunal=tribunal)
+                inicio_decodificacao = time.perf_counter()
+                data = response.json()
+                metricas.observar('judinfo_decodificacao_segundos', time.perf_counter() - inicio_decodificacao)
+                return data
+
+            if response.status_code in STATUS_REPETIVEIS and not ultima:
+                metricas.incrementar('judinfo_novas_tentativas_total', tribunal=tribunal)
+                espera = espera_retry_after(response.headers.get('Retry-After'))
+                if _aguardar(espera if espera is not None else espera_backoff(tentativa, self.backoff_base), cancelado):
+                    return None
+                continue
+
+            self._registrar(tribunal, False)
+            metricas.incrementar('judinfo_erros_total', tribunal=tribunal)
+            click.echo(f"Erro na API ao consultar {tribunal.upper()}: {response.status_code}", err=True)
             return None
+        return None
+
+    def _post(self, tribunal: str, url: str, corpo: Dict[str, Any]) -> 'requests.Response':
+        """POST da busca, com requisição "hedged" se habilitada e houver latências suficientes."""
+        atraso = self._atraso_hedge(tribunal) if self.hedge else None
+        if atraso is None:
+            return self._enviar(url, corpo, tribunal=tribunal)
+
+        with self._lock:
+            if self._executor_hedge is None:
+                self._executor_hedge = ThreadPoolExecutor(max_workers=self._pool_size * 2)
+            executor = self._executor_hedge
+        primeira = executor.submit(self._enviar, url, corpo, tribunal=tribunal)
+        try:
+            return primeira.result(timeout=atraso)
+        except FuturesTimeout:
+            pass
+
+        pendentes = {primeira, executor.submit(self._enviar, url, corpo, tribunal=tribunal)}
+        erro: Optional[BaseException] = None
+        while pendentes:
+            prontos, pendentes = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                erro = futuro.exception()
+                if erro is None:
+                    return futuro.result()
+        # As duas requisições falharam: vale o erro da última a terminar
+        if erro is None:
+            raise RuntimeError("Requisição hedged terminou sem resposta nem erro")
+        raise erro
+
+    def _enviar(
+        self, url: str, corpo: Dict[str, Any], timeout: Optional[Tuple[float, float]] = None,
+        tribunal: Optional[str] = None,
+    ) -> 'requests.Response':
+        """Um único POST, respeitando o limitador de taxa e concorrência.
+
+        Nas buscas (com `tribunal`), a espera no limitador e o tempo de rede
+        (envio e download da resposta) são medidos separadamente.
+        """
+        # Rótulo das métricas; None quando não há o que medir
+        rotulo = tribunal if metricas.ativo else None
+        inicio = time.perf_counter()
+        self.limitador.adquirir()
+        sobrecarga = False
+        try:
+            enviado = time.perf_counter()
+            response = self.session.post(url, json=corpo, timeout=timeout or self.timeout)
+            if rotulo is not None:
+                metricas.observar('judinfo_espera_limitador_segundos', enviado - inicio, tribunal=rotulo)
+                metricas.observar('judinfo_requisicao_segundos', time.perf_counter() - enviado, tribunal=rotulo)
+            sobrecarga = response.status_code in STATUS_SOBRECARGA
+            return response
+        finally:
+            self.limitador.liberar(sobrecarga)
+
+    def _atraso_hedge(self, tribunal: str) -> Optional[float]:
+        """p95 das latências recentes do tribunal, ou None sem amostras suficientes."""
+        with self._lock:
+            latencias = list(self._latencias.get(tribunal, ()))
+        if len(latencias) < AMOSTRAS_MIN_HEDGE:
+            return None
+        return percentil(latencias, 95)
+
+    def _registrar(self, tribunal: str, sucesso: bool, latencia: Optional[float] = None):
+        if latencia is not None:
+            with self._lock:
+                self._latencias.setdefault(tribunal, deque(maxlen=JANELA_AMOSTRAS)).append(latencia)
+        if self.monitor:
+            self.monitor.registrar(tribunal, sucesso, latencia)
+
+    def consultar_em_tribunais(
+        self,
+        numero: str,
+        tribunais: List[str],
+        concorrencia: int = CONCORRENCIA_PADRAO,
+        parar_no_primeiro: bool = True,
+        ao_concluir: Optional[Callable[[str], None]] = None,
+        campos: Projecao = None,
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Consulta um processo em vários tribunais em paralelo.
+
+        Retorna os pares (tribunal, processo) encontrados, na ordem de `tribunais`.
+        Com `parar_no_primeiro`, as consultas pendentes são canceladas assim que
+        um tribunal retorna o processo. `ao_concluir` é chamado na thread de quem
+        chamou, uma vez por tribunal concluído (útil para barras de progresso).
+        """
+        encontrados = []
+        for tribunal, _situacao, resultado in self.iterar_tribunais(
+            numero, tribunais, concorrencia, parar_no_primeiro, campos
+        ):
+            if ao_concluir:
+                ao_concluir(tribunal)
+            if resultado:
+                encontrados.append((tribunal, resultado))
+
+        ordem = {tribunal: i for i, tribunal in enumerate(tribunais)}
+        return sorted(encontrados, key=lambda par: ordem[par[0]])
+
+    def iterar_tribunais(
+        self,
+        numero: str,
+        tribunais: List[str],
+        concorrencia: int = CONCORRENCIA_PADRAO,
+        parar_no_primeiro: bool = True,
+        campos: Projecao = None,
+    ) -> Iterator[Tuple[str, str, Optional[Dict[str, Any]]]]:
+        """Gera (tribunal, situação, processo) à medida que cada tribunal responde.
+
+        Com `parar_no_primeiro`, o gerador termina no primeiro acerto. Encerrar o
+        gerador antes do fim (ex: cliente desconectado) cancela as consultas pendentes.
+
+        As consultas rodam em threads daemon: uma requisição já em andamento no
+        momento do cancelamento não faz novas tentativas, e seu resultado é
+        descartado sem segurar o encerramento do processo até o timeout de leitura.
+        """
+        cancelado = threading.Event()
+        fila: queue.Queue[str] = queue.Queue()
+        respostas: queue.Queue[Tuple[str, str, Optional[Dict[str, Any]]]] = queue.Queue()
+        for tribunal in tribunais:
+            fila.put(tribunal)
+
+        def consultar(tribunal):
+            # Tribunais com o circuito aberto são pulados sem esperar o timeout
+            if self.monitor and not self.monitor.disponivel(tribunal):
+                return IGNORADO, None
+            situacao, resultado = self.consultar_status(numero, tribunal, campos, cancelado)
+            if resultado and parar_no_primeiro:
+                cancelado.set()
+            return situacao, resultado
+
+        def trabalhar():
+            # Consultas que ainda não começaram são descartadas após um acerto
+            while not cancelado.is_set():
+                try:
+                    tribunal = fila.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    situacao, resultado = consultar(tribunal)
+                except Exception:
+                    situacao, resultado = ERRO, None  # Erro em um tribunal não interrompe os demais
+                respostas.put((tribunal, situacao, resultado))
+
+        for i in range(min(max(1, concorrencia), len(tribunais))):
+            threading.Thread(target=trabalhar, name=f'judinfo-tribunais-{i}', daemon=True).start()
+        try:
+            for _ in tribunais:
+                tribunal, situacao, resultado = respostas.get()
+                yield tribunal, situacao, resultado
+                if resultado and parar_no_primeiro:
+                    return
+        finally:
+            cancelado.set()
 
     def verificar_tribunal(self, tribunal: str) -> Dict[str, Any]:
-        """Função para verificar o status de um tribunal."""
+        """Função para verificar o status de um tribunal.
+
+        A verificação passa pelo mesmo limitador das buscas.
+        """
         try:
             # A API não tem endpoint próprio: utilizando STJ como referência de status.
             endpoint = tribunal if tribunal != 'api' else 'stj'
-            response = requests.post(
+            response = self._enviar(
                 f"{self.base_url}/api_publica_{endpoint}/_search",
-                headers={
-                    "Authorization": f"APIKey {self.api_key}",
-                    "Content-Type": "application/json"
-                },
-                json={"query": {"match_all": {}}, "size": 1},
-                timeout=10
+                {"query": {"match_all": {}}, "size": 1},
+                timeout=self.timeout_status,
             )
 
             return {
@@ -69,54 +582,45 @@ class DataJudSimple:
                 "error": str(e)
             }
 
+def _aguardar(segundos: float, cancelado: Optional[threading.Event]) -> bool:
+    """Espera entre tentativas; retorna True se a busca foi cancelada nesse intervalo."""
+    if cancelado is None:
+        time.sleep(segundos)
+        return False
+    return cancelado.wait(segundos)
+
+def chave_projecao(campos: Projecao) -> str:
+    """Identifica a projeção no cache; o documento completo é COMPLETO."""
+    if campos is None:
+        return COMPLETO
+    return json.dumps(campos, sort_keys=True)
+
 def get_all_courts():
     """Retorna uma lista de todos os códigos de tribunais suportados."""
-    return [
-        'tst', 'tse', 'stj', 'stm', 'trf1', 'trf2', 'trf3', 'trf4', 'trf5', 'trf6',
-        'tjac', 'tjal', 'tjam', 'tjap', 'tjba', 'tjce', 'tjdft', 'tjes', 'tjgo',
-        'tjma', 'tjmg', 'tjms', 'tjmt', 'tjpa', 'tjpb', 'tjpe', 'tjpi', 'tjpr',
-        'tjrj', 'tjrn', 'tjro', 'tjrr', 'tjrs', 'tjsc', 'tjse', 'tjsp', 'tjto',
-        'trt1', 'trt2', 'trt3', 'trt4', 'trt5', 'trt6', 'trt7', 'trt8', 'trt9',
-        'trt10', 'trt11', 'trt12', 'trt13', 'trt14', 'trt15', 'trt16', 'trt17',
-        'trt18', 'trt19', 'trt20', 'trt21', 'trt22', 'trt23', 'trt24',
-        'tre-ac', 'tre-al', 'tre-am', 'tre-ap', 'tre-ba', 'tre-ce', 'tre-dft',
-        'tre-es', 'tre-go', 'tre-ma', 'tre-mg', 'tre-ms', 'tre-mt', 'tre-pa',
-        'tre-pb', 'tre-pe', 'tre-pi', 'tre-pr', 'tre-rj', 'tre-rn', 'tre-ro',
-        'tre-rr', 'tre-rs', 'tre-sc', 'tre-se', 'tre-sp', 'tre-to',
-        'tjmmg', 'tjmrs', 'tjmsp'
-    ]
+    return list(CODIGOS)
 
 def get_all_courts_categorized():
-    """Retorna uma lista de todos os códigos de tribunais suportados."""
-    return {
-        "STJ": ["stj"],
-        "Tribunais Regionais": sorted([
-            'tst', 'tse', 'stm', 'trf1', 'trf2', 'trf3', 'trf4', 'trf5', 'trf6',
-            'trt1', 'trt2', 'trt3', 'trt4', 'trt5', 'trt6', 'trt7', 'trt8', 'trt9',
-            'trt10', 'trt11', 'trt12', 'trt13', 'trt14', 'trt15', 'trt16', 'trt17',
-            'trt18', 'trt19', 'trt20', 'trt21', 'trt22', 'trt23', 'trt24',
-            'tre-ac', 'tre-al', 'tre-am', 'tre-ap', 'tre-ba', 'tre-ce', 'tre-dft',
-            'tre-es', 'tre-go', 'tre-ma', 'tre-mg', 'tre-ms', 'tre-mt', 'tre-pa',
-            'tre-pb', 'tre-pe', 'tre-pi', 'tre-pr', 'tre-rj', 'tre-rn', 'tre-ro',
-            'tre-rr', 'tre-rs', 'tre-sc', 'tre-se', 'tre-sp', 'tre-to',
-        ]),
-        "Tribunais Estaduais": sorted([
-            'tjac', 'tjal', 'tjam', 'tjap', 'tjba', 'tjce', 'tjdft', 'tjes', 'tjgo',
-            'tjma', 'tjmg', 'tjms', 'tjmt', 'tjpa', 'tjpb', 'tjpe', 'tjpi', 'tjpr',
-            'tjrj', 'tjrn', 'tjro', 'tjrr', 'tjrs', 'tjsc', 'tjse', 'tjsp', 'tjto',
-            'tjmmg', 'tjmrs', 'tjmsp'
-        ])
-    }
-
-@click.command()
+    """Retorna os códigos de tribunais agrupados por categoria."""
+    return {categoria: sorted(codigos) for categoria, codigos in POR_CATEGORIA.items()}
+
+@click.group(invoke_without_command=True)
 @click.option('--processo', '-p', help='Número do processo para consulta.')
-@click.option('--tribunal', '-t', help='Tribunal (ex: tjmg) ou "all" para todos.')
+@click.option('--tribunal', '-t', help='Tribunal (ex: tjmg), "auto" para deduzir pelo número CNJ ou "all" para todos.')
 @click.option('--verificar', '-v', help='Verifica o status da API ou de tribunais. Use "api", um código (tjsp), múltiplos (tjsp,tjrj) ou "all".')
 @click.option('--listar-tribunais', '-lt', is_flag=True, help='Lista todos os códigos de tribunais suportados.')
 @click.option('--saida', '-s', type=click.Choice(['json', 'resumo', 'completo']), default='resumo', help='Formato de saída da consulta.')
+@click.option('--concorrencia', '-c', type=click.IntRange(1, 64), default=CONCORRENCIA_PADRAO, show_default=True, help='Consultas simultâneas na busca em todos os tribunais.')
+@click.option('--lote', '-l', type=click.File('r', encoding='utf-8'), help='Arquivo com um número de processo por linha ("-" para stdin); gera NDJSON.')
+@click.option('--arquivo-saida', '-o', type=click.Path(dir_okay=False, allow_dash=True), default='-', help='Destino do NDJSON no modo --lote (padrão: stdout).')
+@click.option('--checkpoint', type=click.Path(dir_okay=False), help='Arquivo de checkpoint (SQLite) para retomar um --lote interrompido.')
+@click.option('--deduplicar', is_flag=True, help='No modo --lote, consulta cada número uma vez; repetições saem como "duplicado".')
+@click.option('--perfil', is_flag=True, help='Ao final, mostra o tempo gasto em rede, decodificação e exibição.')
+@click.option('--hedge', is_flag=True, help='Repete a requisição quando ela passa do p95 de latência do tribunal; vale a primeira resposta.')
+@click.option('--sem-cache', is_flag=True, help='Não usa o cache local de consultas.')
+@click.option('--atualizar', is_flag=True, help='Ignora o cache e consulta a API novamente, atualizando-o.')
 @click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
 
-def main(processo, tribunal, verificar, listar_tribunais, saida):
+def main(processo, tribunal, verificar, listar_tribunais, saida, concorrencia, lote, arquivo_saida, checkpoint, deduplicar, perfil, hedge, sem_cache, atualizar):
     """
     JudInfo CLI - Consulta processos judiciais brasileiros na API DataJud.
     \b
@@ -127,16 +631,37 @@ def main(processo, tribunal, verificar, listar_tribunais, saida):
       judinfo -v tjsp,tjrj,tjmg            # Verifica múltiplos tribunais
       judinfo -v all                       # Verifica TODOS os tribunais
       judinfo -p <numero> -t tjmg          # Consulta um processo
+      judinfo -p <numero> -t auto          # Consulta o tribunal indicado no número
       judinfo -p <numero> -t all           # Busca processo em TODOS tribunais
+      judinfo -p <numero> -t all -c 16     # Busca com 16 consultas simultâneas
       judinfo -p <numero> -t tjmg -s json  # Consulta com saída em JSON
+      judinfo -p <numero> -t all --atualizar  # Ignora o cache local
+      judinfo -l numeros.txt -o saida.ndjson --checkpoint lote.ckpt  # Consulta em lote
+      judinfo exportar -t tjmg -o tjmg.jsonl  # Exporta todos os processos do TJMG
+      judinfo vigiar carteira.txt --intervalo 300  # Acompanha movimentos novos
+      judinfo indice buscar --orgao "1a vara civel"  # Busca offline nos já consultados
     """
-    
-    client = DataJudSimple()
+    ctx = click.get_current_context()
+    if perfil:
+        metricas.habilitar()
+        inicio = time.perf_counter()
+        ctx.call_on_close(lambda: exibir_perfil(time.perf_counter() - inicio))
+    if ctx.invoked_subcommand:
+        return
 
+    # Antes de criar o cliente: a listagem não precisa da rede nem do cache
     if listar_tribunais:
         exibir_todos_tribunais()
         return
-    
+
+    client = DataJudSimple(
+        cache=None if sem_cache else CacheProcessos(),
+        atualizar_cache=atualizar,
+        hedge=hedge,
+        indice=IndiceLocal(),
+    )
+    ctx.call_on_close(client.fechar)
+
     if verificar:
         if verificar.lower() == 'all':
             verificar_todos_tribunais(client)
@@ -148,154 +673,431 @@ def main(processo, tribunal, verificar, listar_tribunais, saida):
                 click.echo(f"❌ API DataJud - Offline: {resultado.get('error', 'Erro de conexão')}")
         else:
             tribunais_para_verificar = [t.strip() for t in verificar.split(',')]
+            monitor = MonitorTribunais(client, tribunais_para_verificar)
+            monitor.verificar()
             for trib in tribunais_para_verificar:
-                resultado = client.verificar_tribunal(trib)
+                resultado = monitor.situacao(trib)
                 if resultado['success']:
-                    click.echo(f"✅ {trib.upper():<8} - Online")
+                    click.echo(f"✅ {trib.upper():<8} - Online ({resultado['latencia_p50'] * 1000:.0f} ms)")
                 else:
                     click.echo(f"❌ {trib.upper():<8} - Offline: {resultado.get('error', 'Erro de conexão')}")
         return
 
+    if lote:
+        executar_lote(client, lote, tribunal, arquivo_saida, checkpoint, concorrencia, deduplicar)
+        return
+
     if processo and tribunal:
+        if tribunal.lower() == 'auto':
+            # O número CNJ indica o tribunal: valida antes de qualquer requisição
+            try:
+                tribunal = tribunal_por_numero(processo)
+                processo = parse_numero_cnj(processo).digitos
+            except NumeroInvalido as e:
+                raise click.BadParameter(str(e), param_hint="'--processo'")
+            click.echo(f"🧭 Tribunal identificado pelo número: {tribunal.upper()}")
+        elif tribunal.lower() != 'all' and tribunal.lower() not in TRIBUNAIS:
+            raise click.BadParameter(
+                f"Tribunal desconhecido: {tribunal}. Use -lt para ver os códigos.", param_hint="'--tribunal'"
+            )
+
         if tribunal.lower() == 'all':
-            buscar_em_todos_tribunais(client, processo, saida)
+            buscar_em_todos_tribunais(client, processo, saida, concorrencia)
         else:
-            resultado = client.consultar_processo(processo, tribunal)
-            if not resultado:
+            situacao, resultado = client.consultar_status(processo, tribunal, CAMPOS_POR_SAIDA[saida])
+            if situacao == ERRO:
+                click.echo(f"⚠️  Não foi possível consultar o tribunal {tribunal.upper()}; tente novamente mais tarde.")
+            elif not resultado:
                 click.echo(f"❌ Processo não encontrado no tribunal {tribunal.upper()}")
                 click.echo("💡 Verifique se o número está correto ou se há atraso na sincronização dos dados.")
             else:
-                if saida == 'json':
-                    click.echo(json.dumps(resultado, indent=2, ensure_ascii=False))
-                elif saida == 'resumo':
-                    exibir_resumo(resultado)
-                else:
-                    exibir_completo(resultado)
+                exibir_resultado(resultado, saida)
         return
 
-    ctx = click.get_current_context()
     click.echo("Nenhuma opção válida fornecida. Use -h ou --help para ver os comandos.")
     click.echo(ctx.get_help())
 
+@main.command()
+@click.option('--tribunal', '-t', required=True, help='Tribunal a exportar (ex: tjmg).')
+@click.option('--arquivo-saida', '-o', required=True, type=click.Path(dir_okay=False), help='Arquivo de destino.')
+@click.option('--formato', '-f', type=click.Choice(['jsonl', 'csv']), default='jsonl', show_default=True, help='Formato do arquivo.')
+@click.option('--classe', type=int, help='Código da classe processual.')
+@click.option('--orgao-julgador', type=int, help='Código do órgão julgador.')
+@click.option('--desde', help='Data de ajuizamento inicial (AAAA-MM-DD).')
+@click.option('--ate', help='Data de ajuizamento final (AAAA-MM-DD).')
+@click.option('--cursor', type=click.Path(dir_okay=False), help='Arquivo de cursor para retomar (padrão: <arquivo-saida>.cursor).')
+@click.option('--tamanho-pagina', type=click.IntRange(1, TAMANHO_MAX_BUSCA), default=1000, show_default=True, help='Documentos por requisição.')
+@click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
+def exportar(tribunal, arquivo_saida, formato, classe, orgao_julgador, desde, ate, cursor, tamanho_pagina):
+    """Exporta todos os processos de um tribunal, com filtros opcionais.
+
+    A exportação é paginada com search_after e gravada página a página;
+    se interrompida, basta repetir o comando para continuar do cursor.
+    """
+    from exportacao import exportar as exportar_tribunal, montar_filtros
+
+    # Antes de abrir o cursor ou o arquivo de saída
+    if tribunal.lower() not in TRIBUNAIS:
+        raise click.BadParameter(
+            f"Tribunal desconhecido: {tribunal}. Use -lt para ver os códigos.", param_hint="'--tribunal'"
+        )
+
+    def progresso(total, docs_por_segundo):
+        click.echo(f"\r📦 {total} processos exportados ({docs_por_segundo:.0f} docs/s)", nl=False, err=True)
+
+    try:
+        with DataJudSimple() as client:
+            resultado = exportar_tribunal(
+                client, tribunal.lower(), arquivo_saida, formato,
+                filtros=montar_filtros(classe, orgao_julgador, desde, ate),
+                caminho_cursor=cursor, tamanho_pagina=tamanho_pagina, ao_gravar_pagina=progresso,
+            )
+    except (ErroDataJud, ValueError) as e:
+        raise click.ClickException(str(e))
+
+    click.echo(
+        f"\n✅ {resultado['exportados']} processos em {arquivo_saida} "
+        f"({resultado['segundos']:.1f}s, {resultado['docs_por_segundo']:.0f} docs/s)",
+        err=True,
+    )
+
+@main.command()
+@click.argument('carteira', type=click.File('r', encoding='utf-8'), required=False)
+@click.option('--estado', type=click.Path(dir_okay=False), default='vigia.db', show_default=True, help='Banco SQLite com o estado da carteira.')
+@click.option('--intervalo', type=click.FloatRange(min=1), default=300, show_default=True, help='Segundos entre ciclos.')
+@click.option('--ciclos', type=click.IntRange(min=1), help='Número de ciclos (padrão: sem fim).')
+@click.option('--callback', help='URL que recebe cada evento via POST, em vez da saída NDJSON.')
+@click.option('--concorrencia', '-c', type=click.IntRange(1, 64), default=CONCORRENCIA_PADRAO, show_default=True, help='Tribunais consultados simultaneamente.')
+@click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
+def vigiar(carteira, estado, intervalo, ciclos, callback, concorrencia):
+    """Acompanha uma carteira de processos e emite apenas os movimentos novos.
+
+    CARTEIRA é um arquivo com um número por linha, incluído no estado a cada
+    execução. Cada ciclo faz uma busca por tribunal, não uma por processo.
+    """
+    from lote import ler_numeros
+    from vigia import Carteira, emissor_callback, emissor_ndjson, vigiar as vigiar_carteira
+
+    estado_carteira = Carteira(estado)
+    if carteira:
+        for numero in estado_carteira.adicionar(ler_numeros(carteira)):
+            click.echo(f"⚠️  Número inválido ignorado: {numero}", err=True)
+
+    emitir = emissor_callback(callback) if callback else emissor_ndjson(click.get_text_stream('stdout'))
+
+    def ao_concluir_ciclo(ciclo, eventos):
+        click.echo(f"🔄 Ciclo {ciclo}: {eventos} processos com movimentos novos", err=True)
+
+    client = DataJudSimple()
+    try:
+        vigiar_carteira(
+            client, estado_carteira, emitir,
+            intervalo=intervalo, ciclos=ciclos, concorrencia=concorrencia,
+            ao_concluir_ciclo=ao_concluir_ciclo,
+        )
+    except KeyboardInterrupt:
+        click.echo("\n⏹️  Acompanhamento interrompido.", err=True)
+    finally:
+        client.fechar()
+        estado_carteira.fechar()
+
+@main.group()
+@click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
+def indice():
+    """Índice local dos processos já consultados (busca sem acesso à rede)."""
+
+@indice.command('buscar')
+@click.argument('texto', required=False)
+@click.option('--tribunal', '-t', help='Somente deste tribunal (ex: tjmg).')
+@click.option('--classe', help='Palavras da classe processual.')
+@click.option('--assunto', help='Palavras de um assunto.')
+@click.option('--orgao', help='Palavras do órgão julgador.')
+@click.option('--movimento', help='Palavras do nome de um movimento.')
+@click.option('--limite', '-n', type=click.IntRange(1, 10000), default=50, show_default=True, help='Máximo de resultados.')
+@click.option('--saida', '-s', type=click.Choice(['tabela', 'json']), default='tabela', help='Formato de saída.')
+@click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
+def indice_buscar(texto, tribunal, classe, assunto, orgao, movimento, limite, saida):
+    """Busca nos processos indexados; TEXTO procura em todos os campos.
+
+    Cada palavra precisa aparecer (como prefixo, sem diferenciar acentos):
+    "vara civ" encontra "1ª Vara Cível".
+    """
+    filtros = {'tribunal': tribunal, 'classe': classe, 'assunto': assunto, 'orgao': orgao, 'movimento': movimento}
+    if not texto and not any(filtros.values()):
+        raise click.UsageError("Informe um TEXTO ou ao menos um filtro (--orgao, --assunto, ...).")
+
+    inicio = time.perf_counter()
+    resultados = IndiceLocal().buscar(texto, limite=limite, **filtros)
+    decorrido = time.perf_counter() - inicio
+
+    if saida == 'json':
+        click.echo(json.dumps(resultados, indent=2, ensure_ascii=False))
+        return
+    for resultado in resultados:
+        click.echo(
+            f"{resultado['numero']}  {resultado['tribunal'].upper():<8} {resultado['grau']:<4} "
+            f"{resultado['classe'] or 'N/A'} — {resultado['orgao_julgador'] or 'N/A'}"
+        )
+    click.echo(f"\n🔎 {len(resultados)} processos ({decorrido * 1000:.1f} ms)", err=True)
+
+@indice.command('reindexar')
+@click.argument('arquivos', nargs=-1, required=True, type=click.File('r', encoding='utf-8'))
+@click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
+def indice_reindexar(arquivos):
+    """Indexa exportações JSONL (judinfo exportar) ou saídas NDJSON do modo lote."""
+    indice_local = IndiceLocal()
+    for arquivo in arquivos:
+        inicio = time.perf_counter()
+        try:
+            total = indice_local.reindexar(arquivo)
+        except ValueError as e:
+            raise click.ClickException(f"{arquivo.name}: linha inválida ({e})")
+        click.echo(f"✅ {arquivo.name}: {total} processos indexados em {time.perf_counter() - inicio:.1f}s", err=True)
+    click.echo(f"📚 Total no índice: {indice_local.total()} processos", err=True)
+
+@main.command()
+@click.argument('arquivos', nargs=-1, required=True, type=click.File('r', encoding='utf-8'))
+@click.option('--por', type=click.Choice(['tribunal', 'classe', 'orgao_julgador', 'grau']), default='tribunal', show_default=True, help='Agrupamento dos tempos.')
+@click.option('--codigos', default='193,219,220,221', show_default=True, help='Códigos de movimento (TPU) que contam como julgamento.')
+@click.option('--limite', '-n', type=click.IntRange(1, 1000), default=10, show_default=True, help='Grupos exibidos.')
+@click.option('--arquivo-saida', '-o', type=click.Path(dir_okay=False), help='Grava a tabela em CSV ou Parquet (pela extensão).')
+@click.option('--tabela', type=click.Choice(['processos', 'movimentos']), default='processos', show_default=True, help='Tabela gravada com -o.')
+@click.option('--saida', '-s', type=click.Choice(['tabela', 'json']), default='tabela', help='Formato do resumo.')
+@click.help_option('--help', '-h', help='Mostra esta mensagem de ajuda.')
+def analisar(arquivos, por, codigos, limite, arquivo_saida, tabela, saida):
+    """Estatísticas dos movimentos de exportações JSONL ou saídas NDJSON do modo lote.
+
+    Calcula os dias até o julgamento, os intervalos entre movimentos e o
+    acervo sem julgamento por órgão julgador. Requer NumPy (extra "analise").
+    """
+    try:
+        from analise import TabelaMovimentos
+        from lote import ler_documentos
+        codigos_julgamento = [int(c) for c in codigos.split(',') if c.strip()]
+    except ImportError as e:
+        raise click.ClickException(str(e))
+    except ValueError:
+        raise click.BadParameter('use códigos numéricos separados por vírgula.', param_hint="'--codigos'")
+
+    def documentos():
+        for arquivo in arquivos:
+            yield from ler_documentos(arquivo)
+
+    inicio = time.perf_counter()
+    try:
+        colunas = TabelaMovimentos.de_processos(documentos())
+        relatorio = colunas.relatorio(por, codigos_julgamento, limite)
+        if arquivo_saida:
+            colunas.gravar(arquivo_saida, tabela)
+    except ImportError as e:
+        raise click.ClickException(str(e))
+    except ValueError as e:
+        raise click.ClickException(f"arquivo inválido ({e})")
+    decorrido = time.perf_counter() - inicio
+
+    if saida == 'json':
+        click.echo(json.dumps(relatorio, indent=2, ensure_ascii=False))
+    else:
+        exibir_analise(relatorio, por)
+    if arquivo_saida:
+        click.echo(f"💾 Tabela de {tabela} gravada em {arquivo_saida}", err=True)
+    click.echo(f"⏱️  {relatorio['processos']} processos analisados em {decorrido:.1f}s", err=True)
+
+def exibir_analise(relatorio: Dict[str, Any], por: str):
+    def dias(valor):
+        return 'N/A' if valor is None else f"{valor:.0f}"
+
+    def resumo(estatisticas):
+        return (f"média {dias(estatisticas['media'])} · p50 {dias(estatisticas['p50'])} · "
+                f"p90 {dias(estatisticas['p90'])} · p95 {dias(estatisticas['p95'])} dias")
+
+    click.echo(f"📊 {relatorio['processos']} processos, {relatorio['movimentos']} movimentos")
+    julgamento = relatorio['dias_ate_julgamento']
+    click.echo(f"⚖️  Até o julgamento ({julgamento['quantidade']} processos): {resumo(julgamento)}")
+    click.echo(f"⏳ Entre movimentos: {resumo(relatorio['intervalo_entre_movimentos'])}")
+    click.echo(f"\n🏛️  Por {por.replace('_', ' ')} (processos · p50 · p90 até o julgamento):")
+    for grupo in relatorio['por_' + por]:
+        click.echo(f"  {grupo['chave'] or 'N/A':<40} {grupo['processos']:>7} · {dias(grupo['p50']):>5} · {dias(grupo['p90']):>5}")
+    click.echo("\n📚 Acervo sem julgamento por órgão julgador:")
+    for grupo in relatorio['acervo_por_orgao']:
+        click.echo(f"  {grupo['chave'] or 'N/A':<40} {grupo['pendentes']:>7}")
+
+def executar_lote(client, entrada, tribunal, arquivo_saida, checkpoint, concorrencia, deduplicar=False):
+    """Consulta em lote os números de `entrada`, gravando NDJSON em `arquivo_saida`."""
+    from lote import ler_numeros, processar_lote
+
+    tribunal = (tribunal or 'auto').lower()
+    if tribunal == 'all':
+        raise click.BadParameter('no modo --lote use "auto" ou um tribunal específico.', param_hint="'--tribunal'")
+    if tribunal != 'auto' and tribunal not in TRIBUNAIS:
+        raise click.BadParameter(
+            f"Tribunal desconhecido: {tribunal}. Use -lt para ver os códigos.", param_hint="'--tribunal'"
+        )
+
+    # Ao retomar a partir de um checkpoint, a saída anterior é preservada
+    with click.open_file(arquivo_saida, 'a' if checkpoint else 'w', encoding='utf-8') as saida:
+        contagem = processar_lote(
+            client, ler_numeros(entrada), saida,
+            tribunal=tribunal, concorrencia=concorrencia, checkpoint=checkpoint, deduplicar=deduplicar,
+        )
+
+    resumo = ", ".join(f"{situacao}: {total}" for situacao, total in sorted(contagem.items()))
+    click.echo(f"✅ Lote concluído ({sum(contagem.values())} números) - {resumo or 'nada a fazer'}", err=True)
+
 def verificar_todos_tribunais(client):
     """Verifica a conexão com todos os tribunais suportados."""
     todos_tribunais = get_all_courts()
     click.echo(f"Verificando {len(todos_tribunais)} tribunais...")
-    online_count = 0
-    
-    with click.progressbar(todos_tribunais, label="Progresso") as bar:
-        for tribunal in bar:
-            resultado = client.verificar_tribunal(tribunal)
-            if resultado['success']:
-                online_count += 1
-    
+    monitor = MonitorTribunais(client, todos_tribunais)
+
+    with click.progressbar(length=len(todos_tribunais), label="Progresso") as bar:
+        resultados = monitor.verificar(ao_concluir=lambda _tribunal: bar.update(1))
+
+    online_count = sum(1 for resultado in resultados.values() if resultado['success'])
     click.echo(f"\nResultado: {online_count} de {len(todos_tribunais)} tribunais estão online.")
 
 def exibir_todos_tribunais():
     """Exibe TODOS os tribunais suportados pela API."""
-    tribunais = {
-        "Tribunais Superiores": {"tst": "Tribunal Superior do Trabalho", "tse": "Tribunal Superior Eleitoral", "stj": "Superior Tribunal de Justiça", "stm": "Superior Tribunal Militar"},
-        "Justiça Federal": {"trf1": "TRF 1ª Região", "trf2": "TRF 2ª Região", "trf3": "TRF 3ª Região", "trf4": "TRF 4ª Região", "trf5": "TRF 5ª Região", "trf6": "TRF 6ª Região"},
-        "Justiça Estadual": {'tjac': 'TJ Acre', 'tjal': 'TJ Alagoas', 'tjam': 'TJ Amazonas', 'tjap': 'TJ Amapá', 'tjba': 'TJ Bahia', 'tjce': 'TJ Ceará', 'tjdft': 'TJ Distrito Federal', 'tjes': 'TJ Espírito Santo', 'tjgo': 'TJ Goiás', 'tjma': 'TJ Maranhão', 'tjmg': 'TJ Minas Gerais', 'tjms': 'TJ Mato Grosso do Sul', 'tjmt': 'TJ Mato Grosso', 'tjpa': 'TJ Pará', 'tjpb': 'TJ Paraíba', 'tjpe': 'TJ Pernambuco', 'tjpi': 'TJ Piauí', 'tjpr': 'TJ Paraná', 'tjrj': 'TJ Rio de Janeiro', 'tjrn': 'TJ Rio Grande do Norte', 'tjro': 'TJ Rondônia', 'tjrr': 'TJ Roraima', 'tjrs': 'TJ Rio Grande do Sul', 'tjsc': 'TJ Santa Catarina', 'tjse': 'TJ Sergipe', 'tjsp': 'TJ São Paulo', 'tjto': 'TJ Tocantins'},
-        "Justiça do Trabalho": {"trt1": "TRT 1ª Região", "trt2": "TRT 2ª Região", "trt3": "TRT 3ª Região", "trt4": "TRT 4ª Região", "trt5": "TRT 5ª Região", "trt6": "TRT 6ª Região", "trt7": "TRT 7ª Região", "trt8": "TRT 8ª Região", "trt9": "TRT 9ª Região", "trt10": "TRT 10ª Região", "trt11": "TRT 11ª Região", "trt12": "TRT 12ª Região", "trt13": "TRT 13ª Região", "trt14": "TRT 14ª Região", "trt15": "TRT 15ª Região", "trt16": "TRT 16ª Região", "trt17": "TRT 17ª Região", "trt18": "TRT 18ª Região", "trt19": "TRT 19ª Região", "trt20": "TRT 20ª Região", "trt21": "TRT 21ª Região", "trt22": "TRT 22ª Região", "trt23": "TRT 23ª Região", "trt24": "TRT 24ª Região"},
-        "Justiça Eleitoral": {'tre-ac': 'TRE Acre', 'tre-al': 'TRE Alagoas', 'tre-am': 'TRE Amazonas', 'tre-ap': 'TRE Amapá', 'tre-ba': 'TRE Bahia', 'tre-ce': 'TRE Ceará', 'tre-dft': 'TRE Distrito Federal', 'tre-es': 'TRE Espírito Santo', 'tre-go': 'TRE Goiás', 'tre-ma': 'TRE Maranhão', 'tre-mg': 'TRE Minas Gerais', 'tre-ms': 'TRE Mato Grosso do Sul', 'tre-mt': 'TRE Mato Grosso', 'tre-pa': 'TRE Pará', 'tre-pb': 'TRE Paraíba', 'tre-pe': 'TRE Pernambuco', 'tre-pi': 'TRE Piauí', 'tre-pr': 'TRE Paraná', 'tre-rj': 'TRE Rio de Janeiro', 'tre-rn': 'TRE Rio Grande do Norte', 'tre-ro': 'TRE Rondônia', 'tre-rr': 'TRE Roraima', 'tre-rs': 'TRE Rio Grande do Sul', 'tre-sc': 'TRE Santa Catarina', 'tre-se': 'TRE Sergipe', 'tre-sp': 'TRE São Paulo', 'tre-to': 'TRE Tocantins'},
-        "Justiça Militar": {'tjmmg': 'TJM Minas Gerais', 'tjmrs': 'TJM Rio Grande do Sul', 'tjmsp': 'TJM São Paulo'}
-    }
-    
-    total_tribunais = sum(len(lista) for lista in tribunais.values())
-    click.echo(f"🏛️  TOTAL DE {total_tribunais} TRIBUNAIS SUPORTADOS PELA API:\n")
-    
-    for categoria, lista_tribunais in tribunais.items():
-        click.echo(f"📊 {categoria} ({len(lista_tribunais)} tribunais):")
-        sorted_tribunais = sorted(lista_tribunais.items())
-        for codigo, nome in sorted_tribunais:
-            click.echo(f"  {codigo:8} - {nome}")
+    click.echo(f"🏛️  TOTAL DE {len(TRIBUNAIS)} TRIBUNAIS SUPORTADOS PELA API:\n")
+
+    for categoria, codigos in POR_CATEGORIA.items():
+        click.echo(f"📊 {categoria} ({len(codigos)} tribunais):")
+        for codigo in sorted(codigos):
+            click.echo(f"  {codigo:8} - {TRIBUNAIS[codigo].nome}")
         click.echo()
 
-def buscar_em_todos_tribunais(client, processo, saida):
+def buscar_em_todos_tribunais(client, processo, saida, concorrencia=CONCORRENCIA_PADRAO):
     """Busca um processo em TODOS os tribunais suportados."""
     todos_tribunais = get_all_courts()
+    try:
+        # Consulta primeiro o tribunal indicado pelo número, se válido
+        provavel = tribunal_por_numero(processo)
+        todos_tribunais = [provavel] + [t for t in todos_tribunais if t != provavel]
+    except NumeroInvalido:
+        pass
     click.echo(f"🔍 Buscando processo {processo} em {len(todos_tribunais)} tribunais...")
-    click.echo("⏰ Isso pode levar vários minutos...")
+    click.echo(f"⏰ Consultando até {concorrencia} tribunais simultaneamente...")
     click.echo("💡 Pressione Ctrl+C para interromper a busca\n")
-    encontrado = False
-    
-    with click.progressbar(todos_tribunais, label="Progresso da Busca") as bar:
-        for tribunal in bar:
-            try:
-                resultado = client.consultar_processo(processo, tribunal)
+
+    encontrados = []
+    com_erro = []
+    with click.progressbar(length=len(todos_tribunais), label="Progresso da Busca") as bar:
+        try:
+            for trib, situacao, resultado in client.iterar_tribunais(
+                processo, todos_tribunais, concorrencia=concorrencia, campos=CAMPOS_POR_SAIDA[saida]
+            ):
+                bar.update(1)
                 if resultado:
-                    click.echo(f"\n🎯 ENCONTRADO no tribunal: {tribunal.upper()}")
-                    encontrado = True
-                    if saida == 'json':
-                        click.echo(json.dumps(resultado, indent=2, ensure_ascii=False))
-                    elif saida == 'resumo':
-                        exibir_resumo(resultado)
-                    else:
-                        exibir_completo(resultado)
-                    return # Encerra a busca após encontrar o primeiro resultado
-            except KeyboardInterrupt:
-                click.echo(f"\n⏹️  Busca interrompida.")
-                return
-            except Exception:
-                continue # Continua para o próximo tribunal em caso de erro
-    
-    if not encontrado:
-        click.echo(f"\n❌ Processo não encontrado em {len(todos_tribunais)} tribunais testados.")
+                    encontrados.append((trib, resultado))
+                elif situacao in (ERRO, IGNORADO):
+                    com_erro.append(trib)
+        except KeyboardInterrupt:
+            click.echo(f"\n⏹️  Busca interrompida.")
+            return
+
+    if not encontrados:
+        click.echo(f"\n❌ Processo não encontrado em {len(todos_tribunais) - len(com_erro)} tribunais testados.")
+        if com_erro:
+            # Falhas não significam "não encontrado": o processo pode estar nesses tribunais
+            click.echo(f"⚠️  {len(com_erro)} tribunais não puderam ser consultados: {', '.join(t.upper() for t in com_erro)}")
+        return
+
+    # Exibe apenas o primeiro resultado encontrado
+    tribunal, resultado = encontrados[0]
+    click.echo(f"\n🎯 ENCONTRADO no tribunal: {tribunal.upper()}")
+    exibir_resultado(resultado, saida)
+
+def exibir_perfil(total):
+    """Exibe o tempo total da execução dividido entre rede, espera no limitador,
+    decodificação e exibição."""
+    rede, requisicoes = metricas.soma('judinfo_requisicao_segundos')
+    espera, _ = metricas.soma('judinfo_espera_limitador_segundos')
+    decodificacao, _ = metricas.soma('judinfo_decodificacao_segundos')
+    exibicao, _ = metricas.soma('judinfo_renderizacao_segundos')
+    volume, _ = metricas.soma('judinfo_resposta_bytes')
+    acertos = metricas.contador('judinfo_cache_total', resultado='acerto')
+    consultas_cache = metricas.contador('judinfo_cache_total')
 
-def exibir_resumo(processo):
-    """Exibe resumo organizado do processo."""
+    click.echo("\n⏱️  PERFIL DA EXECUÇÃO", err=True)
+    click.echo(f"  Total:          {total * 1000:9.1f} ms", err=True)
+    # Com consultas em paralelo, a soma do tempo de rede pode passar do total
+    click.echo(f"  Rede:           {rede * 1000:9.1f} ms em {requisicoes} requisições ({volume / 1024:.1f} KiB)", err=True)
+    click.echo(f"  Limitador:      {espera * 1000:9.1f} ms de espera", err=True)
+    click.echo(f"  Decodificação:  {decodificacao * 1000:9.1f} ms", err=True)
+    click.echo(f"  Exibição:       {exibicao * 1000:9.1f} ms", err=True)
+    click.echo(f"  Novas tentativas: {metricas.contador('judinfo_novas_tentativas_total'):.0f}"
+               f" | Erros: {metricas.contador('judinfo_erros_total'):.0f}"
+               f" | Cache: {acertos:.0f}/{consultas_cache:.0f} acertos", err=True)
+
+def exibir_resultado(processo, saida):
+    """Exibe o processo no formato de saída escolhido."""
+    if metricas.ativo:
+        inicio = time.perf_counter()
+        _exibir_resultado(processo, saida)
+        metricas.observar('judinfo_renderizacao_segundos', time.perf_counter() - inicio)
+    else:
+        _exibir_resultado(processo, saida)
+
+def _como_processo(processo: Union[Processo, Dict[str, Any]]) -> Processo:
+    """Aceita o `_source` cru (dict) ou um `Processo` já montado."""
+    return processo if isinstance(processo, Processo) else Processo(processo)
+
+def _exibir_resultado(processo, saida):
+    processo = _como_processo(processo)
+    if saida == 'json':
+        click.echo(json.dumps(processo.como_dict(), indent=2, ensure_ascii=False))
+    elif saida == 'resumo':
+        exibir_resumo(processo)
+    else:
+        exibir_completo(processo)
+
+def exibir_resumo(processo: Union[Processo, Dict[str, Any]]):
+    """Exibe resumo organizado do processo (dict da API ou `Processo`)."""
+    processo = _como_processo(processo)
     click.echo("\n" + "="*50)
     click.echo("📄 RESUMO DO PROCESSO")
     click.echo("="*50)
-    click.echo(f"🔢 Número: {processo.get('numeroProcesso', 'N/A')}")
-    click.echo(f"🏛️  Tribunal: {processo.get('tribunal', 'N/A')}")
+    click.echo(f"🔢 Número: {processo.numero or 'N/A'}")
+    click.echo(f"🏛️  Tribunal: {processo.tribunal or 'N/A'}")
     
-    if processo.get('classe'):
-        click.echo(f"📋 Classe: {processo['classe'].get('nome', 'N/A')}")
-    click.echo(f"📅 Data de Ajuizamento: {formatar_data(processo.get('dataAjuizamento'))}")
-    click.echo(f"⚖️  Grau: {processo.get('grau', 'N/A')}")
-    if processo.get('sistema'):
-        click.echo(f"🖥️  Sistema: {processo['sistema'].get('nome', 'N/A')}")
-    if processo.get('formato'):
-        click.echo(f"📁 Formato: {processo['formato'].get('nome', 'N/A')}")
-    if processo.get('orgaoJulgador'):
-        click.echo(f"👨‍⚖️  Órgão Julgador: {processo['orgaoJulgador'].get('nome', 'N/A')}")
-    if processo.get('assuntos'):
-        assuntos = ", ".join([a.get('nome', 'N/A') for a in processo['assuntos']])
-        click.echo(f"🏷️  Assuntos: {assuntos}")
-    movimentos = processo.get('movimentos', [])
-    click.echo(f"🔄 Total de Movimentos: {len(movimentos)}")
-    if movimentos:
-        # Captura movimento mais recente da lista
-        ultimo = movimentos[-1]
-        click.echo(f"📝 Último Movimento: {ultimo.get('nome', 'N/A')}")
-        click.echo(f"⏰ Data: {formatar_data(ultimo.get('dataHora'))}")
+    if processo.dados.get('classe'):
+        click.echo(f"📋 Classe: {processo.classe or 'N/A'}")
+    click.echo(f"📅 Data de Ajuizamento: {formatar_data(processo.dados.get('dataAjuizamento'))}")
+    click.echo(f"⚖️  Grau: {processo.grau or 'N/A'}")
+    if processo.dados.get('sistema'):
+        click.echo(f"🖥️  Sistema: {processo.sistema or 'N/A'}")
+    if processo.dados.get('formato'):
+        click.echo(f"📁 Formato: {processo.formato or 'N/A'}")
+    if processo.dados.get('orgaoJulgador'):
+        click.echo(f"👨‍⚖️  Órgão Julgador: {processo.orgao_julgador or 'N/A'}")
+    if processo.assuntos:
+        click.echo(f"🏷️  Assuntos: {', '.join(processo.assuntos)}")
+    click.echo(f"🔄 Total de Movimentos: {processo.total_movimentos}")
+    ultimo = processo.ultimo_movimento
+    if ultimo:
+        click.echo(f"📝 Último Movimento: {ultimo.nome or 'N/A'}")
+        click.echo(f"⏰ Data: {formatar_data(ultimo.data_hora_texto)}")
     click.echo("="*50)
 
-def exibir_completo(processo):
-    """Exibe versão mais detalhada do processo."""
+def exibir_completo(processo: Union[Processo, Dict[str, Any]]):
+    """Exibe versão mais detalhada do processo (dict da API ou `Processo`)."""
+    processo = _como_processo(processo)
     exibir_resumo(processo)
-    movimentos = processo.get('movimentos', [])
-    if movimentos:
+    ultimos = processo.ultimos_movimentos(5)
+    if ultimos:
         click.echo("\n📋 ÚLTIMOS 5 MOVIMENTOS:")
         click.echo("-" * 40)
-        # Mostra os últimos 5 movimentos, do mais recente ao mais antigo
-        for mov in reversed(movimentos[-5:]):
-            data_formatada = formatar_data(mov.get('dataHora'))
-            click.echo(f"  {data_formatada} - {mov.get('nome', 'N/A')}")
+        # Do mais recente ao mais antigo
+        for mov in ultimos:
+            click.echo(f"  {formatar_data(mov.data_hora_texto)} - {mov.nome or 'N/A'}")
 
 def formatar_data(data_string):
     """Formata data para: DD/MM/AAAA HH:MM."""
     if not data_string:
         return "N/A"
-    try:
-        from datetime import datetime
-        dt = datetime.fromisoformat(data_string.replace('Z', '+00:00'))
-        return dt.strftime("%d/%m/%Y %H:%M")
-    except (ValueError, TypeError):
-        # Se formato inesperado retorna string original
-        return data_string
+    dt = converter_data(data_string)
+    # Se formato inesperado retorna string original
+    return dt.strftime("%d/%m/%Y %H:%M") if dt else data_string
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
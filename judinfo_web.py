@@ -1,45 +1,370 @@
-from flask import Flask, render_template, request, jsonify
-from judinfo_cli import DataJudSimple, get_all_courts_categorized
+import atexit
+import gzip
+import hashlib
+import json
+import os
+import re
+import time
+from functools import lru_cache
 
-app = Flask(__name__)
+from flask import Flask, Response, has_request_context, render_template, request, jsonify, stream_with_context
+from judinfo_cli import CAMPOS_DATAJUD, ERRO, DataJudSimple, get_all_courts, get_all_courts_categorized
+from cnj import NumeroInvalido, somente_digitos, tribunal_por_numero
+from tribunais import TRIBUNAIS
+from cache import CacheProcessos
+from indice import CAMPOS_BUSCA, IndiceLocal
+from saude import INTERVALO_PADRAO, MonitorTribunais
+from metricas import metricas
+from modelo import Processo
+
+try:
+    import brotli
+except ImportError:  # Opcional: sem ele, só gzip
+    brotli = None
+
+# Respostas menores que isto não compensam a compressão
+LIMIAR_COMPRESSAO = 1024
+TIPOS_COMPRESSIVEIS = frozenset({'application/json', 'text/html', 'text/css', 'text/javascript', 'application/javascript'})
+# Arquivos estáticos com ?v=<hash> na URL nunca mudam: podem ficar um ano no cache
+MAX_AGE_ESTATICO = 365 * 24 * 60 * 60
+MAX_AGE_TRIBUNAIS = 24 * 60 * 60
+# Verificação periódica dos tribunais em segundo plano, em segundos; desligada
+# por padrão. Com gunicorn, cada worker tem o seu monitor: ligue-a em um só processo
+MONITOR_INTERVALO = float(os.environ.get('JUDINFO_MONITOR_INTERVALO') or 0)
+# Sem o monitor, /status verifica de novo os resultados mais antigos que isto
+IDADE_MAX_STATUS = MONITOR_INTERVALO or INTERVALO_PADRAO
+# Resultados por busca no índice local (/indice)
+LIMITE_INDICE_PADRAO = 50
+LIMITE_INDICE_MAX = 1000
+
+class FlaskVersionado(Flask):
+    """Arquivos estáticos pedidos com ?v=<hash> (ver `incluir_versao_estatico`) ficam
+    um ano no cache; sem a versão, o navegador revalida como de costume."""
+
+    def get_send_file_max_age(self, filename):
+        if has_request_context() and request.args.get('v'):
+            return MAX_AGE_ESTATICO
+        return super().get_send_file_max_age(filename)
+
+app = FlaskVersionado(__name__)
+
+# Cliente único por processo: as conexões com a API são reaproveitadas entre requisições.
+# O cache em SQLite é compartilhado entre os workers do gunicorn.
+client = DataJudSimple(cache=CacheProcessos(), indice=IndiceLocal())
+
+# Guarda a saúde de cada tribunal; as buscas pulam tribunais com o circuito aberto.
+# /status responde com o último resultado, verificado em segundo plano (se
+# MONITOR_INTERVALO estiver definido) ou sob demanda
+monitor = MonitorTribunais(client, get_all_courts(), intervalo=IDADE_MAX_STATUS)
+client.monitor = monitor
+# atexit executa na ordem inversa: o monitor para antes de o cliente ser fechado
+atexit.register(client.fechar)
+atexit.register(monitor.parar)
+
+@app.before_request
+def iniciar_monitor():
+    # Iniciado na primeira requisição (e não na importação) para funcionar
+    # também com o preload do gunicorn, que cria os workers por fork.
+    # No app web as métricas ficam sempre ligadas e são expostas em /metrics
+    metricas.habilitar()
+    if MONITOR_INTERVALO:
+        monitor.iniciar()
+
+def etag_de(*partes) -> str:
+    return hashlib.sha256(json.dumps(partes, ensure_ascii=False).encode('utf-8')).hexdigest()[:32]
+
+@app.before_request
+def remover_sufixo_etag():
+    # Respostas comprimidas recebem ETag com sufixo (-gzip/-br), como faz o
+    # mod_deflate; ao comparar, vale a ETag da representação sem compressão
+    valor = request.environ.get('HTTP_IF_NONE_MATCH')
+    if valor:
+        request.environ['HTTP_IF_NONE_MATCH'] = re.sub(r'-(?:gzip|br)"', '"', valor)
+
+def codificacao_aceita():
+    """Melhor codificação aceita pelo cliente: 'br' (se brotli estiver instalado), 'gzip' ou None."""
+    if brotli is not None and request.accept_encodings['br']:
+        return 'br'
+    if request.accept_encodings['gzip']:
+        return 'gzip'
+    return None
+
+def comprimir_corpo(dados: bytes, codificacao: str) -> bytes:
+    if codificacao == 'br':
+        return brotli.compress(dados, quality=5)
+    return gzip.compress(dados, compresslevel=6)
+
+def marcar_compressao(response, codificacao: str):
+    """Cabeçalhos de uma resposta comprimida; a ETag ganha o sufixo da codificação."""
+    response.headers['Content-Encoding'] = codificacao
+    # Intervalos (Range) valeriam sobre o corpo sem compressão
+    response.headers.pop('Accept-Ranges', None)
+    etag, fraca = response.get_etag()
+    if etag:
+        response.set_etag(f"{etag}-{codificacao}", fraca)
+
+@app.after_request
+def comprimir(response):
+    """Comprime (brotli ou gzip) respostas de texto acima de LIMIAR_COMPRESSAO."""
+    # Respostas em streaming (NDJSON) seguem sem compressão, para não atrasar as linhas
+    if (response.status_code not in (200, 304) or 'Content-Encoding' in response.headers
+            or response.mimetype not in TIPOS_COMPRESSIVEIS
+            or (response.is_streamed and request.endpoint != 'static')):
+        return response
+    if response.status_code == 304:
+        # A 304 não leva corpo, mas precisa da mesma ETag (com sufixo) e do mesmo
+        # Vary da resposta 200 que ela valida; o Content-Length é o da representação
+        if (response.content_length or 0) >= LIMIAR_COMPRESSAO:
+            response.vary.add('Accept-Encoding')
+            codificacao = codificacao_aceita()
+            if codificacao is not None:
+                marcar_compressao(response, codificacao)
+        return response
+    response.direct_passthrough = False
+    dados = response.get_data()
+    if len(dados) < LIMIAR_COMPRESSAO:
+        return response
+    response.vary.add('Accept-Encoding')
+    codificacao = codificacao_aceita()
+    if codificacao is None:
+        return response
+    response.set_data(comprimir_corpo(dados, codificacao))
+    marcar_compressao(response, codificacao)
+    return response
+
+@lru_cache(maxsize=None)
+def versao_estatico(arquivo: str) -> str:
+    if app.static_folder is None:
+        return ''
+    with open(os.path.join(app.static_folder, arquivo), 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:12]
+
+@app.url_defaults
+def incluir_versao_estatico(endpoint, valores):
+    # url_for('static', ...) ganha ?v=<hash do conteúdo>: uma nova versão muda a URL
+    if endpoint == 'static' and 'filename' in valores:
+        valores.setdefault('v', versao_estatico(valores['filename']))
 
 @app.route('/')
 def index():
     return render_template('index.html')
 
+# O catálogo não muda enquanto o processo roda: serializado e comprimido uma única vez
+_CORPO_TRIBUNAIS = json.dumps(get_all_courts_categorized(), ensure_ascii=False).encode('utf-8')
+_ETAG_TRIBUNAIS = hashlib.sha256(_CORPO_TRIBUNAIS).hexdigest()[:32]
+_TRIBUNAIS_COMPRIMIDOS = {
+    codificacao: comprimir_corpo(_CORPO_TRIBUNAIS, codificacao)
+    for codificacao in (('br', 'gzip') if brotli is not None else ('gzip',))
+}
+
 @app.route('/courts')
 def courts():
-    return jsonify(get_all_courts_categorized())
+    response = Response(_CORPO_TRIBUNAIS, mimetype='application/json')
+    response.set_etag(_ETAG_TRIBUNAIS)
+    response.cache_control.public = True
+    response.cache_control.max_age = MAX_AGE_TRIBUNAIS
+    response.make_conditional(request)
+    if len(_CORPO_TRIBUNAIS) < LIMIAR_COMPRESSAO:
+        return response
+    response.vary.add('Accept-Encoding')
+    codificacao = codificacao_aceita()
+    if codificacao is not None:
+        # Já com Content-Encoding, a resposta não passa de novo por `comprimir`
+        if response.status_code == 200:
+            response.set_data(_TRIBUNAIS_COMPRIMIDOS[codificacao])
+        marcar_compressao(response, codificacao)
+    return response
+
+class RequisicaoInvalida(ValueError):
+    """Parâmetro inválido no corpo da requisição (responde 400)."""
+
+def ler_campos(campos):
+    """Projeção do `_source` pedida pelo cliente: lista de caminhos de campos do DataJud.
+
+    Projeções malformadas fariam todos os tribunais responderem com erro, e
+    esses erros contam para o circuito de cada tribunal.
+    """
+    if campos is None:
+        return None
+    if not isinstance(campos, list) or not campos or not all(isinstance(c, str) for c in campos):
+        raise RequisicaoInvalida('"campos" deve ser uma lista de nomes de campos')
+    desconhecidos = [
+        c for c in campos
+        if c.split('.')[0] not in CAMPOS_DATAJUD or not re.fullmatch(r'[@\w]+(?:\.\w+)*', c)
+    ]
+    if desconhecidos:
+        raise RequisicaoInvalida(f"Campos desconhecidos: {', '.join(desconhecidos)}")
+    return campos
+
+def ler_ultimos(valor):
+    """`ultimos_movimentos` como inteiro não negativo (aceita texto, como na query string)."""
+    if valor is None:
+        return None
+    if isinstance(valor, bool) or not isinstance(valor, (int, str)):
+        raise RequisicaoInvalida('"ultimos_movimentos" deve ser um inteiro não negativo')
+    try:
+        ultimos = int(valor)
+    except ValueError:
+        raise RequisicaoInvalida('"ultimos_movimentos" deve ser um inteiro não negativo') from None
+    if ultimos < 0:
+        raise RequisicaoInvalida('"ultimos_movimentos" deve ser um inteiro não negativo')
+    return ultimos
+
+def ler_limite(valor):
+    """`limite` de /indice: inteiro entre 1 e LIMITE_INDICE_MAX (no SQLite, LIMIT -1
+    significa "sem limite")."""
+    if valor is None:
+        return LIMITE_INDICE_PADRAO
+    try:
+        limite = int(valor)
+    except ValueError:
+        raise RequisicaoInvalida(f'"limite" deve ser um inteiro entre 1 e {LIMITE_INDICE_MAX}') from None
+    if not 1 <= limite <= LIMITE_INDICE_MAX:
+        raise RequisicaoInvalida(f'"limite" deve ser um inteiro entre 1 e {LIMITE_INDICE_MAX}')
+    return limite
+
+def ler_tribunais(tribunais):
+    """Códigos de tribunais do catálogo; nomes desconhecidos são rejeitados para que
+    não criem estado no monitor nem rótulos novos nas métricas."""
+    if not isinstance(tribunais, list) or not all(isinstance(t, str) for t in tribunais):
+        raise RequisicaoInvalida('"tribunais" deve ser uma lista de códigos (ex: ["tjsp"])')
+    codigos = [t.lower() for t in tribunais]
+    desconhecidos = [t for t in codigos if t not in TRIBUNAIS]
+    if desconhecidos:
+        raise RequisicaoInvalida(f"Tribunais desconhecidos: {', '.join(desconhecidos)}")
+    return codigos
+
+def tribunais_da_busca(numero, tribunais):
+    """Tribunais a consultar; sem seleção (ou "auto"), o próprio número CNJ indica onde buscar."""
+    if not tribunais or tribunais == 'auto':
+        return [tribunal_por_numero(numero)]
+    return ler_tribunais(tribunais)
+
+@app.route('/processo/<tribunal>/<numero>')
+def processo(tribunal, numero):
+    """Um processo por GET, com ETag e Last-Modified pela `dataHoraUltimaAtualizacao`.
+
+    Com If-None-Match (ou If-Modified-Since), responde 304 sem corpo se o
+    processo não mudou.
+    """
+    tribunal = tribunal.lower()
+    if tribunal not in TRIBUNAIS:
+        return jsonify({"error": f"Tribunal desconhecido: {tribunal}"}), 404
+    try:
+        ultimos = ler_ultimos(request.args.get('ultimos_movimentos'))
+    except RequisicaoInvalida as e:
+        return jsonify({"error": str(e)}), 400
+
+    situacao, resultado = client.consultar_status(somente_digitos(numero) or numero, tribunal)
+    if situacao == ERRO:
+        return jsonify({"error": f"Não foi possível consultar {tribunal.upper()}"}), 503
+    if not resultado:
+        return jsonify({"error": "Processo não encontrado"}), 404
+
+    documento = Processo(resultado)
+    atualizacao = resultado.get('dataHoraUltimaAtualizacao')
+    # Sem data de atualização, a ETag vem do próprio conteúdo
+    etag = etag_de(tribunal, documento.numero, ultimos, atualizacao or resultado)
+    ultima = documento.data_ultima_atualizacao
+
+    # O corpo é montado mesmo quando a resposta será 304: o tamanho dele decide
+    # se a representação é comprimida, e a 304 precisa da mesma ETag (ver `comprimir`)
+    response = jsonify(documento.como_dict(ultimos))
+    response.set_etag(etag)
+    if ultima:
+        response.last_modified = ultima
+    # Sempre revalidar: o processo pode receber movimentos novos a qualquer momento
+    response.cache_control.public = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
 
 @app.route('/search', methods=['POST'])
 def search():
     data = request.get_json()
     numero = data.get('numero')
-    tribunais = data.get('tribunais')
 
-    client = DataJudSimple()
-    resultados = []
+    try:
+        # Com `ultimos_movimentos`, cada processo traz só os N movimentos mais recentes
+        ultimos = ler_ultimos(data.get('ultimos_movimentos'))
+        # Lista opcional de campos do `_source` a retornar (padrão: documento completo)
+        campos = ler_campos(data.get('campos'))
+        tribunais = tribunais_da_busca(numero, data.get('tribunais'))
+    except (NumeroInvalido, RequisicaoInvalida) as e:
+        return jsonify({"error": str(e)}), 400
 
-    for tribunal in tribunais:
-        resultado = client.consultar_processo(numero, tribunal)
-        if resultado:
-            resultados.append(resultado)
+    encontrados = client.consultar_em_tribunais(numero, tribunais, parar_no_primeiro=False, campos=campos)
 
-    return jsonify(resultados)
+    return jsonify([Processo(resultado).como_dict(ultimos) for _tribunal, resultado in encontrados])
+
+@app.route('/search/stream', methods=['POST'])
+def search_stream():
+    """Busca em vários tribunais enviando uma linha NDJSON por tribunal assim que ele responde."""
+    data = request.get_json()
+    numero = data.get('numero')
+    parar_no_primeiro = data.get('parar_no_primeiro', True)
+
+    try:
+        ultimos = ler_ultimos(data.get('ultimos_movimentos'))
+        campos = ler_campos(data.get('campos'))
+        tribunais = tribunais_da_busca(numero, data.get('tribunais'))
+    except (NumeroInvalido, RequisicaoInvalida) as e:
+        return jsonify({"error": str(e)}), 400
+
+    def gerar():
+        # Se o navegador desconectar, o gerador é fechado e as consultas pendentes canceladas
+        for tribunal, situacao, resultado in client.iterar_tribunais(
+            numero, tribunais, parar_no_primeiro=parar_no_primeiro, campos=campos
+        ):
+            linha = {
+                "tribunal": tribunal,
+                "situacao": situacao,
+                "encontrado": resultado is not None,
+                "processo": Processo(resultado).como_dict(ultimos) if resultado else None,
+            }
+            yield json.dumps(linha, ensure_ascii=False) + "\n"
+
+    return Response(
+        stream_with_context(gerar()),
+        mimetype='application/x-ndjson',
+        headers={"X-Accel-Buffering": "no", "Cache-Control": "no-cache"},
+    )
 
 @app.route('/status', methods=['POST'])
 def status():
     data = request.get_json()
-    tribunais = data.get('tribunais')
-
-    client = DataJudSimple()
-    resultados = {}
+    try:
+        tribunais = ler_tribunais(data.get('tribunais'))
+    except RequisicaoInvalida as e:
+        return jsonify({"error": str(e)}), 400
 
-    for tribunal in tribunais:
-        resultado = client.verificar_tribunal(tribunal)
-        resultados[tribunal] = resultado
+    # Tribunais sem resultado guardado, ou com resultado antigo, são verificados agora, em paralelo
+    agora = time.time()
+    pendentes = [
+        t for t in tribunais
+        if (monitor.situacao(t).get('verificado_em') or 0) < agora - IDADE_MAX_STATUS
+    ]
+    if pendentes:
+        monitor.verificar(pendentes)
 
+    resultados = {tribunal: monitor.situacao(tribunal) for tribunal in tribunais}
     return jsonify(resultados)
 
+@app.route('/indice')
+def buscar_indice():
+    """Busca nos processos já consultados (índice local, sem acesso à API)."""
+    filtros = {campo: request.args.get(campo) for campo in CAMPOS_BUSCA}
+    texto = request.args.get('q')
+    if not texto and not any(filtros.values()):
+        return jsonify({"error": "Informe q ou ao menos um filtro: " + ", ".join(CAMPOS_BUSCA)}), 400
+    try:
+        limite = ler_limite(request.args.get('limite'))
+    except RequisicaoInvalida as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(client.indice.buscar(texto, limite=limite, **filtros))
+
+@app.route('/metrics')
+def metrics():
+    return Response(metricas.exportar_prometheus(), mimetype='text/plain; version=0.0.4')
+
 if __name__ == '__main__':
     app.run()
@@ -0,0 +1,195 @@
+"""Consulta em lote: lista de números na entrada, NDJSON na saída.
+
+Os números são lidos em fluxo, agrupados por tribunal e consultados em
+paralelo (uma requisição por grupo). Cada resultado vira uma linha NDJSON
+assim que chega, de modo que a memória não cresce com o tamanho da lista.
+Um checkpoint em SQLite registra os números já concluídos para que uma
+execução interrompida continue de onde parou.
+"""
+import json
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from concurrent.futures import Future
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, TextIO
+
+from cnj import NumeroInvalido, parse_numero_cnj, somente_digitos, tribunal_por_numero
+from situacoes import DUPLICADO, ERRO, INVALIDO
+
+# Números consultados por requisição ao mesmo tribunal
+TAMANHO_GRUPO = 50
+
+
+def ler_numeros(arquivo: TextIO) -> Iterator[str]:
+    """Lê um número por linha, ignorando linhas vazias e comentários (#)."""
+    for linha in arquivo:
+        numero = linha.strip()
+        if numero and not numero.startswith('#'):
+            yield numero
+
+
+def ler_documentos(arquivo: TextIO) -> Iterator[Dict[str, Any]]:
+    """Documentos de um arquivo JSONL (exportação) ou NDJSON do modo lote."""
+    for linha in arquivo:
+        if not linha.strip():
+            continue
+        dados = json.loads(linha)
+        # Linhas do modo lote trazem o documento em "processo"
+        if 'numeroProcesso' not in dados:
+            dados = dados.get('processo')
+        if isinstance(dados, dict):
+            yield dados
+
+
+class RegistroLote:
+    """Números concluídos (checkpoint) e já vistos (deduplicação) de um lote, em SQLite.
+
+    Sem `caminho`, usa um banco temporário em disco: nem o checkpoint nem a
+    deduplicação guardam a lista inteira em memória. Cada execução tem um
+    número próprio, e só os números concluídos em execuções anteriores são
+    pulados; repetições dentro da mesma execução são consultadas de novo,
+    a menos que se use `deduplicar`.
+    """
+
+    def __init__(self, caminho: Optional[str] = None):
+        anteriores = _checkpoint_em_texto(caminho)
+        self._conexao = sqlite3.connect(caminho or '')
+        self._conexao.executescript("""
+            CREATE TABLE IF NOT EXISTS concluidos (numero TEXT PRIMARY KEY, execucao INTEGER NOT NULL) WITHOUT ROWID;
+            CREATE TEMP TABLE vistos (numero TEXT PRIMARY KEY) WITHOUT ROWID;
+        """)
+        if anteriores:
+            self._conexao.executemany(
+                "INSERT OR IGNORE INTO concluidos VALUES (?, 0)", ((n,) for n in anteriores)
+            )
+        (ultima,) = self._conexao.execute("SELECT COALESCE(MAX(execucao), 0) FROM concluidos").fetchone()
+        self.execucao = ultima + 1
+        self._conexao.commit()
+
+    def concluido(self, numero: str) -> bool:
+        """True se o número foi concluído em uma execução anterior."""
+        return self._conexao.execute(
+            "SELECT 1 FROM concluidos WHERE numero = ? AND execucao < ?", (numero, self.execucao)
+        ).fetchone() is not None
+
+    def ver(self, numero: str) -> bool:
+        """Marca o número como visto nesta execução; False se já tinha sido visto."""
+        return self._conexao.execute("INSERT OR IGNORE INTO vistos VALUES (?)", (numero,)).rowcount == 1
+
+    def concluir(self, numero: str):
+        self._conexao.execute("INSERT OR REPLACE INTO concluidos VALUES (?, ?)", (numero, self.execucao))
+
+    def salvar(self):
+        self._conexao.commit()
+
+    def fechar(self):
+        self._conexao.commit()
+        self._conexao.close()
+
+
+def _checkpoint_em_texto(caminho: Optional[str]) -> List[str]:
+    """Lê (e remove) um checkpoint no formato antigo, um número por linha."""
+    if not caminho or not os.path.exists(caminho) or not os.path.getsize(caminho):
+        return []
+    with open(caminho, 'rb') as arquivo:
+        if arquivo.read(16) == b'SQLite format 3\x00':
+            return []
+    with open(caminho, encoding='utf-8') as arquivo:
+        numeros = [linha.strip() for linha in arquivo if linha.strip()]
+    os.remove(caminho)
+    return numeros
+
+
+def _linha(numero: str, tribunal: Optional[str], situacao: str, processo: Optional[Dict[str, Any]]) -> str:
+    return json.dumps(
+        {"numero": numero, "tribunal": tribunal, "situacao": situacao, "processo": processo},
+        ensure_ascii=False,
+    )
+
+
+def processar_lote(
+    client,
+    numeros: Iterable[str],
+    saida: TextIO,
+    tribunal: str = 'auto',
+    concorrencia: int = 8,
+    checkpoint: Optional[str] = None,
+    tamanho_grupo: int = TAMANHO_GRUPO,
+    deduplicar: bool = False,
+) -> Dict[str, int]:
+    """Consulta os números e escreve uma linha NDJSON por número em `saida`.
+
+    Com `tribunal='auto'`, cada número é direcionado ao tribunal indicado no
+    próprio número CNJ. Cada linha da entrada gera uma linha de saída; com
+    `deduplicar`, as repetições não são consultadas e saem como "duplicado".
+    Retorna a contagem de resultados por situação.
+    """
+    # Sem checkpoint nem deduplicação, nada precisa ser registrado
+    registro = RegistroLote(checkpoint) if checkpoint or deduplicar else None
+    contagem: Dict[str, int] = {}
+    grupos: Dict[str, List[str]] = {}
+    pendentes: Set[Future] = set()
+
+    def registrar(numero, trib, situacao, processo):
+        saida.write(_linha(numero, trib, situacao, processo) + '\n')
+        contagem[situacao] = contagem.get(situacao, 0) + 1
+        # Erros ficam fora do checkpoint para serem repetidos na retomada
+        if checkpoint and registro and situacao not in (ERRO, DUPLICADO):
+            registro.concluir(numero)
+
+    def drenar(limite):
+        while len(pendentes) > limite:
+            prontos, _ = wait(pendentes, return_when=FIRST_COMPLETED)
+            for futuro in prontos:
+                pendentes.discard(futuro)
+                trib, grupo, resultados = futuro.result()
+                # Um número repetido no grupo é consultado uma vez, mas sai uma linha por ocorrência
+                for numero in grupo:
+                    registrar(numero, trib, *resultados[numero])
+            saida.flush()
+            if checkpoint and registro:
+                registro.salvar()
+
+    def enviar(trib):
+        grupo = grupos.pop(trib)
+        pendentes.add(executor.submit(
+            lambda: (trib, grupo, client.consultar_lote(list(dict.fromkeys(grupo)), trib))
+        ))
+        # Mantém no máximo duas levas de grupos em andamento
+        drenar(concorrencia * 2)
+
+    executor = ThreadPoolExecutor(max_workers=max(1, concorrencia))
+    try:
+        for bruto in numeros:
+            try:
+                numero = parse_numero_cnj(bruto).digitos
+            except NumeroInvalido:
+                numero = somente_digitos(bruto) or bruto
+            if checkpoint and registro and registro.concluido(numero):
+                continue
+            if deduplicar and registro and not registro.ver(numero):
+                registrar(numero, None, DUPLICADO, None)
+                continue
+
+            if tribunal == 'auto':
+                try:
+                    trib = tribunal_por_numero(numero)
+                except NumeroInvalido:
+                    registrar(numero, None, INVALIDO, None)
+                    continue
+            else:
+                trib = tribunal
+
+            grupos.setdefault(trib, []).append(numero)
+            if len(grupos[trib]) >= tamanho_grupo:
+                enviar(trib)
+
+        for trib in list(grupos):
+            enviar(trib)
+        drenar(0)
+    finally:
+        executor.shutdown(wait=True)
+        saida.flush()
+        if registro:
+            registro.fechar()
+    return contagem
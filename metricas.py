@@ -0,0 +1,140 @@
+"""Métricas internas (latência, bytes, novas tentativas, cache).
+
+As métricas ficam desligadas por padrão: cada ponto de medição testa
+`metricas.ativo` antes de qualquer trabalho, então o custo com elas
+desligadas é uma leitura de atributo. O app web as liga e as expõe em
+`/metrics` no formato texto do Prometheus; a CLI as liga com `--perfil`.
+Cada processo (ex: cada worker do gunicorn) tem o seu próprio registro.
+"""
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+BUCKETS_SEGUNDOS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BUCKETS_BYTES = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2, 100 * 1024 ** 2)
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    __slots__ = ('limites', 'contagens', 'soma', 'total')
+
+    def __init__(self, limites: Iterable[float]):
+        self.limites = tuple(limites)
+        self.contagens = [0] * (len(self.limites) + 1)
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect.bisect_left(self.limites, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+
+class Metricas:
+    """Registro de contadores e histogramas com rótulos."""
+
+    def __init__(self, ativo: bool = False):
+        self.ativo = ativo
+        self._contadores: Dict[str, Dict[Rotulos, float]] = {}
+        self._histogramas: Dict[str, Dict[Rotulos, Histograma]] = {}
+        self._limites: Dict[str, Tuple[float, ...]] = {}
+        self._ajuda: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def habilitar(self):
+        self.ativo = True
+
+    def descrever(self, nome: str, ajuda: str, limites: Optional[Iterable[float]] = None):
+        """Registra o texto de ajuda (e os limites, no caso de histogramas) de uma métrica."""
+        self._ajuda[nome] = ajuda
+        if limites is not None:
+            self._limites[nome] = tuple(limites)
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos: str):
+        if not self.ativo:
+            return
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def observar(self, nome: str, valor: float, **rotulos: str):
+        if not self.ativo:
+            return
+        chave = tuple(sorted(rotulos.items()))
+        with self._lock:
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = Histograma(self._limites.get(nome, BUCKETS_SEGUNDOS))
+            histograma.observar(valor)
+
+    def soma(self, nome: str) -> Tuple[float, int]:
+        """(soma, quantidade) de um histograma, somando todos os rótulos."""
+        with self._lock:
+            series = list(self._histogramas.get(nome, {}).values())
+        return sum(h.soma for h in series), sum(h.total for h in series)
+
+    def contador(self, nome: str, **rotulos: str) -> float:
+        """Total de um contador, somando as séries que têm os rótulos dados."""
+        filtro = set(rotulos.items())
+        with self._lock:
+            return sum(v for chave, v in self._contadores.get(nome, {}).items() if filtro <= set(chave))
+
+    def limpar(self):
+        with self._lock:
+            self._contadores.clear()
+            self._histogramas.clear()
+
+    def exportar_prometheus(self) -> str:
+        """Todas as métricas no formato de texto do Prometheus (versão 0.0.4)."""
+        linhas: List[str] = []
+        with self._lock:
+            for nome, contadores in sorted(self._contadores.items()):
+                self._cabecalho(linhas, nome, 'counter')
+                for rotulos, valor in sorted(contadores.items()):
+                    linhas.append(f"{nome}{_formatar_rotulos(rotulos)} {_numero(valor)}")
+            for nome, histogramas in sorted(self._histogramas.items()):
+                self._cabecalho(linhas, nome, 'histogram')
+                for rotulos, histograma in sorted(histogramas.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(histograma.limites + (float('inf'),), histograma.contagens):
+                        acumulado += contagem
+                        le = '+Inf' if limite == float('inf') else _numero(limite)
+                        linhas.append(f"{nome}_bucket{_formatar_rotulos(rotulos + (('le', le),))} {acumulado}")
+                    linhas.append(f"{nome}_sum{_formatar_rotulos(rotulos)} {_numero(histograma.soma)}")
+                    linhas.append(f"{nome}_count{_formatar_rotulos(rotulos)} {histograma.total}")
+        return '\n'.join(linhas) + '\n'
+
+    def _cabecalho(self, linhas: List[str], nome: str, tipo: str):
+        if nome in self._ajuda:
+            linhas.append(f"# HELP {nome} {self._ajuda[nome]}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+
+
+def _formatar_rotulos(rotulos: Rotulos) -> str:
+    if not rotulos:
+        return ''
+    pares = ','.join(
+        '{}="{}"'.format(chave, str(valor).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for chave, valor in rotulos
+    )
+    return '{' + pares + '}'
+
+
+def _numero(valor: float) -> str:
+    return repr(float(valor)) if valor != int(valor) else str(int(valor))
+
+
+# Registro único do processo
+metricas = Metricas()
+
+metricas.descrever('judinfo_requisicao_segundos', 'Tempo de rede das buscas na API DataJud, por tribunal.')
+metricas.descrever('judinfo_espera_limitador_segundos', 'Espera no limitador de taxa antes de cada busca, por tribunal.')
+metricas.descrever('judinfo_resposta_bytes', 'Tamanho (descomprimido) das respostas da API, por tribunal.', BUCKETS_BYTES)
+metricas.descrever('judinfo_decodificacao_segundos', 'Tempo de decodificação do JSON das respostas.')
+metricas.descrever('judinfo_renderizacao_segundos', 'Tempo de formatação da saída na CLI.')
+metricas.descrever('judinfo_novas_tentativas_total', 'Novas tentativas após 429/5xx ou falha de rede, por tribunal.')
+metricas.descrever('judinfo_erros_total', 'Buscas que terminaram em erro, por tribunal.')
+metricas.descrever('judinfo_cache_total', 'Consultas ao cache local, por resultado (acerto/falta).')
@@ -0,0 +1,176 @@
+"""Modelo dos processos retornados pela API DataJud.
+
+`Processo` e `Movimento` são visões leves (com `__slots__`) sobre o
+documento original do `_source`, que continua sendo a fonte dos dados e da
+saída JSON. Os movimentos só viram objetos quando acessados — e
+`ultimos_movimentos(n)` cria apenas os `n` pedidos —, e cada data é
+convertida uma única vez (`converter_data` guarda as conversões recentes).
+
+As visões não reduzem a memória de cada processo: o dict bruto continua
+inteiro na memória. O ganho é não copiar os dados nem criar objetos e
+datas que a saída não usa.
+"""
+import heapq
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Marca de "ainda não calculado" (None é um resultado válido)
+_PENDENTE = object()
+
+
+@lru_cache(maxsize=4096)
+def converter_data(texto: Optional[str]) -> Optional[datetime]:
+    """Converte uma data da API (ISO 8601, ex: 2024-05-01T12:00:00.000Z, ou
+    AAAAMMDDhhmmss, usado por alguns tribunais); None se inválida."""
+    if not texto:
+        return None
+    try:
+        if len(texto) == 14 and texto.isdigit():
+            return datetime.strptime(texto, '%Y%m%d%H%M%S').replace(tzinfo=timezone.utc)
+        return datetime.fromisoformat(texto.replace('Z', '+00:00'))
+    except (ValueError, TypeError, AttributeError):
+        return None
+
+
+def chave_data(texto: Any) -> str:
+    """Chave ordenável de uma data da API: ISO em UTC com milissegundos; '' se inválida.
+
+    Datas sem fuso são tratadas como UTC, como as da API.
+    """
+    # Formato mais comum da API (2024-05-01T12:00:00.000Z): já está normalizado
+    if isinstance(texto, str) and len(texto) == 24 and texto[10] == 'T' and texto[-1] == 'Z':
+        return texto[:23]
+    data = converter_data(texto) if isinstance(texto, str) else None
+    if data is None:
+        return ''
+    if data.tzinfo is not None:
+        data = data.astimezone(timezone.utc).replace(tzinfo=None)
+    return data.isoformat(timespec='milliseconds')
+
+
+def _nome(valor: Any) -> Optional[str]:
+    return valor.get('nome') if isinstance(valor, dict) else None
+
+
+class Movimento:
+    __slots__ = ('dados', '_data_hora')
+
+    def __init__(self, dados: Dict[str, Any]):
+        self.dados = dados
+        self._data_hora = _PENDENTE  # type: Any
+
+    @property
+    def codigo(self) -> Optional[int]:
+        return self.dados.get('codigo')
+
+    @property
+    def nome(self) -> Optional[str]:
+        return self.dados.get('nome')
+
+    @property
+    def data_hora_texto(self) -> Optional[str]:
+        return self.dados.get('dataHora')
+
+    @property
+    def data_hora(self) -> Optional[datetime]:
+        if self._data_hora is _PENDENTE:
+            self._data_hora = converter_data(self.data_hora_texto)
+        return self._data_hora
+
+
+class Processo:
+    __slots__ = ('dados', '_movimentos', '_recentes')
+
+    def __init__(self, dados: Dict[str, Any]):
+        self.dados = dados
+        self._movimentos = None  # type: Optional[Tuple[Movimento, ...]]
+        # Índices dos movimentos mais recentes já calculados (do mais novo ao mais antigo)
+        self._recentes = []  # type: List[int]
+
+    @property
+    def numero(self) -> Optional[str]:
+        return self.dados.get('numeroProcesso')
+
+    @property
+    def tribunal(self) -> Optional[str]:
+        return self.dados.get('tribunal')
+
+    @property
+    def grau(self) -> Optional[str]:
+        return self.dados.get('grau')
+
+    @property
+    def classe(self) -> Optional[str]:
+        return _nome(self.dados.get('classe'))
+
+    @property
+    def sistema(self) -> Optional[str]:
+        return _nome(self.dados.get('sistema'))
+
+    @property
+    def formato(self) -> Optional[str]:
+        return _nome(self.dados.get('formato'))
+
+    @property
+    def orgao_julgador(self) -> Optional[str]:
+        return _nome(self.dados.get('orgaoJulgador'))
+
+    @property
+    def assuntos(self) -> List[str]:
+        return [a.get('nome') or 'N/A' for a in self.dados.get('assuntos') or [] if isinstance(a, dict)]
+
+    @property
+    def data_ajuizamento(self) -> Optional[datetime]:
+        return converter_data(self.dados.get('dataAjuizamento'))
+
+    @property
+    def data_ultima_atualizacao(self) -> Optional[datetime]:
+        return converter_data(self.dados.get('dataHoraUltimaAtualizacao'))
+
+    @property
+    def total_movimentos(self) -> int:
+        """Quantidade de movimentos, sem criar os objetos."""
+        return len(self.dados.get('movimentos') or [])
+
+    @property
+    def movimentos(self) -> Tuple[Movimento, ...]:
+        """Todos os movimentos, na ordem da API (criados no primeiro acesso)."""
+        if self._movimentos is None:
+            self._movimentos = tuple(Movimento(m) for m in self.dados.get('movimentos') or [])
+        return self._movimentos
+
+    def _indices_recentes(self, n: int) -> List[int]:
+        if n > len(self._recentes) and len(self._recentes) < self.total_movimentos:
+            # A API não garante a ordem dos movimentos nem o formato das datas:
+            # escolhe pela dataHora normalizada; no empate, vale o que vem depois na lista.
+            # Se todas já estão no formato normalizado (o comum), comparam-se os textos
+            datas: List[Any] = [(m or {}).get('dataHora') for m in self.dados['movimentos']]
+            if not all(type(d) is str and len(d) == 24 and d.endswith('Z') for d in datas):
+                datas = [chave_data(d) for d in datas]
+            self._recentes = heapq.nlargest(n, range(len(datas) - 1, -1, -1), key=lambda i: datas[i])
+        return self._recentes[:n]
+
+    def ultimos_movimentos(self, n: int) -> List[Movimento]:
+        """Os `n` movimentos mais recentes, do mais novo ao mais antigo."""
+        if n <= 0:
+            return []
+        if self._movimentos is not None:
+            return [self._movimentos[i] for i in self._indices_recentes(n)]
+        brutos = self.dados.get('movimentos') or []
+        return [Movimento(brutos[i]) for i in self._indices_recentes(n)]
+
+    @property
+    def ultimo_movimento(self) -> Optional[Movimento]:
+        ultimos = self.ultimos_movimentos(1)
+        return ultimos[0] if ultimos else None
+
+    def como_dict(self, ultimos_movimentos: Optional[int] = None) -> Dict[str, Any]:
+        """Documento para saída JSON; com `ultimos_movimentos`, só os N mais recentes
+        (em ordem cronológica) e o total original em `totalMovimentos`."""
+        if ultimos_movimentos is None or self.total_movimentos <= ultimos_movimentos:
+            return self.dados
+        dados = dict(self.dados)
+        dados['movimentos'] = [m.dados for m in reversed(self.ultimos_movimentos(ultimos_movimentos))]
+        dados['totalMovimentos'] = self.total_movimentos
+        return dados
@@ -0,0 +1,90 @@
+"""Controle de taxa e de concorrência das requisições à API DataJud.
+
+`LimitadorAdaptativo` combina um balde de fichas (taxa máxima de requisições
+por segundo) com um limite de requisições simultâneas que se adapta às
+respostas da API: cai pela metade a cada 429/503 e volta a subir aos poucos
+enquanto as respostas forem bem-sucedidas (AIMD).
+"""
+import random
+import threading
+import time
+from typing import Optional
+
+TAXA_PADRAO = 20.0        # requisições por segundo
+RAJADA_PADRAO = 40        # fichas acumuladas no máximo
+CONCORRENCIA_MAX_PADRAO = 16
+
+# Códigos que indicam falha temporária e merecem nova tentativa
+STATUS_REPETIVEIS = frozenset({429, 500, 502, 503, 504})
+# Códigos que indicam sobrecarga: reduzem a taxa e a concorrência
+STATUS_SOBRECARGA = frozenset({429, 503})
+
+
+def espera_backoff(tentativa: int, base: float = 0.5, maximo: float = 10.0) -> float:
+    """Espera antes da próxima tentativa: backoff exponencial com jitter completo."""
+    return random.uniform(0, min(maximo, base * (2 ** tentativa)))
+
+
+def espera_retry_after(valor: Optional[str], maximo: float = 30.0) -> Optional[float]:
+    """Segundos indicados no cabeçalho Retry-After (apenas o formato numérico)."""
+    try:
+        return min(maximo, max(0.0, float(valor))) if valor else None
+    except ValueError:
+        return None
+
+
+class LimitadorAdaptativo:
+    """Balde de fichas com limite adaptativo de requisições simultâneas."""
+
+    def __init__(
+        self,
+        taxa: float = TAXA_PADRAO,
+        rajada: int = RAJADA_PADRAO,
+        concorrencia_max: int = CONCORRENCIA_MAX_PADRAO,
+        concorrencia_min: int = 1,
+    ):
+        self.taxa_max = taxa
+        self.taxa = taxa
+        self.rajada = rajada
+        self.concorrencia_max = concorrencia_max
+        self.concorrencia_min = concorrencia_min
+        self.limite = concorrencia_max
+        self._fichas = float(rajada)
+        self._ultima_reposicao = time.monotonic()
+        self._em_andamento = 0
+        self._sucessos = 0
+        self._condicao = threading.Condition()
+
+    def _repor(self):
+        agora = time.monotonic()
+        self._fichas = min(self.rajada, self._fichas + (agora - self._ultima_reposicao) * self.taxa)
+        self._ultima_reposicao = agora
+
+    def adquirir(self):
+        """Bloqueia até haver uma ficha e uma vaga de concorrência."""
+        with self._condicao:
+            while True:
+                self._repor()
+                if self._em_andamento < self.limite and self._fichas >= 1:
+                    self._fichas -= 1
+                    self._em_andamento += 1
+                    return
+                espera = None if self._em_andamento >= self.limite else (1 - self._fichas) / self.taxa
+                self._condicao.wait(espera)
+
+    def liberar(self, sobrecarga: bool = False):
+        """Devolve a vaga; `sobrecarga` indica uma resposta 429/503 da API."""
+        with self._condicao:
+            self._em_andamento -= 1
+            if sobrecarga:
+                self.limite = max(self.concorrencia_min, self.limite // 2)
+                self.taxa = max(self.taxa_max / 16, self.taxa / 2)
+                self._sucessos = 0
+            else:
+                # Aumento aditivo: +1 vaga a cada `limite` sucessos seguidos
+                self._sucessos += 1
+                if self._sucessos >= self.limite:
+                    self._sucessos = 0
+                    self.limite = min(self.concorrencia_max, self.limite + 1)
+                    self.taxa = min(self.taxa_max, self.taxa * 1.25)
+            self._condicao.notify_all()
@@ -0,0 +1,162 @@
+"""Monitoramento da saúde dos tribunais.
+
+Um monitor em segundo plano verifica os tribunais em paralelo a cada
+intervalo e guarda o último resultado, a latência recente (p50/p95) e a
+taxa de erros de cada um. Tribunais que falham repetidamente têm o
+circuito aberto por um tempo: as buscas os pulam em vez de esperar o
+timeout completo.
+"""
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional
+
+# Amostras guardadas por tribunal para latência e taxa de erro
+JANELA_AMOSTRAS = 50
+
+# Falhas consecutivas que abrem o circuito e por quanto tempo ele fica aberto
+LIMIAR_FALHAS = 3
+TEMPO_ABERTO = 60.0
+
+INTERVALO_PADRAO = 60.0
+
+
+def percentil(valores: List[float], p: float) -> Optional[float]:
+    """Percentil `p` (0 a 100) por posição mais próxima; None sem valores."""
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    posicao = math.ceil(p / 100 * len(ordenados))
+    return ordenados[min(len(ordenados), max(1, posicao)) - 1]
+
+
+class EstadoTribunal:
+    """Amostras recentes e disjuntor (circuit breaker) de um tribunal."""
+
+    __slots__ = ('latencias', 'sucessos', 'falhas_seguidas', 'aberto_ate', 'ultimo', 'verificado_em')
+
+    def __init__(self):
+        self.latencias: Deque[float] = deque(maxlen=JANELA_AMOSTRAS)
+        self.sucessos: Deque[bool] = deque(maxlen=JANELA_AMOSTRAS)
+        self.falhas_seguidas = 0
+        self.aberto_ate = 0.0
+        self.ultimo: Optional[Dict[str, Any]] = None
+        self.verificado_em: Optional[float] = None
+
+
+class MonitorTribunais:
+    """Estado de saúde por tribunal, alimentado pelo monitor e pelas próprias buscas."""
+
+    def __init__(
+        self,
+        client,
+        tribunais: Iterable[str],
+        intervalo: float = INTERVALO_PADRAO,
+        concorrencia: int = 16,
+        limiar_falhas: int = LIMIAR_FALHAS,
+        tempo_aberto: float = TEMPO_ABERTO,
+    ):
+        self.client = client
+        self.tribunais = list(tribunais)
+        self.intervalo = intervalo
+        self.concorrencia = concorrencia
+        self.limiar_falhas = limiar_falhas
+        self.tempo_aberto = tempo_aberto
+        self._estados: Dict[str, EstadoTribunal] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._parar = threading.Event()
+
+    def _estado(self, tribunal: str) -> EstadoTribunal:
+        estado = self._estados.get(tribunal)
+        if estado is None:
+            estado = self._estados.setdefault(tribunal, EstadoTribunal())
+        return estado
+
+    def registrar(self, tribunal: str, sucesso: bool, latencia: Optional[float] = None):
+        """Registra o resultado de uma requisição ao tribunal."""
+        with self._lock:
+            estado = self._estado(tribunal)
+            estado.sucessos.append(sucesso)
+            if latencia is not None and sucesso:
+                estado.latencias.append(latencia)
+            if sucesso:
+                estado.falhas_seguidas = 0
+                estado.aberto_ate = 0.0
+            else:
+                estado.falhas_seguidas += 1
+                if estado.falhas_seguidas >= self.limiar_falhas:
+                    estado.aberto_ate = time.monotonic() + self.tempo_aberto
+
+    def disponivel(self, tribunal: str) -> bool:
+        """False enquanto o circuito do tribunal estiver aberto."""
+        estado = self._estados.get(tribunal)
+        return estado is None or estado.aberto_ate <= time.monotonic()
+
+    def verificar(
+        self, tribunais: Optional[Iterable[str]] = None, ao_concluir: Optional[Callable[[str], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """Verifica os tribunais em paralelo e atualiza o estado guardado.
+
+        `ao_concluir` é chamado na thread de quem chamou, a cada tribunal verificado.
+        """
+        tribunais = list(tribunais) if tribunais is not None else self.tribunais
+
+        def verificar_um(tribunal):
+            inicio = time.monotonic()
+            resultado = self.client.verificar_tribunal(tribunal)
+            latencia = time.monotonic() - inicio
+            self.registrar(tribunal, resultado['success'], latencia)
+            with self._lock:
+                estado = self._estado(tribunal)
+                estado.ultimo = resultado
+                estado.verificado_em = time.time()
+            return resultado
+
+        resultados = {}
+        with ThreadPoolExecutor(max_workers=max(1, self.concorrencia)) as executor:
+            futuros = {executor.submit(verificar_um, tribunal): tribunal for tribunal in tribunais}
+            for futuro in as_completed(futuros):
+                resultados[futuros[futuro]] = futuro.result()
+                if ao_concluir:
+                    ao_concluir(futuros[futuro])
+        return {tribunal: resultados[tribunal] for tribunal in tribunais}
+
+    def situacao(self, tribunal: str) -> Dict[str, Any]:
+        """Último resultado do tribunal, com latências, taxa de erro e estado do circuito."""
+        with self._lock:
+            # Consulta não cria estado: nomes desconhecidos não crescem o dicionário
+            estado = self._estados.get(tribunal) or EstadoTribunal()
+            latencias = list(estado.latencias)
+            sucessos = list(estado.sucessos)
+            ultimo = dict(estado.ultimo) if estado.ultimo else {"success": False, "error": "Ainda não verificado"}
+            verificado_em = estado.verificado_em
+        ultimo.update({
+            "latencia_p50": percentil(latencias, 50),
+            "latencia_p95": percentil(latencias, 95),
+            "taxa_erro": (sucessos.count(False) / len(sucessos)) if sucessos else None,
+            "circuito_aberto": not self.disponivel(tribunal),
+            "verificado_em": verificado_em,
+        })
+        return ultimo
+
+    def iniciar(self):
+        """Inicia a verificação periódica em uma thread daemon (idempotente)."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(target=self._executar, name='monitor-tribunais', daemon=True)
+        self._thread.start()
+
+    def parar(self):
+        self._parar.set()
+
+    def _executar(self):
+        while not self._parar.is_set():
+            try:
+                self.verificar()
+            except Exception:
+                pass  # Uma rodada com erro não pode derrubar o monitor
+            self._parar.wait(self.intervalo)
@@ -3,14 +3,19 @@ from setuptools import setup
 setup(
     name='judinfo-cli',
     version='0.1.0',
-    py_modules=['judinfo_cli', 'config'],
+    py_modules=['judinfo_cli', 'config', 'cnj', 'situacoes', 'cache', 'lote', 'exportacao', 'vigia', 'saude', 'resiliencia', 'metricas', 'tribunais', 'modelo', 'indice', 'analise'],
     include_package_data=True,
     python_requires='>=3.8',
     install_requires=[
         'click>=8.0.0',
         'requests>=2.25.0',
-        'Flask>=2.0.0',
     ],
+    # A interface web e a análise são opcionais: pip install judinfo-cli[web]
+    extras_require={
+        'web': ['Flask>=2.0.0'],
+        'analise': ['numpy>=1.20'],
+        'parquet': ['numpy>=1.20', 'pyarrow>=8.0.0'],
+    },
     entry_points={
         "console_scripts": [
             "judinfo=judinfo_cli:main",
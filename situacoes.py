@@ -0,0 +1,16 @@
+"""Situação de cada consulta, como aparece nos resultados e no NDJSON do modo lote.
+
+Módulo próprio (só constantes) para que `judinfo_cli.py` e `lote.py` usem os
+mesmos valores sem que um precise importar o outro.
+"""
+
+ENCONTRADO = 'encontrado'
+NAO_ENCONTRADO = 'nao_encontrado'
+# Falha de rede ou da API após as novas tentativas
+ERRO = 'erro'
+# Tribunal não consultado: circuito aberto ou busca encerrada por outro acerto
+IGNORADO = 'ignorado'
+# Número fora do padrão CNJ, sem tribunal dedutível (modo lote com "auto")
+INVALIDO = 'invalido'
+# Número repetido na entrada, com `deduplicar`
+DUPLICADO = 'duplicado'
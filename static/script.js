@@ -143,8 +143,11 @@ document.addEventListener("DOMContentLoaded", () => {
         for (const court in results) {
           const item = document.createElement("div");
           item.classList.add("status-item");
+          const latency = results[court].latencia_p50;
           const status = results[court].success
-            ? '<span class="text-success"><i class="fa-solid fa-circle-check"></i> Online</span>'
+            ? `<span class="text-success"><i class="fa-solid fa-circle-check"></i> Online${
+                latency != null ? ` (${Math.round(latency * 1000)} ms)` : ""
+              }</span>`
             : '<span class="text-danger"><i class="fa-solid fa-circle-xmark"></i> Offline</span>';
           item.innerHTML = `<strong>${court.toUpperCase()}</strong>: ${status}`;
           grid.appendChild(item);
@@ -157,55 +160,16 @@ document.addEventListener("DOMContentLoaded", () => {
       });
   });
 
-  // Search form submission
-  searchForm.addEventListener("submit", (event) => {
-    event.preventDefault();
-    const caseNumber = caseNumberInput.value;
-    const selectedCourts = Array.from(
-      courtsList.querySelectorAll("input:checked")
-    ).map((checkbox) => checkbox.value);
-    validationMessage.textContent = "";
-
-    if (!caseNumber || selectedCourts.length === 0) {
-      validationMessage.textContent =
-        "Please enter a case number and select at least one court.";
-      return;
-    }
-
-    setLoading(searchButton, true);
-
-    fetch("/search", {
-      method: "POST",
-      headers: {
-        "Content-Type": "application/json",
-      },
-      body: JSON.stringify({
-        numero: caseNumber,
-        tribunais: selectedCourts,
-      }),
-    })
-      .then((response) => response.json())
-      .then((results) => {
-        resultsContainer.innerHTML = "";
-        if (results.length === 0) {
-          resultsContainer.innerHTML = "<p>No results found.</p>";
-          return;
-        }
-
-        results.forEach((result) => {
-          const sanitizedId = result.numeroProcesso.replace(
-            /[^a-zA-Z0-9]/g,
-            ""
-          );
-          const resultElement = document.createElement("div");
-          resultElement.classList.add("card", "mb-3");
-          resultElement.innerHTML = `
+  // Render a single case result card
+  const renderResult = (result) => {
+    const sanitizedId = result.numeroProcesso.replace(/[^a-zA-Z0-9]/g, "");
+    const resultElement = document.createElement("div");
+    resultElement.classList.add("card", "mb-3");
+    resultElement.innerHTML = `
                         <div class="card-header d-flex justify-content-between align-items-center">
                             ${result.tribunal}
                             <span class="badge bg-${
-                              result.grau === "1º Grau"
-                                ? "primary"
-                                : "secondary"
+                              result.grau === "1º Grau" ? "primary" : "secondary"
                             }">${result.grau}</span>
                         </div>
                         <div class="card-body">
@@ -226,12 +190,131 @@ document.addEventListener("DOMContentLoaded", () => {
                             </div>
                         </div>
                     `;
-          resultsContainer.appendChild(resultElement);
-        });
+    return resultElement;
+  };
+
+  // Render a court that could not be searched (API error or open circuit)
+  const renderCourtError = (item) => {
+    const errorElement = document.createElement("div");
+    errorElement.classList.add("alert", "alert-warning", "py-2", "mb-2");
+    const reason =
+      item.situacao === "erro"
+        ? "error while querying the court"
+        : "court temporarily unavailable, not queried";
+    errorElement.innerHTML = `<i class="fa-solid fa-triangle-exclamation"></i> <strong>${item.tribunal.toUpperCase()}</strong>: ${reason}`;
+    return errorElement;
+  };
+
+  // Search form submission: results are streamed one court at a time
+  // (NDJSON) and rendered as they arrive; the search stops on the first hit.
+  let currentSearch = null;
+
+  searchForm.addEventListener("submit", async (event) => {
+    event.preventDefault();
+    const caseNumber = caseNumberInput.value;
+    const selectedCourts = Array.from(
+      courtsList.querySelectorAll("input:checked")
+    ).map((checkbox) => checkbox.value);
+    validationMessage.textContent = "";
+
+    if (!caseNumber) {
+      validationMessage.textContent = "Please enter a case number.";
+      return;
+    }
+
+    if (currentSearch) {
+      currentSearch.abort();
+    }
+    const controller = new AbortController();
+    currentSearch = controller;
+
+    setLoading(searchButton, true);
+    resultsContainer.innerHTML = "";
+    resultsContainer.style.opacity = "1";
+    const progress = document.createElement("p");
+    progress.classList.add("text-muted");
+    resultsContainer.appendChild(progress);
+
+    const total = selectedCourts.length || 1;
+    let done = 0;
+    let found = 0;
+    let failed = 0;
+
+    const handleLine = (line) => {
+      if (!line.trim()) {
+        return;
+      }
+      const item = JSON.parse(line);
+      done += 1;
+      progress.textContent = `${done}/${total} tribunais consultados`;
+      if (item.encontrado) {
+        found += 1;
+        resultsContainer.appendChild(renderResult(item.processo));
+        // The server stops after the first hit; drop the connection right away
+        controller.abort();
+      } else if (
+        item.situacao === "erro" ||
+        (item.situacao === "ignorado" && found === 0)
+      ) {
+        // After a hit the other courts are skipped on purpose; before one,
+        // "ignorado" means the court's circuit is open
+        failed += 1;
+        resultsContainer.appendChild(renderCourtError(item));
+      }
+    };
+
+    try {
+      const response = await fetch("/search/stream", {
+        method: "POST",
+        headers: {
+          "Content-Type": "application/json",
+        },
+        body: JSON.stringify({
+          numero: caseNumber,
+          // Without a selection the server picks the court from the CNJ number
+          tribunais: selectedCourts.length > 0 ? selectedCourts : "auto",
+        }),
+        signal: controller.signal,
+      });
+
+      if (!response.ok) {
+        const error = await response.json();
+        validationMessage.textContent = error.error || "Search failed.";
+        failed += 1;
+        return;
+      }
+
+      const reader = response.body.getReader();
+      const decoder = new TextDecoder();
+      let buffer = "";
+      while (true) {
+        const { value, done: finished } = await reader.read();
+        if (finished) {
+          break;
+        }
+        buffer += decoder.decode(value, { stream: true });
+        const lines = buffer.split("\n");
+        buffer = lines.pop();
+        lines.forEach(handleLine);
+      }
+      handleLine(buffer);
+    } catch (error) {
+      if (error.name !== "AbortError") {
+        validationMessage.textContent = "Search failed.";
+        failed += 1;
+      }
+    } finally {
+      if (currentSearch === controller) {
+        currentSearch = null;
+        // Keep the court errors on screen: "not found" only when every court answered
+        if (found === 0 && failed === 0) {
+          const empty = document.createElement("p");
+          empty.textContent = "No results found.";
+          resultsContainer.appendChild(empty);
+        }
         resultsContainer.classList.add("fade-in");
-      })
-      .finally(() => {
         setLoading(searchButton, false);
-      });
+      }
+    }
   });
 });
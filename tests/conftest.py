@@ -0,0 +1,30 @@
+import pytest
+
+from metricas import metricas
+
+
+@pytest.fixture(autouse=True)
+def metricas_desligadas():
+    # O app web liga as métricas globais na primeira requisição; cada teste começa sem elas
+    metricas.ativo = False
+    metricas.limpar()
+    yield
+    metricas.ativo = False
+
+
+@pytest.fixture(autouse=True)
+def fechar_clientes(monkeypatch):
+    """Fecha os clientes criados no teste (executor de hedge, sessões, cache e índice)."""
+    from judinfo_cli import DataJudSimple
+
+    criados = []
+    iniciar = DataJudSimple.__init__
+
+    def registrar(self, *args, **kwargs):
+        iniciar(self, *args, **kwargs)
+        criados.append(self)
+
+    monkeypatch.setattr(DataJudSimple, "__init__", registrar)
+    yield
+    for client in criados:
+        client.fechar()
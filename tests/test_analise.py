@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from analise import TabelaMovimentos
+
+
+def _processo(numero, tribunal, orgao, ajuizamento, movimentos):
+    return {
+        "numeroProcesso": numero, "tribunal": tribunal, "grau": "G1",
+        "classe": {"nome": "Procedimento Comum Cível"}, "orgaoJulgador": {"nome": orgao},
+        "dataAjuizamento": ajuizamento,
+        "movimentos": [{"codigo": c, "nome": f"M{c}", "dataHora": d} for c, d in movimentos],
+    }
+
+
+DOCUMENTOS = [
+    _processo("0001", "TJSP", "1ª Vara", "2020-01-01T00:00:00.000Z", [
+        (26, "2020-01-11T00:00:00.000Z"), (193, "2020-03-01T00:00:00.000Z"), (219, "2020-01-31T00:00:00.000Z"),
+    ]),
+    # Data compacta (AAAAMMDDhhmmss), usada por alguns tribunais
+    _processo("0002", "TJSP", "2ª Vara", "20200101000000", [(193, "20200111000000")]),
+    _processo("0003", "TJMG", "1ª Vara", "2021-01-01T00:00:00.000Z", [(26, "2021-01-05T00:00:00.000Z")]),
+]
+
+
+def test_flattens_batch_output_and_computes_durations():
+    lote = io.StringIO("\n".join(
+        json.dumps({"numero": d["numeroProcesso"], "situacao": "encontrado", "processo": d}) for d in DOCUMENTOS
+    ) + "\n" + json.dumps({"numero": "9", "situacao": "nao_encontrado", "processo": None}))
+    tabela = TabelaMovimentos.de_arquivo(lote)
+
+    assert len(tabela) == 3 and tabela.movimentos["codigo"].tolist() == [26, 193, 219, 193, 26]
+    # Primeiro julgamento pela data, não pela posição na lista
+    np.testing.assert_allclose(tabela.dias_ate(), [30, 10, np.nan])
+    np.testing.assert_allclose(tabela.intervalo_medio(), [25, np.nan, np.nan])
+    assert tabela.julgados().tolist() == [True, True, False]
+
+
+def test_group_percentiles_match_numpy():
+    tabela = TabelaMovimentos.de_processos(DOCUMENTOS)
+    valores = np.array([1.0, 2.0, 7.0])
+    grupos = tabela.agrupar("tribunal", valores)
+
+    assert grupos["chave"].tolist() == ["tjsp", "tjmg"]
+    assert grupos["processos"].tolist() == [2, 1]
+    np.testing.assert_allclose(grupos["p90"], [np.percentile([1.0, 2.0], 90), 7.0])
+    np.testing.assert_allclose(grupos["media"], [1.5, 7.0])
+    acervo = tabela.acervo()
+    assert acervo["chave"].tolist() == ["1ª Vara"] and acervo["pendentes"].tolist() == [1]
+
+
+def test_writes_csv_and_parquet(tmp_path):
+    tabela = TabelaMovimentos.de_processos(DOCUMENTOS)
+    tabela.gravar(str(tmp_path / "movimentos.csv"), "movimentos")
+    with open(tmp_path / "movimentos.csv", encoding="utf-8") as arquivo:
+        linhas = list(csv.DictReader(arquivo))
+    assert linhas[3] == {"numero": "0002", "tribunal": "tjsp", "codigo": "193", "nome": "M193",
+                         "data_hora": "2020-01-11T00:00:00.000Z"}
+
+    pq = pytest.importorskip("pyarrow.parquet")
+    tabela.gravar(str(tmp_path / "processos.parquet"))
+    lida = pq.read_table(tmp_path / "processos.parquet")
+    assert lida.column("numero").to_pylist() == ["0001", "0002", "0003"]
@@ -0,0 +1,38 @@
+import pytest
+
+from benchmarks.executar import comparar
+from benchmarks.servidor_falso import PerfilTribunal, ServidorFalso, numero_cnj
+from judinfo_cli import DataJudSimple
+
+
+@pytest.fixture
+def servidor():
+    servidor = ServidorFalso(
+        perfis={"tjrj": PerfilTribunal(taxa_429=1.0)}, padrao=PerfilTribunal(processos=3, movimentos=5)
+    )
+    servidor.iniciar()
+    yield servidor
+    servidor.parar()
+
+
+def test_client_against_fake_server(servidor):
+    client = DataJudSimple(base_url=servidor.url, tentativas=2, backoff_base=0)
+    assert client.consultar_processo(numero_cnj(2), "tjsp")["numeroProcesso"] == numero_cnj(2)
+    assert client.consultar_status(numero_cnj(99), "tjsp") == ("nao_encontrado", None)
+
+    resumo = client.consultar_processo(numero_cnj(1), "tjsp", campos=["numeroProcesso", "movimentos.nome"])
+    assert resumo == {"numeroProcesso": numero_cnj(1), "movimentos": [{"nome": f"Movimento {i}"} for i in range(5)]}
+
+    lote = client.consultar_lote([numero_cnj(1), numero_cnj(3)], "tjmg")
+    assert all(situacao == "encontrado" for situacao, _ in lote.values())
+
+    antes = servidor.requisicoes
+    assert client.consultar_status(numero_cnj(1), "tjrj") == ("erro", None)
+    assert servidor.requisicoes - antes == 2
+
+
+def test_compare_flags_regressions_by_direction():
+    anterior = {"resultados": {"web": {"search": {"requisicoes_por_s": 100, "p50_ms": 10, "amostras": 40}}}}
+    atual = {"resultados": {"web": {"search": {"requisicoes_por_s": 70, "p50_ms": 9, "amostras": 80}}}}
+    linhas = {nome: regressao for nome, *_, regressao in comparar(anterior, atual, limiar=0.2)}
+    assert linhas == {"web.search.p50_ms": False, "web.search.requisicoes_por_s": True}
@@ -0,0 +1,79 @@
+import sqlite3
+import time
+from unittest.mock import patch
+
+from cache import CacheProcessos
+from judinfo_cli import DataJudSimple
+
+
+def test_cache_stores_hits_and_misses(tmp_path):
+    cache = CacheProcessos(str(tmp_path / "cache.db"))
+    assert cache.obter("tjmg", "0001") is None
+
+    cache.salvar("tjmg", "0001", {"numeroProcesso": "0001"})
+    cache.salvar("tjsp", "0001", None)
+    assert cache.obter("TJMG", "0001") == (True, {"numeroProcesso": "0001"})
+    assert cache.obter("tjsp", "0001") == (False, None)
+
+
+def test_cache_expires_entries(tmp_path):
+    cache = CacheProcessos(str(tmp_path / "cache.db"), ttl=60, ttl_negativo=0)
+    cache.salvar("tjmg", "0001", {"numeroProcesso": "0001"})
+    cache.salvar("tjsp", "0001", None)
+    time.sleep(0.01)
+    assert cache.obter("tjmg", "0001") is not None
+    assert cache.obter("tjsp", "0001") is None
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = CacheProcessos(str(tmp_path / "cache.db"), tamanho_max=110)
+    cache.salvar("tjmg", "0001", {"numeroProcesso": "0001", "x": "a" * 20})
+    cache.salvar("tjmg", "0002", {"numeroProcesso": "0002", "x": "b" * 20})
+    cache.obter("tjmg", "0001")
+    cache.salvar("tjmg", "0003", {"numeroProcesso": "0003", "x": "c" * 20})
+    cache.remover_excedente()
+    assert cache.obter("tjmg", "0002") is None
+    assert cache.obter("tjmg", "0001") is not None
+
+
+def test_cache_bound_holds_across_instances(tmp_path):
+    # Cada execução da CLI cria um cache novo e grava poucas entradas
+    caminho = str(tmp_path / "cache.db")
+    for execucao in range(30):
+        cache = CacheProcessos(caminho, tamanho_max=1000)
+        for i in range(5):
+            cache.salvar("tjmg", f"{execucao:03d}{i}", {"numeroProcesso": f"{execucao:03d}{i}", "x": "a" * 50})
+        cache.salvar("tjmg", f"{execucao:03d}0", {"numeroProcesso": f"{execucao:03d}0"}, projecao='["numeroProcesso"]')
+        cache.fechar()
+
+    conexao = sqlite3.connect(caminho)
+    (total,) = conexao.execute("SELECT SUM(tamanho) FROM processos").fetchone()
+    assert conexao.execute("SELECT tamanho FROM uso").fetchone() == (total,)
+    assert total <= 1000
+    conexao.close()
+    cache = CacheProcessos(caminho)
+    assert cache.obter("tjmg", "0294") is not None
+    cache.fechar()
+
+
+def test_client_uses_negative_cache(tmp_path):
+    client = DataJudSimple(cache=CacheProcessos(str(tmp_path / "cache.db")))
+    with patch.object(DataJudSimple, "_consultar_api", return_value=("nao_encontrado", None)) as api:
+        assert client.consultar_processo("0001", "tjmg") is None
+        assert client.consultar_processo("0001", "tjmg") is None
+    assert api.call_count == 1
+
+    client.atualizar_cache = True
+    with patch.object(DataJudSimple, "_consultar_api", return_value=("erro", None)) as api:
+        assert client.consultar_processo("0001", "tjmg") is None
+    assert api.call_count == 1
+
+
+def test_cache_full_document_serves_any_projection(tmp_path):
+    cache = CacheProcessos(str(tmp_path / "cache.db"))
+    cache.salvar("tjmg", "0001", {"numeroProcesso": "0001", "nivelSigilo": 0}, projecao='["numeroProcesso"]')
+    assert cache.obter("tjmg", "0001") is None
+    assert cache.obter("tjmg", "0001", '["numeroProcesso"]') is not None
+
+    cache.salvar("tjmg", "0001", {"numeroProcesso": "0001"})
+    assert cache.obter("tjmg", "0001", '["tribunal"]') == (True, {"numeroProcesso": "0001"})
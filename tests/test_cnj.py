@@ -0,0 +1,36 @@
+import pytest
+
+from cnj import (
+    NumeroInvalido,
+    calcular_digito_verificador,
+    parse_numero_cnj,
+    tribunal_por_numero,
+    validar_numero_cnj,
+)
+
+
+def test_parse_numero_cnj_formatted_and_digits():
+    cnj = parse_numero_cnj("0000832-35.2018.4.01.3202")
+    assert cnj.digitos == "00008323520184013202"
+    assert parse_numero_cnj("00008323520184013202") == cnj
+
+
+def test_validar_numero_cnj_rejects_wrong_check_digit():
+    assert validar_numero_cnj("0000832-35.2018.4.01.3202")
+    assert not validar_numero_cnj("0000832-36.2018.4.01.3202")
+    assert not validar_numero_cnj("123")
+
+
+@pytest.mark.parametrize(
+    "segmento,tr,esperado",
+    [("8", "13", "tjmg"), ("8", "07", "tjdft"), ("5", "02", "trt2"), ("6", "26", "tre-sp"), ("9", "21", "tjmrs"), ("3", "00", "stj")],
+)
+def test_tribunal_por_numero_routes_segment_and_court(segmento, tr, esperado):
+    dd = calcular_digito_verificador("0001234", "2020", segmento, tr, "0001")
+    assert tribunal_por_numero(f"0001234-{dd}.2020.{segmento}.{tr}.0001") == esperado
+
+
+def test_tribunal_por_numero_unknown_court():
+    dd = calcular_digito_verificador("0001234", "2020", "1", "00", "0000")
+    with pytest.raises(NumeroInvalido):
+        tribunal_por_numero(f"0001234-{dd}.2020.1.00.0000")
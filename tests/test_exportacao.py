@@ -0,0 +1,82 @@
+import csv
+import json
+from unittest.mock import patch
+
+import pytest
+
+from exportacao import exportar, montar_filtros
+from judinfo_cli import DataJudSimple, ErroDataJud
+
+
+def pagina(inicio, fim, total):
+    hits = [{"_source": {"numeroProcesso": str(i), "classe": {"codigo": 7, "nome": "Proc"}}, "sort": [i]} for i in range(inicio, fim)]
+    return {"hits": {"hits": hits}} if inicio < total else {"hits": {"hits": []}}
+
+
+def fake_buscar(total, falhar_apos=None):
+    def buscar(tribunal, corpo):
+        inicio = corpo.get("search_after", [-1])[0] + 1
+        if falhar_apos is not None and inicio > falhar_apos:
+            return None
+        return pagina(inicio, min(inicio + corpo["size"], total), total)
+
+    return buscar
+
+
+def test_exportar_processos_pages_with_search_after():
+    client = DataJudSimple()
+    with patch.object(DataJudSimple, "_buscar", side_effect=fake_buscar(5)) as buscar:
+        paginas = list(client.exportar_processos("tjmg", tamanho_pagina=2))
+    assert [len(docs) for docs, _ in paginas] == [2, 2, 1]
+    assert buscar.call_args_list[1].args[1]["search_after"] == [1]
+
+
+def test_exportar_resumes_from_cursor(tmp_path):
+    destino = str(tmp_path / "tjmg.jsonl")
+    with patch.object(DataJudSimple, "_buscar", side_effect=fake_buscar(5, falhar_apos=2)):
+        with pytest.raises(ErroDataJud):
+            exportar(DataJudSimple(), "tjmg", destino, tamanho_pagina=2)
+    with patch.object(DataJudSimple, "_buscar", side_effect=fake_buscar(5)):
+        resultado = exportar(DataJudSimple(), "tjmg", destino, tamanho_pagina=2)
+
+    numeros = [json.loads(linha)["numeroProcesso"] for linha in open(destino)]
+    assert numeros == ["0", "1", "2", "3", "4"]
+    assert resultado["exportados"] == 5
+
+
+def test_exportar_csv_and_filters(tmp_path):
+    destino = str(tmp_path / "tjmg.csv")
+    filtros = montar_filtros(classe=7, desde="2020-01-01")
+    with patch.object(DataJudSimple, "_buscar", side_effect=fake_buscar(3)) as buscar:
+        exportar(DataJudSimple(), "tjmg", destino, formato="csv", filtros=filtros)
+    assert buscar.call_args.args[1]["query"]["bool"]["filter"] == filtros
+
+    linhas = list(csv.DictReader(open(destino, newline="")))
+    assert len(linhas) == 3
+    assert linhas[0]["classe_codigo"] == "7"
+
+
+def test_exportar_refuses_to_resume_in_another_format(tmp_path):
+    destino = str(tmp_path / "tjmg.out")
+    with patch.object(DataJudSimple, "_buscar", side_effect=fake_buscar(5, falhar_apos=2)):
+        with pytest.raises(ErroDataJud):
+            exportar(DataJudSimple(), "tjmg", destino, tamanho_pagina=2)
+    conteudo = open(destino).read()
+
+    with patch.object(DataJudSimple, "_buscar", side_effect=fake_buscar(5)):
+        with pytest.raises(ValueError):
+            exportar(DataJudSimple(), "tjmg", destino, formato="csv", tamanho_pagina=2)
+    assert open(destino).read() == conteudo
+
+
+def test_cli_exportar_rejects_unknown_court_before_creating_files(tmp_path):
+    from click.testing import CliRunner
+    from judinfo_cli import main
+
+    saida = tmp_path / "saida.jsonl"
+    with patch.object(DataJudSimple, "_buscar") as buscar:
+        resultado = CliRunner().invoke(main, ["exportar", "-t", "tjxx", "-o", str(saida)])
+    assert resultado.exit_code == 2
+    assert "Tribunal desconhecido" in resultado.output
+    buscar.assert_not_called()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,55 @@
+import io
+import json
+
+from indice import IndiceLocal, montar_consulta
+
+
+def documento(numero, orgao, assunto, grau="G1"):
+    return {
+        "numeroProcesso": numero,
+        "tribunal": "TJMG",
+        "grau": grau,
+        "classe": {"nome": "Procedimento Comum Cível"},
+        "orgaoJulgador": {"nome": orgao},
+        "assuntos": [{"nome": assunto}],
+        "movimentos": [{"nome": "Distribuição"}, {"nome": "Sentença"}, {"nome": "Distribuição"}],
+    }
+
+
+def test_search_by_field_ignores_accents_and_case(tmp_path):
+    indice = IndiceLocal(str(tmp_path / "indice.db"))
+    indice.indexar(documento("0001", "1ª Vara Cível de Belo Horizonte", "Dano Moral"), "tjmg")
+    indice.indexar(documento("0002", "2ª Vara de Família", "Alimentos"), "tjmg")
+
+    assert [r["numero"] for r in indice.buscar(orgao="vara civel")] == ["0001"]
+    assert [r["numero"] for r in indice.buscar(assunto="alimento")] == ["0002"]
+    assert {r["numero"] for r in indice.buscar("sentenca", tribunal="tjmg")} == {"0001", "0002"}
+    assert indice.buscar(orgao="familia", assunto="dano") == []
+
+
+def test_partial_document_keeps_indexed_fields(tmp_path):
+    indice = IndiceLocal(str(tmp_path / "indice.db"))
+    indice.indexar(documento("0001", "1ª Vara Cível", "Dano Moral"), "tjmg")
+    indice.indexar({"numeroProcesso": "0001", "grau": "G1", "classe": {"nome": "Apelação"}}, "tjmg")
+
+    assert indice.total() == 1
+    [resultado] = indice.buscar(orgao="civel")
+    assert resultado["classe"] == "Apelação"
+    assert resultado["assuntos"] == ["Dano Moral"]
+
+
+def test_reindex_accepts_exports_and_batch_output(tmp_path):
+    linhas = [
+        json.dumps(documento("0001", "Vara Única", "Furto")),
+        json.dumps({"numero": "0002", "situacao": "encontrado", "processo": documento("0002", "Vara Única", "Roubo")}),
+        json.dumps({"numero": "0003", "situacao": "nao_encontrado", "processo": None}),
+        "",
+    ]
+    indice = IndiceLocal(str(tmp_path / "indice.db"))
+    assert indice.reindexar(io.StringIO("\n".join(linhas))) == 2
+    assert len(indice.buscar(orgao="unica")) == 2
+
+
+def test_query_escapes_fts_syntax():
+    assert montar_consulta('a" OR b') == '"a"* "OR"* "b"*'
+    assert montar_consulta(orgao="vara") == 'orgao_julgador : ("vara"*)'
@@ -1,9 +1,16 @@
 import json
+import os
+import subprocess
+import sys
+import time
 from unittest.mock import patch, Mock
 
 import pytest
 
-from judinfo_cli import DataJudSimple, formatar_data
+from benchmarks.servidor_falso import PerfilTribunal, ServidorFalso, numero_cnj
+from judinfo_cli import CAMPOS_POR_SAIDA, DataJudSimple, formatar_data
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
 def make_mock_response(json_data, status_code=200):
@@ -13,7 +20,7 @@ def make_mock_response(json_data, status_code=200):
     return m
 
 
-@patch("judinfo_cli.requests.post")
+@patch("judinfo_cli.requests.Session.post")
 def test_consultar_processo_returns_first_hit(mock_post):
     fake = {"hits": {"total": {"value": 1}, "hits": [{"_source": {"numeroProcesso": "0001", "tribunal": "tjmg"}}]}}
     mock_post.return_value = make_mock_response(fake, 200)
@@ -24,7 +31,7 @@ def test_consultar_processo_returns_first_hit(mock_post):
     assert res.get("numeroProcesso") == "0001"
 
 
-@patch("judinfo_cli.requests.post")
+@patch("judinfo_cli.requests.Session.post")
 def test_consultar_processo_no_hits_returns_none(mock_post):
     fake = {"hits": {"total": {"value": 0}, "hits": []}}
     mock_post.return_value = make_mock_response(fake, 200)
@@ -34,7 +41,7 @@ def test_consultar_processo_no_hits_returns_none(mock_post):
     assert res is None
 
 
-@patch("judinfo_cli.requests.post")
+@patch("judinfo_cli.requests.Session.post")
 def test_verificar_tribunal_success(mock_post):
     # status code 200 -> success True
     mock_post.return_value = make_mock_response({"hits": {}}, 200)
@@ -43,7 +50,7 @@ def test_verificar_tribunal_success(mock_post):
     assert result.get("success") is True
 
 
-@patch("judinfo_cli.requests.post")
+@patch("judinfo_cli.requests.Session.post")
 def test_verificar_tribunal_request_exception(mock_post):
     import requests
 
@@ -61,3 +68,79 @@ def test_formatar_data_valid_and_invalid():
 
     # invalid input returns original or 'N/A'
     assert formatar_data(None) == "N/A"
+
+
+def test_consultar_em_tribunais_returns_hit():
+    client = DataJudSimple()
+    docs = {"tjsp": {"numeroProcesso": "0003", "tribunal": "TJSP"}}
+    def fake(numero, tribunal, campos=None, cancelado=None):
+        return ("encontrado", docs[tribunal]) if tribunal in docs else ("nao_encontrado", None)
+
+    with patch.object(DataJudSimple, "consultar_status", side_effect=fake):
+        concluidos = []
+        res = client.consultar_em_tribunais("0003", ["tjmg", "tjsp", "tjrj"], ao_concluir=concluidos.append)
+    assert res == [("tjsp", docs["tjsp"])]
+    assert "tjsp" in concluidos
+
+
+def test_consultar_em_tribunais_cancels_pending_after_hit():
+    client = DataJudSimple()
+    chamados = []
+
+    def fake(numero, tribunal, campos=None, cancelado=None):
+        chamados.append(tribunal)
+        return ("encontrado", {"numeroProcesso": numero}) if tribunal == "tjmg" else ("nao_encontrado", None)
+
+    with patch.object(DataJudSimple, "consultar_status", side_effect=fake):
+        res = client.consultar_em_tribunais("0004", ["tjmg", "tjsp", "tjrj", "tjba"], concorrencia=1)
+    assert res == [("tjmg", {"numeroProcesso": "0004"})]
+    assert chamados == ["tjmg"]
+
+
+def test_cli_exits_promptly_after_hit(tmp_path):
+    # Só o TJSP responde na hora; os demais tribunais seguram a resposta por 5 s
+    servidor = ServidorFalso(
+        perfis={"tjsp": PerfilTribunal(processos=1)}, padrao=PerfilTribunal(latencia=5, processos=0)
+    )
+    ambiente = dict(
+        os.environ,
+        JUDINFO_BASE_URL=servidor.iniciar(),
+        JUDINFO_CACHE=str(tmp_path / "cache.db"),
+        JUDINFO_INDICE=str(tmp_path / "indice.db"),
+    )
+    inicio = time.monotonic()
+    try:
+        execucao = subprocess.run(
+            [sys.executable, "judinfo_cli.py", "-p", numero_cnj(1), "-t", "all", "-c", "8"],
+            cwd=RAIZ, env=ambiente, capture_output=True, text=True, timeout=30,
+        )
+    finally:
+        servidor.parar()
+    assert "ENCONTRADO no tribunal: TJSP" in execucao.stdout
+    assert time.monotonic() - inicio < 3
+
+
+def test_session_is_per_thread_and_shares_pool():
+    import threading
+
+    client = DataJudSimple(pool_size=4)
+    sessoes = []
+    t = threading.Thread(target=lambda: sessoes.append(client.session))
+    t.start()
+    t.join()
+    assert client.session is client.session
+    assert sessoes[0] is not client.session
+    assert sessoes[0].get_adapter(client.base_url) is client.session.get_adapter(client.base_url)
+
+
+@patch("judinfo_cli.requests.Session.post")
+def test_consultar_processo_sends_source_projection(mock_post):
+    fake = {"hits": {"total": {"value": 0}, "hits": []}}
+    mock_post.return_value = make_mock_response(fake, 200)
+
+    client = DataJudSimple()
+    client.consultar_processo("0005", "tjmg", CAMPOS_POR_SAIDA["resumo"])
+    assert mock_post.call_args.kwargs["json"]["_source"] == CAMPOS_POR_SAIDA["resumo"]
+
+    client.consultar_processo("0005", "tjmg", CAMPOS_POR_SAIDA["json"])
+    assert "_source" not in mock_post.call_args.kwargs["json"]
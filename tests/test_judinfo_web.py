@@ -0,0 +1,162 @@
+import gzip
+import json
+from unittest.mock import patch
+
+from judinfo_cli import DataJudSimple
+from judinfo_web import app
+
+
+def test_search_stream_sends_one_line_per_court_and_stops_on_hit():
+    docs = {"tjsp": {"numeroProcesso": "0001"}}
+    def fake(numero, tribunal, campos=None, cancelado=None):
+        return ("encontrado", docs[tribunal]) if tribunal in docs else ("nao_encontrado", None)
+
+    with patch.object(DataJudSimple, "consultar_status", side_effect=fake), \
+            patch("judinfo_web.monitor.iniciar"):
+        response = app.test_client().post(
+            "/search/stream", json={"numero": "0001", "tribunais": ["tjsp", "tjmg", "tjrj"]}
+        )
+        linhas = [json.loads(linha) for linha in response.get_data(as_text=True).splitlines()]
+
+    assert response.mimetype == "application/x-ndjson"
+    assert linhas[-1] == {"tribunal": "tjsp", "situacao": "encontrado", "encontrado": True, "processo": docs["tjsp"]}
+    assert all(not linha["encontrado"] for linha in linhas[:-1])
+
+
+def test_search_rejects_invalid_number_for_auto_routing():
+    with patch("judinfo_web.monitor.iniciar"):
+        response = app.test_client().post("/search", json={"numero": "123", "tribunais": "auto"})
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_indice_route_searches_local_index(tmp_path):
+    from indice import IndiceLocal
+
+    indice = IndiceLocal(str(tmp_path / "indice.db"))
+    indice.indexar({"numeroProcesso": "0001", "grau": "G1", "orgaoJulgador": {"nome": "Vara Única"}}, "tjac")
+    with patch("judinfo_web.client.indice", indice), patch("judinfo_web.monitor.iniciar"):
+        cliente = app.test_client()
+        encontrados = cliente.get("/indice?orgao=unica").get_json()
+        sem_filtro = cliente.get("/indice")
+        limites = {limite: cliente.get(f"/indice?orgao=unica&limite={limite}").status_code
+                   for limite in ("-1", "0", "1001", "abc", "1", "1000")}
+    assert [r["numero"] for r in encontrados] == ["0001"]
+    assert sem_filtro.status_code == 400
+    assert limites == {"-1": 400, "0": 400, "1001": 400, "abc": 400, "1": 200, "1000": 200}
+
+
+def test_courts_uses_etag_and_gzip():
+    with patch("judinfo_web.monitor.iniciar"), patch("judinfo_web.LIMIAR_COMPRESSAO", 256), \
+            patch("judinfo_web.comprimir_corpo") as comprimir_corpo:
+        cliente = app.test_client()
+        primeira = cliente.get("/courts", headers={"Accept-Encoding": "gzip"})
+        etag = primeira.headers["ETag"]
+        repetida = cliente.get("/courts", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+
+    assert primeira.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in primeira.headers["Vary"]
+    assert etag.endswith('-gzip"')
+    assert "max-age" in primeira.headers["Cache-Control"]
+    assert "Estadual" in gzip.decompress(primeira.data).decode("utf-8")
+    assert repetida.status_code == 304
+    # Corpo comprimido calculado na importação, não a cada requisição
+    assert not comprimir_corpo.called
+
+
+def test_processo_returns_304_until_case_changes():
+    doc = {"numeroProcesso": "0001", "dataHoraUltimaAtualizacao": "2024-05-01T12:00:00.000Z", "movimentos": []}
+    with patch.object(DataJudSimple, "consultar_status", side_effect=lambda *a, **k: ("encontrado", dict(doc))), \
+            patch("judinfo_web.monitor.iniciar"):
+        cliente = app.test_client()
+        primeira = cliente.get("/processo/tjsp/0001")
+        etag = primeira.headers["ETag"]
+        igual = cliente.get("/processo/tjsp/0001", headers={"If-None-Match": etag})
+        doc["dataHoraUltimaAtualizacao"] = "2024-06-01T12:00:00.000Z"
+        mudou = cliente.get("/processo/tjsp/0001", headers={"If-None-Match": etag})
+        desconhecido = cliente.get("/processo/xyz/0001")
+
+    assert primeira.status_code == 200 and primeira.get_json()["numeroProcesso"] == "0001"
+    assert primeira.headers["Last-Modified"] == "Wed, 01 May 2024 12:00:00 GMT"
+    assert igual.status_code == 304 and not igual.data
+    assert mudou.status_code == 200 and mudou.headers["ETag"] != etag
+    assert desconhecido.status_code == 404
+
+
+def test_304_keeps_encoding_suffix_and_vary():
+    doc = {"numeroProcesso": "0001", "dataHoraUltimaAtualizacao": "2024-05-01T12:00:00.000Z",
+           "movimentos": [{"nome": f"Movimento {i}", "dataHora": "2024-01-01T00:00:00Z"} for i in range(60)]}
+    with patch.object(DataJudSimple, "consultar_status", return_value=("encontrado", doc)), \
+            patch("judinfo_web.monitor.iniciar"):
+        cliente = app.test_client()
+        for url in ("/processo/tjsp/0001", "/static/script.js"):
+            primeira = cliente.get(url, headers={"Accept-Encoding": "gzip"})
+            repetida = cliente.get(url, headers={"Accept-Encoding": "gzip", "If-None-Match": primeira.headers["ETag"]})
+            assert primeira.headers["Content-Encoding"] == "gzip", url
+            assert repetida.status_code == 304 and not repetida.data, url
+            assert repetida.headers["ETag"] == primeira.headers["ETag"], url
+            assert "Accept-Encoding" in repetida.headers["Vary"], url
+
+
+def test_search_routes_reject_malformed_campos():
+    with patch.object(DataJudSimple, "consultar_status") as consultar, patch("judinfo_web.monitor.iniciar"):
+        cliente = app.test_client()
+        for rota in ("/search", "/search/stream"):
+            for campos in ("numeroProcesso", {"includes": ["x"]}, ["numeroProcesso", 1], ["senha"], ["classe nome"]):
+                response = cliente.post(rota, json={"numero": "0001", "tribunais": ["tjsp"], "campos": campos})
+                assert response.status_code == 400, (rota, campos)
+        valida = cliente.post("/search", json={"numero": "0001", "tribunais": ["tjsp"], "campos": ["classe.nome"]})
+    assert valida.status_code == 200
+    assert consultar.call_count == 1
+
+
+def test_search_routes_validate_ultimos_movimentos():
+    doc = {"numeroProcesso": "0001", "movimentos": [{"dataHora": "2024-01-0%dT00:00:00Z" % d} for d in (1, 2, 3)]}
+    with patch.object(DataJudSimple, "consultar_status", return_value=("encontrado", doc)), \
+            patch("judinfo_web.monitor.iniciar"):
+        cliente = app.test_client()
+        for rota in ("/search", "/search/stream"):
+            for ultimos in ("x", [2], -1, True, 1.5):
+                response = cliente.post(rota, json={"numero": "0001", "tribunais": ["tjsp"], "ultimos_movimentos": ultimos})
+                assert response.status_code == 400, (rota, ultimos)
+        aparado = cliente.post("/search", json={"numero": "0001", "tribunais": ["tjsp"], "ultimos_movimentos": "2"})
+        negativo = cliente.get("/processo/tjsp/0001?ultimos_movimentos=-1")
+
+    assert len(aparado.get_json()[0]["movimentos"]) == 2
+    assert negativo.status_code == 400
+
+
+def test_unknown_courts_are_rejected_without_creating_state():
+    from judinfo_web import monitor
+
+    with patch("judinfo_web.monitor.iniciar"), patch.object(DataJudSimple, "consultar_status") as consultar:
+        cliente = app.test_client()
+        status = cliente.post("/status", json={"tribunais": ["tjsp", "nao-existe"]})
+        busca = cliente.post("/search", json={"numero": "0001", "tribunais": ["xyz"]})
+        fluxo = cliente.post("/search/stream", json={"numero": "0001", "tribunais": "tjsp"})
+
+    assert status.status_code == busca.status_code == fluxo.status_code == 400
+    assert not consultar.called
+    assert monitor.situacao("outro-inexistente")["circuito_aberto"] is False
+    assert "outro-inexistente" not in monitor._estados and "nao-existe" not in monitor._estados
+
+
+def test_monitor_is_opt_in_and_status_rechecks_only_stale_results():
+    from judinfo_web import monitor
+
+    with patch("judinfo_web.monitor.iniciar") as iniciar, \
+            patch.object(DataJudSimple, "verificar_tribunal", return_value={"success": True}) as verificar:
+        cliente = app.test_client()
+        cliente.get("/courts")
+        assert not iniciar.called
+        with patch("judinfo_web.MONITOR_INTERVALO", 30):
+            cliente.get("/courts")
+        assert iniciar.called
+
+        monitor._estados.pop("tjac", None)
+        for _ in range(2):
+            assert cliente.post("/status", json={"tribunais": ["tjac"]}).get_json()["tjac"]["success"] is True
+        assert verificar.call_count == 1
+        with patch("judinfo_web.IDADE_MAX_STATUS", -1):
+            cliente.post("/status", json={"tribunais": ["tjac"]})
+        assert verificar.call_count == 2
@@ -0,0 +1,89 @@
+import io
+import json
+from unittest.mock import patch
+
+from cnj import calcular_digito_verificador
+from judinfo_cli import DataJudSimple
+from lote import RegistroLote, processar_lote
+
+
+def numero_cnj(sequencial, segmento="8", tr="13"):
+    dd = calcular_digito_verificador(sequencial, "2020", segmento, tr, "0001")
+    return f"{sequencial}{dd}2020{segmento}{tr}0001"
+
+
+def fake_lote(numeros, tribunal):
+    return {n: ("encontrado", {"numeroProcesso": n}) if n.startswith("1") else ("nao_encontrado", None) for n in numeros}
+
+
+def test_processar_lote_groups_by_court_and_writes_ndjson():
+    numeros = [numero_cnj("1000001"), numero_cnj("2000002"), numero_cnj("1000003", tr="26"), "123"]
+    saida = io.StringIO()
+    with patch.object(DataJudSimple, "consultar_lote", side_effect=fake_lote) as api:
+        contagem = processar_lote(DataJudSimple(), numeros, saida, tamanho_grupo=10)
+
+    linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+    assert len(linhas) == 4
+    assert sorted(c.args[1] for c in api.call_args_list) == ["tjmg", "tjsp"]
+    assert contagem == {"encontrado": 2, "nao_encontrado": 1, "invalido": 1}
+    por_numero = {linha["numero"]: linha for linha in linhas}
+    assert por_numero[numeros[0]]["processo"] == {"numeroProcesso": numeros[0]}
+    assert por_numero[numeros[2]]["tribunal"] == "tjsp"
+
+
+def test_processar_lote_resumes_from_checkpoint(tmp_path):
+    checkpoint = tmp_path / "lote.ckpt"
+    numeros = [numero_cnj("1000001"), numero_cnj("1000002"), numero_cnj("1000003")]
+    # Checkpoint no formato antigo (texto) é convertido para SQLite
+    checkpoint.write_text(numeros[0] + "\n")
+
+    def executar(entrada):
+        saida = io.StringIO()
+        with patch.object(DataJudSimple, "consultar_lote", side_effect=fake_lote):
+            processar_lote(DataJudSimple(), entrada, saida, checkpoint=str(checkpoint))
+        return [json.loads(linha)["numero"] for linha in saida.getvalue().splitlines()]
+
+    assert executar(numeros[:2]) == [numeros[1]]
+    assert executar(numeros) == [numeros[2]]
+    registro = RegistroLote(str(checkpoint))
+    assert all(registro.concluido(n) for n in numeros)
+    registro.fechar()
+
+
+def test_processar_lote_outputs_every_line_or_marks_duplicates(tmp_path):
+    numero = numero_cnj("1000001")
+    for deduplicar, situacoes in ((False, ["encontrado", "encontrado"]), (True, ["duplicado", "encontrado"])):
+        saida = io.StringIO()
+        with patch.object(DataJudSimple, "consultar_lote", side_effect=fake_lote) as api:
+            contagem = processar_lote(
+                DataJudSimple(), [numero, numero], saida,
+                checkpoint=str(tmp_path / f"{deduplicar}.ckpt"), deduplicar=deduplicar,
+            )
+        linhas = [json.loads(linha) for linha in saida.getvalue().splitlines()]
+        assert sorted(linha["situacao"] for linha in linhas) == situacoes
+        assert sum(contagem.values()) == 2
+        # Repetições no mesmo grupo viram uma única consulta
+        assert api.call_args.args[0] == [numero]
+
+
+def test_consultar_lote_single_request_maps_hits():
+    client = DataJudSimple()
+    data = {"hits": {"total": {"value": 1}, "hits": [{"_source": {"numeroProcesso": "00000011"}}]}}
+    with patch.object(DataJudSimple, "_buscar", return_value=data) as buscar:
+        res = client.consultar_lote(["00000011", "00000022"], "tjmg")
+    assert buscar.call_count == 1
+    assert res["00000011"][0] == "encontrado"
+    assert res["00000022"] == ("nao_encontrado", None)
+
+
+def test_cli_lote_rejects_unknown_court(tmp_path):
+    from click.testing import CliRunner
+    from judinfo_cli import main
+
+    entrada = tmp_path / "numeros.txt"
+    entrada.write_text(numero_cnj("1000001") + "\n", encoding="utf-8")
+    with patch.object(DataJudSimple, "consultar_lote") as api:
+        resultado = CliRunner().invoke(main, ["-l", str(entrada), "-t", "tjxx", "--sem-cache"])
+    assert resultado.exit_code == 2
+    assert "Tribunal desconhecido: tjxx" in resultado.output
+    assert not api.called
@@ -0,0 +1,71 @@
+import time
+from unittest.mock import Mock, patch
+
+from judinfo_cli import DataJudSimple
+from judinfo_web import app
+from metricas import Metricas, metricas
+
+
+def resposta(status_code, json_data=None):
+    m = Mock()
+    m.status_code = status_code
+    m.headers = {}
+    m.content = b'{"hits": {"hits": []}}'
+    m.json.return_value = json_data
+    return m
+
+
+def test_disabled_registry_records_nothing():
+    registro = Metricas()
+    registro.incrementar("x_total", tribunal="tjsp")
+    registro.observar("y_segundos", 0.2)
+    assert registro.contador("x_total") == 0
+    assert registro.soma("y_segundos") == (0, 0)
+
+
+def test_prometheus_text_format():
+    registro = Metricas(ativo=True)
+    registro.descrever("judinfo_requisicao_segundos", "Latência.", limites=(0.1, 1.0))
+    registro.observar("judinfo_requisicao_segundos", 0.05, tribunal="tjsp")
+    registro.observar("judinfo_requisicao_segundos", 0.5, tribunal="tjsp")
+    registro.incrementar("judinfo_erros_total", tribunal='t"j')
+
+    linhas = registro.exportar_prometheus().splitlines()
+    assert 'judinfo_erros_total{tribunal="t\\"j"} 1' in linhas
+    assert "# HELP judinfo_requisicao_segundos Latência." in linhas
+    assert "# TYPE judinfo_requisicao_segundos histogram" in linhas
+    assert 'judinfo_requisicao_segundos_bucket{tribunal="tjsp",le="0.1"} 1' in linhas
+    assert 'judinfo_requisicao_segundos_bucket{tribunal="tjsp",le="+Inf"} 2' in linhas
+    assert 'judinfo_requisicao_segundos_count{tribunal="tjsp"} 2' in linhas
+
+
+@patch("judinfo_cli.requests.Session.post")
+def test_buscar_records_latency_bytes_and_retries(mock_post):
+    metricas.habilitar()
+    mock_post.side_effect = [resposta(503), resposta(200, {"hits": {"total": {"value": 0}, "hits": []}})]
+    DataJudSimple(backoff_base=0).consultar_status("0001", "tjmg")
+
+    assert metricas.contador("judinfo_novas_tentativas_total") == 1
+    # Tempo de rede de cada POST enviado, inclusive o que voltou 503
+    assert metricas.soma("judinfo_requisicao_segundos")[1] == 2
+    assert metricas.soma("judinfo_resposta_bytes")[0] == len(b'{"hits": {"hits": []}}')
+    assert metricas.soma("judinfo_decodificacao_segundos")[1] == 1
+
+
+@patch("judinfo_cli.requests.Session.post")
+def test_limiter_wait_is_not_counted_as_network_time(mock_post):
+    metricas.habilitar()
+    mock_post.return_value = resposta(200, {"hits": {"total": {"value": 0}, "hits": []}})
+    client = DataJudSimple()
+    with patch.object(client.limitador, "adquirir", side_effect=lambda: time.sleep(0.05)):
+        client.consultar_status("0001", "tjmg")
+
+    assert metricas.soma("judinfo_espera_limitador_segundos")[0] >= 0.05
+    assert metricas.soma("judinfo_requisicao_segundos")[0] < 0.05
+
+
+def test_metrics_endpoint():
+    with patch("judinfo_web.monitor.iniciar"):
+        response = app.test_client().get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
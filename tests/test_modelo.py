@@ -0,0 +1,61 @@
+from modelo import Processo, chave_data, converter_data
+
+DOC = {
+    "numeroProcesso": "0001",
+    "classe": {"nome": "Procedimento Comum"},
+    "dataAjuizamento": "2020-03-10T00:00:00.000Z",
+    "movimentos": [
+        {"nome": "Distribuição", "dataHora": "2020-03-10T10:00:00.000Z"},
+        {"nome": "Sentença", "dataHora": "2023-01-05T10:00:00.000Z"},
+        {"nome": "Citação", "dataHora": "2020-06-01T10:00:00.000Z"},
+        {"nome": "Juntada", "dataHora": "2023-01-05T10:00:00.000Z"},
+    ],
+}
+
+
+def test_last_movimentos_by_date_without_decoding_all():
+    processo = Processo(DOC)
+    assert processo.total_movimentos == 4
+    assert [m.nome for m in processo.ultimos_movimentos(3)] == ["Juntada", "Sentença", "Citação"]
+    assert processo._movimentos is None  # Só os pedidos foram criados
+    assert processo.ultimo_movimento.data_hora.year == 2023
+    assert processo.classe == "Procedimento Comum"
+    assert processo.data_ajuizamento.month == 3
+
+
+def test_como_dict_trims_to_most_recent_in_chronological_order():
+    processo = Processo(DOC)
+    assert processo.como_dict() is DOC
+    resumido = processo.como_dict(ultimos_movimentos=2)
+    assert [m["nome"] for m in resumido["movimentos"]] == ["Sentença", "Juntada"]
+    assert resumido["totalMovimentos"] == 4
+    assert len(DOC["movimentos"]) == 4
+
+
+def test_converter_data_handles_invalid_values():
+    assert converter_data("não é data") is None
+    assert converter_data(None) is None
+
+
+def test_last_movimentos_with_mixed_date_formats():
+    processo = Processo({"movimentos": [
+        {"nome": "A", "dataHora": "2024-01-01T12:00:00.000Z"},
+        {"nome": "B", "dataHora": "20240102000000"},              # 02/01 00:00 UTC
+        {"nome": "C", "dataHora": "2024-01-01T23:30:00-03:00"},   # 02/01 02:30 UTC
+        {"nome": "D", "dataHora": "2024-01-01T13:00:00Z"},        # sem milissegundos
+        {"nome": "E", "dataHora": "inválida"},
+    ]})
+    assert [m.nome for m in processo.ultimos_movimentos(4)] == ["C", "B", "D", "A"]
+    assert chave_data("20240102000000") == "2024-01-02T00:00:00.000"
+    assert chave_data(None) == ""
+
+
+def test_renderers_accept_plain_dict(capsys):
+    from judinfo_cli import exibir_completo, exibir_resumo
+
+    exibir_resumo(DOC)
+    exibir_completo(Processo(DOC))
+    exibir_completo(DOC)
+    saida = capsys.readouterr().out
+    assert saida.count("Procedimento Comum") == 3
+    assert "Juntada" in saida
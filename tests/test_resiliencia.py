@@ -0,0 +1,116 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+import pytest
+import requests
+
+from judinfo_cli import DataJudSimple
+from resiliencia import LimitadorAdaptativo, espera_backoff, espera_retry_after
+
+
+def resposta(status_code, json_data=None, headers=None):
+    m = Mock()
+    m.status_code = status_code
+    m.headers = headers or {}
+    m.json.return_value = json_data
+    return m
+
+
+SEM_HITS = {"hits": {"total": {"value": 0}, "hits": []}}
+
+
+def test_backoff_and_retry_after():
+    assert 0 <= espera_backoff(3, base=0.5, maximo=2) <= 2
+    assert espera_retry_after("3") == 3.0
+    assert espera_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") is None
+
+
+@patch("judinfo_cli.requests.Session.post")
+def test_buscar_retries_on_503_then_succeeds(mock_post):
+    mock_post.side_effect = [resposta(503), resposta(200, SEM_HITS)]
+    client = DataJudSimple(backoff_base=0)
+    assert client.consultar_status("0001", "tjmg") == ("nao_encontrado", None)
+    assert mock_post.call_count == 2
+
+
+@patch("judinfo_cli.requests.Session.post")
+def test_consultar_status_reports_error_distinct_from_not_found(mock_post):
+    mock_post.return_value = resposta(429, headers={"Retry-After": "0"})
+    client = DataJudSimple(tentativas=2, backoff_base=0)
+    assert client.consultar_status("0001", "tjmg") == ("erro", None)
+    assert mock_post.call_count == 2
+
+    mock_post.reset_mock()
+    mock_post.return_value = resposta(400)
+    assert client.consultar_status("0001", "tjmg") == ("erro", None)
+    assert mock_post.call_count == 1
+
+
+def test_limitador_halves_on_overload_and_ramps_up():
+    limitador = LimitadorAdaptativo(taxa=1000, rajada=100, concorrencia_max=8)
+    limitador.adquirir()
+    limitador.liberar(sobrecarga=True)
+    assert limitador.limite == 4
+    for _ in range(4):
+        limitador.adquirir()
+        limitador.liberar()
+    assert limitador.limite == 5
+
+
+def test_limitador_bounds_concurrency():
+    limitador = LimitadorAdaptativo(taxa=1000, rajada=100, concorrencia_max=1)
+    limitador.adquirir()
+    liberado = threading.Event()
+
+    def segundo():
+        limitador.adquirir()
+        liberado.set()
+        limitador.liberar()
+
+    t = threading.Thread(target=segundo)
+    t.start()
+    assert not liberado.wait(0.05)
+    limitador.liberar()
+    assert liberado.wait(1)
+    t.join()
+
+
+def test_hedged_request_returns_faster_answer():
+    client = DataJudSimple(hedge=True)
+    for _ in range(20):
+        client._registrar("tjmg", True, 0.01)
+
+    chamadas = []
+
+    def post(url, json=None, timeout=None):
+        chamadas.append(url)
+        if len(chamadas) == 1:
+            time.sleep(0.5)  # primeira requisição "presa"
+        return resposta(200, SEM_HITS)
+
+    with patch("judinfo_cli.requests.Session.post", side_effect=post):
+        inicio = time.monotonic()
+        assert client.consultar_status("0001", "tjmg") == ("nao_encontrado", None)
+    assert time.monotonic() - inicio < 0.4
+    assert len(chamadas) == 2
+
+    executor = client._executor_hedge
+    client.fechar()
+    assert client._executor_hedge is None
+    with pytest.raises(RuntimeError):
+        executor.submit(time.sleep, 0)
+
+
+def test_hedged_request_raises_when_both_attempts_fail():
+    client = DataJudSimple(hedge=True)
+    for _ in range(20):
+        client._registrar("tjmg", True, 0.01)
+
+    def post(url, json=None, timeout=None):
+        time.sleep(0.05)
+        raise requests.exceptions.ConnectionError("recusada")
+
+    with patch("judinfo_cli.requests.Session.post", side_effect=post):
+        with pytest.raises(requests.exceptions.ConnectionError):
+            client._post("tjmg", "http://127.0.0.1:9/_search", {})
@@ -0,0 +1,55 @@
+from unittest.mock import Mock, patch
+
+from judinfo_cli import DataJudSimple
+from saude import MonitorTribunais, percentil
+
+
+def test_percentil_nearest_rank():
+    assert percentil([], 50) is None
+    assert percentil([3.0, 1.0, 2.0, 4.0], 50) == 2.0
+    assert percentil([float(i) for i in range(1, 101)], 95) == 95.0
+
+
+def test_circuit_opens_after_consecutive_failures_and_closes_on_success():
+    monitor = MonitorTribunais(Mock(), ["tjmg"], limiar_falhas=2, tempo_aberto=60)
+    monitor.registrar("tjmg", False)
+    assert monitor.disponivel("tjmg")
+    monitor.registrar("tjmg", False)
+    assert not monitor.disponivel("tjmg")
+    assert monitor.situacao("tjmg")["circuito_aberto"] is True
+
+    monitor.registrar("tjmg", True, 0.2)
+    assert monitor.disponivel("tjmg")
+    assert monitor.situacao("tjmg")["taxa_erro"] == 2 / 3
+
+
+def test_verificar_caches_results_with_latency():
+    client = Mock()
+    client.verificar_tribunal.side_effect = lambda t: {"success": t != "tjsp", "status_code": 200 if t != "tjsp" else 503}
+    monitor = MonitorTribunais(client, ["tjmg", "tjsp"])
+    concluidos = []
+    resultados = monitor.verificar(ao_concluir=concluidos.append)
+
+    assert list(resultados) == ["tjmg", "tjsp"]
+    assert sorted(concluidos) == ["tjmg", "tjsp"]
+    situacao = monitor.situacao("tjmg")
+    assert situacao["success"] is True
+    assert situacao["latencia_p50"] is not None
+    assert monitor.situacao("tjsp")["success"] is False
+
+
+def test_fan_out_skips_open_circuits():
+    client = DataJudSimple()
+    client.monitor = MonitorTribunais(client, [], limiar_falhas=1)
+    client.monitor.registrar("tjsp", False)
+    with patch.object(DataJudSimple, "consultar_status", return_value=("nao_encontrado", None)) as consultar:
+        assert client.consultar_em_tribunais("0001", ["tjmg", "tjsp"]) == []
+    assert [c.args[1] for c in consultar.call_args_list] == ["tjmg"]
+
+
+def test_verificar_tribunal_goes_through_limiter():
+    client = DataJudSimple()
+    with patch("judinfo_cli.requests.Session.post", return_value=Mock(status_code=200)), \
+            patch.object(client.limitador, "adquirir") as adquirir:
+        assert client.verificar_tribunal("tjmg")["success"] is True
+    assert adquirir.call_count == 1
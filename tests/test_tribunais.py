@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+from cnj import TABELA_ROTEAMENTO
+from judinfo_cli import get_all_courts, get_all_courts_categorized
+from tribunais import CATEGORIAS, CODIGOS, POR_CATEGORIA, TRIBUNAIS, obter
+
+
+def test_registry_is_consistent_and_read_only():
+    assert len(TRIBUNAIS) == len(CODIGOS) == 91
+    assert sorted(c for codigos in POR_CATEGORIA.values() for c in codigos) == sorted(CODIGOS)
+    assert obter("TJSP").nome == "TJ São Paulo"
+    assert obter("tjm-xx") is None
+    assert set(TABELA_ROTEAMENTO.values()) == set(CODIGOS)
+    try:
+        TRIBUNAIS["novo"] = None
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("o catálogo deveria ser somente leitura")
+
+
+def test_cli_and_web_share_the_registry():
+    assert get_all_courts() == list(CODIGOS)
+    assert list(get_all_courts_categorized()) == list(CATEGORIAS)
+
+
+def test_listing_courts_does_not_import_http_stack():
+    codigo = (
+        "import sys, judinfo_cli\n"
+        "try:\n"
+        "    judinfo_cli.main(['-lt'])\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print('carregados:', [m for m in ('urllib3', 'flask') if m in sys.modules])"
+    )
+    saida = subprocess.run([sys.executable, "-c", codigo], capture_output=True, text=True, check=True).stdout
+    assert saida.strip().splitlines()[-1] == "carregados: []"
@@ -0,0 +1,93 @@
+from unittest.mock import patch
+
+import pytest
+import requests
+
+from cnj import calcular_digito_verificador
+from judinfo_cli import DataJudSimple
+from vigia import Carteira, FalhaEmissao, emissor_callback, executar_ciclo
+
+
+def numero_cnj(sequencial, tr="13"):
+    dd = calcular_digito_verificador(sequencial, "2020", "8", tr, "0001")
+    return f"{sequencial}{dd}2020.8.{tr}.0001"
+
+
+def documento(numero, atualizacao, datas):
+    return {
+        "numeroProcesso": numero.replace(".", ""),
+        "dataHoraUltimaAtualizacao": atualizacao,
+        "movimentos": [{"nome": f"Mov {d}", "dataHora": d} for d in datas],
+    }
+
+
+def test_executar_ciclo_one_query_per_court_and_emits_only_new(tmp_path):
+    carteira = Carteira(str(tmp_path / "vigia.db"))
+    a, b, c = numero_cnj("0000001"), numero_cnj("0000002"), numero_cnj("0000003", tr="26")
+    assert carteira.adicionar([a, b, c, "invalido"]) == ["invalido"]
+
+    respostas = {
+        "tjmg": [documento(a, "2024-01-01T00:00:00", ["2023-12-01T00:00:00"])],
+        "tjsp": [documento(c, "2024-01-01T00:00:00", [])],
+    }
+    eventos = []
+    with patch.object(DataJudSimple, "buscar_atualizados", side_effect=lambda t, n, d: respostas[t]) as busca:
+        assert executar_ciclo(DataJudSimple(), carteira, eventos.append) == 0
+    assert sorted(call.args[0] for call in busca.call_args_list) == ["tjmg", "tjsp"]
+    assert eventos == []
+
+    respostas["tjmg"] = [documento(a, "2024-02-01T00:00:00", ["2023-12-01T00:00:00", "2024-02-01T00:00:00"])]
+    respostas["tjsp"] = []
+    with patch.object(DataJudSimple, "buscar_atualizados", side_effect=lambda t, n, d: respostas[t]) as busca:
+        assert executar_ciclo(DataJudSimple(), carteira, eventos.append) == 1
+
+    assert [e["novos_movimentos"] for e in eventos] == [[{"nome": "Mov 2024-02-01T00:00:00", "dataHora": "2024-02-01T00:00:00"}]]
+    desdes = {call.args[0]: call.args[2] for call in busca.call_args_list if call.args[2]}
+    assert desdes == {"tjmg": "2024-01-01T00:00:00", "tjsp": "2024-01-01T00:00:00"}
+
+
+def test_executar_ciclo_emits_movimento_with_same_timestamp_as_last_seen(tmp_path):
+    carteira = Carteira(str(tmp_path / "vigia.db"))
+    a = numero_cnj("0000001")
+    carteira.adicionar([a])
+    mesmo_horario = "2024-02-01T10:00:00.000Z"
+    doc = documento(a, "2024-02-01T10:00:00", ["2024-01-01T00:00:00.000Z", mesmo_horario])
+    eventos = []
+    with patch.object(DataJudSimple, "buscar_atualizados", return_value=[doc]):
+        executar_ciclo(DataJudSimple(), carteira, eventos.append)
+
+    # Mesmo horário do último visto, mas outro movimento (ex: registrado no mesmo ato)
+    doc = dict(doc, dataHoraUltimaAtualizacao="2024-02-01T11:00:00")
+    doc["movimentos"] = doc["movimentos"] + [{"nome": "Juntada", "codigo": 85, "dataHora": mesmo_horario}]
+    with patch.object(DataJudSimple, "buscar_atualizados", return_value=[doc]):
+        assert executar_ciclo(DataJudSimple(), carteira, eventos.append) == 1
+    assert [m["nome"] for m in eventos[0]["novos_movimentos"]] == ["Juntada"]
+
+
+def test_failed_emission_keeps_state_and_retries_next_cycle(tmp_path):
+    carteira = Carteira(str(tmp_path / "vigia.db"))
+    a = numero_cnj("0000001")
+    carteira.adicionar([a])
+    with patch.object(DataJudSimple, "buscar_atualizados",
+                      return_value=[documento(a, "2024-01-01T00:00:00Z", ["2023-12-01T00:00:00Z"])]):
+        executar_ciclo(DataJudSimple(), carteira, lambda evento: None)
+
+    def falhar(evento):
+        raise FalhaEmissao("webhook fora do ar")
+
+    # 00:00:00.500Z é posterior a 00:00:00Z, embora venha antes na comparação de texto
+    doc = documento(a, "2024-01-01T00:00:00.500Z", ["2023-12-01T00:00:00Z", "2024-01-01T00:00:00Z"])
+    eventos = []
+    with patch.object(DataJudSimple, "buscar_atualizados", return_value=[doc]):
+        assert executar_ciclo(DataJudSimple(), carteira, falhar) == 0
+        assert executar_ciclo(DataJudSimple(), carteira, eventos.append) == 1
+        assert executar_ciclo(DataJudSimple(), carteira, eventos.append) == 0
+    assert [m["dataHora"] for m in eventos[0]["novos_movimentos"]] == ["2024-01-01T00:00:00Z"]
+
+
+def test_emissor_callback_retries_then_raises():
+    with patch("vigia.requests.Session.post", side_effect=requests.exceptions.ConnectionError("recusada")) as post:
+        emitir = emissor_callback("http://127.0.0.1:9/eventos", tentativas=2, backoff_base=0)
+        with pytest.raises(FalhaEmissao, match="recusada"):
+            emitir({"numero": "1"})
+    assert post.call_count == 2
@@ -0,0 +1,77 @@
+"""Catálogo dos tribunais atendidos pela API pública do DataJud.
+
+Montado uma única vez na importação e somente leitura: `TRIBUNAIS` dá acesso
+O(1) por código, `CODIGOS` mantém a ordem de exibição e `POR_CATEGORIA`
+agrupa os códigos. CLI, app web e roteamento por número CNJ (`cnj.py`) usam
+este mesmo catálogo. O módulo não importa nada além da biblioteca padrão,
+para que comandos como `judinfo -lt` iniciem rápido.
+"""
+from types import MappingProxyType
+from typing import Mapping, NamedTuple, Optional, Tuple
+
+# Unidades da federação na ordem usada pelo CNJ para o campo TR (01 a 27)
+UFS = (
+    ('ac', 'Acre'), ('al', 'Alagoas'), ('ap', 'Amapá'), ('am', 'Amazonas'), ('ba', 'Bahia'),
+    ('ce', 'Ceará'), ('df', 'Distrito Federal'), ('es', 'Espírito Santo'), ('go', 'Goiás'),
+    ('ma', 'Maranhão'), ('mt', 'Mato Grosso'), ('ms', 'Mato Grosso do Sul'), ('mg', 'Minas Gerais'),
+    ('pa', 'Pará'), ('pb', 'Paraíba'), ('pr', 'Paraná'), ('pe', 'Pernambuco'), ('pi', 'Piauí'),
+    ('rj', 'Rio de Janeiro'), ('rn', 'Rio Grande do Norte'), ('rs', 'Rio Grande do Sul'),
+    ('ro', 'Rondônia'), ('rr', 'Roraima'), ('sc', 'Santa Catarina'), ('se', 'Sergipe'),
+    ('sp', 'São Paulo'), ('to', 'Tocantins'),
+)
+
+# UFs com Tribunal de Justiça Militar estadual
+UFS_JUSTICA_MILITAR = ('mg', 'rs', 'sp')
+
+SUPERIORES = 'Tribunais Superiores'
+FEDERAL = 'Justiça Federal'
+ESTADUAL = 'Justiça Estadual'
+TRABALHO = 'Justiça do Trabalho'
+ELEITORAL = 'Justiça Eleitoral'
+MILITAR = 'Justiça Militar'
+CATEGORIAS = (SUPERIORES, FEDERAL, ESTADUAL, TRABALHO, ELEITORAL, MILITAR)
+
+
+class Tribunal(NamedTuple):
+    codigo: str      # sufixo do índice na API (api_publica_<codigo>)
+    nome: str
+    categoria: str
+    segmento: str    # J do número CNJ
+    tr: str          # TR do número CNJ
+
+
+def _montar():
+    tribunais = [
+        Tribunal('tst', 'Tribunal Superior do Trabalho', SUPERIORES, '5', '00'),
+        Tribunal('tse', 'Tribunal Superior Eleitoral', SUPERIORES, '6', '00'),
+        Tribunal('stj', 'Superior Tribunal de Justiça', SUPERIORES, '3', '00'),
+        Tribunal('stm', 'Superior Tribunal Militar', SUPERIORES, '7', '00'),
+    ]
+    tribunais += [Tribunal(f"trf{r}", f"TRF {r}ª Região", FEDERAL, '4', f"{r:02d}") for r in range(1, 7)]
+    for indice, (uf, nome) in enumerate(UFS, start=1):
+        sigla = 'dft' if uf == 'df' else uf
+        tribunais.append(Tribunal(f"tj{sigla}", f"TJ {nome}", ESTADUAL, '8', f"{indice:02d}"))
+    tribunais += [Tribunal(f"trt{r}", f"TRT {r}ª Região", TRABALHO, '5', f"{r:02d}") for r in range(1, 25)]
+    for indice, (uf, nome) in enumerate(UFS, start=1):
+        sigla = 'dft' if uf == 'df' else uf
+        tribunais.append(Tribunal(f"tre-{sigla}", f"TRE {nome}", ELEITORAL, '6', f"{indice:02d}"))
+    for indice, (uf, nome) in enumerate(UFS, start=1):
+        if uf in UFS_JUSTICA_MILITAR:
+            tribunais.append(Tribunal(f"tjm{uf}", f"TJM {nome}", MILITAR, '9', f"{indice:02d}"))
+    return tribunais
+
+
+_LISTA = _montar()
+
+TRIBUNAIS: Mapping[str, Tribunal] = MappingProxyType({t.codigo: t for t in _LISTA})
+CODIGOS: Tuple[str, ...] = tuple(t.codigo for t in _LISTA)
+POR_CATEGORIA: Mapping[str, Tuple[str, ...]] = MappingProxyType({
+    categoria: tuple(t.codigo for t in _LISTA if t.categoria == categoria) for categoria in CATEGORIAS
+})
+
+del _LISTA
+
+
+def obter(codigo: str) -> Optional[Tribunal]:
+    """Tribunal pelo código (sem diferenciar maiúsculas), ou None se não existir."""
+    return TRIBUNAIS.get(codigo.lower())
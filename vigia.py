@@ -0,0 +1,261 @@
+"""Acompanhamento contínuo de uma carteira de processos.
+
+O estado local (SQLite) guarda, por processo, a última `dataHoraUltimaAtualizacao`,
+a data do movimento mais recente já visto e quais movimentos tinham essa mesma
+data, para que um movimento incluído depois com o mesmo horário (comum em
+atos registrados juntos) também seja emitido. A cada ciclo é feita uma única busca por
+tribunal, filtrada por data de atualização, cobrindo todos os processos da
+carteira naquele tribunal; apenas os movimentos novos são emitidos. O estado de
+um processo só avança depois que o seu evento é entregue.
+"""
+import json
+import sqlite3
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import click
+import requests
+
+from cnj import NumeroInvalido, parse_numero_cnj, somente_digitos, tribunal_por_numero
+from modelo import chave_data
+from resiliencia import espera_backoff
+
+# Cláusulas por busca: o Elasticsearch limita a 1024 por consulta booleana
+MAX_NUMEROS_POR_BUSCA = 500
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS carteira (
+    numero TEXT PRIMARY KEY,
+    tribunal TEXT NOT NULL,
+    ultima_atualizacao TEXT,
+    ultimo_movimento TEXT,
+    movimentos_no_limite TEXT
+);
+CREATE INDEX IF NOT EXISTS carteira_tribunal ON carteira (tribunal);
+"""
+
+
+class FalhaEmissao(RuntimeError):
+    """O evento não foi entregue; o processo é reavaliado no próximo ciclo."""
+
+
+class Carteira:
+    """Estado local dos processos acompanhados."""
+
+    def __init__(self, caminho: str):
+        self.conexao = sqlite3.connect(caminho, timeout=30, isolation_level=None)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.executescript(_ESQUEMA)
+        colunas = {linha[1] for linha in self.conexao.execute("PRAGMA table_info(carteira)")}
+        if 'movimentos_no_limite' not in colunas:
+            # Estados criados antes desta coluna
+            self.conexao.execute("ALTER TABLE carteira ADD COLUMN movimentos_no_limite TEXT")
+
+    def adicionar(self, numeros: Iterable[str]) -> List[str]:
+        """Inclui os números na carteira; retorna os que não são números CNJ válidos."""
+        invalidos = []
+        for numero in numeros:
+            try:
+                digitos = parse_numero_cnj(numero).digitos
+                tribunal = tribunal_por_numero(digitos)
+            except NumeroInvalido:
+                invalidos.append(numero)
+                continue
+            self.conexao.execute(
+                "INSERT OR IGNORE INTO carteira (numero, tribunal) VALUES (?, ?)", (digitos, tribunal)
+            )
+        return invalidos
+
+    def por_tribunal(self) -> Dict[str, List[Tuple[str, Optional[str], Optional[str], Optional[List[str]]]]]:
+        """{tribunal: [(numero, ultima_atualizacao, ultimo_movimento, movimentos_no_limite), ...]}"""
+        grupos: Dict[str, List[Tuple[str, Optional[str], Optional[str], Optional[List[str]]]]] = {}
+        for tribunal, numero, ultima, movimento, no_limite in self.conexao.execute(
+            "SELECT tribunal, numero, ultima_atualizacao, ultimo_movimento, movimentos_no_limite "
+            "FROM carteira ORDER BY tribunal"
+        ):
+            no_limite = json.loads(no_limite) if no_limite is not None else None
+            grupos.setdefault(tribunal, []).append((numero, ultima, movimento, no_limite))
+        return grupos
+
+    def atualizar(
+        self, numero: str, ultima_atualizacao: Optional[str], ultimo_movimento: Optional[str],
+        movimentos_no_limite: Optional[List[str]] = None,
+    ):
+        self.conexao.execute(
+            "UPDATE carteira SET ultima_atualizacao = ?, ultimo_movimento = ?, movimentos_no_limite = ? "
+            "WHERE numero = ?",
+            (
+                ultima_atualizacao, ultimo_movimento,
+                json.dumps(movimentos_no_limite, ensure_ascii=False) if movimentos_no_limite is not None else None,
+                numero,
+            ),
+        )
+
+    def fechar(self):
+        self.conexao.close()
+
+
+def _buscas_do_tribunal(processos):
+    """Divide os processos de um tribunal em buscas (números, desde).
+
+    Processos nunca vistos são buscados sem filtro de data; os demais com
+    `dataHoraUltimaAtualizacao` posterior à menor data já registrada.
+    """
+    novos = [numero for numero, ultima, *_ in processos if not ultima]
+    conhecidos = [(numero, ultima) for numero, ultima, *_ in processos if ultima]
+    buscas = []
+    for i in range(0, len(novos), MAX_NUMEROS_POR_BUSCA):
+        buscas.append((novos[i:i + MAX_NUMEROS_POR_BUSCA], None))
+    for i in range(0, len(conhecidos), MAX_NUMEROS_POR_BUSCA):
+        bloco = conhecidos[i:i + MAX_NUMEROS_POR_BUSCA]
+        buscas.append(([numero for numero, _ in bloco], min((ultima for _, ultima in bloco), key=chave_data)))
+    return buscas
+
+
+def _assinatura(movimento: Dict[str, Any]) -> str:
+    """Identifica um movimento entre os que têm a mesma data."""
+    return f"{movimento.get('codigo')}|{movimento.get('nome')}"
+
+
+def movimentos_novos(
+    movimentos: List[Dict[str, Any]], movimento_visto: Optional[str], no_limite: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Movimentos (ordenados por data) posteriores ao último visto, incluindo os que
+    têm a mesma data dele mas não estavam entre os `no_limite` já vistos.
+
+    Sem `no_limite` (estado anterior a este registro), todos os movimentos com a
+    data do último visto contam como vistos.
+    """
+    if not movimento_visto:
+        return list(movimentos)
+    limite = chave_data(movimento_visto)
+    vistos = Counter(no_limite or [])
+    novos = []
+    for movimento in movimentos:
+        chave = chave_data(movimento.get('dataHora'))
+        if chave > limite:
+            novos.append(movimento)
+        elif chave == limite and no_limite is not None:
+            assinatura = _assinatura(movimento)
+            if vistos[assinatura]:
+                vistos[assinatura] -= 1
+            else:
+                novos.append(movimento)
+    return novos
+
+
+def executar_ciclo(client, carteira: Carteira, emitir: Callable[[Dict[str, Any]], None], concorrencia: int = 8) -> int:
+    """Executa um ciclo de verificação e emite um evento por processo com movimentos novos.
+
+    Na primeira vez que um processo é encontrado, o estado é apenas registrado.
+    Se `emitir` levantar FalhaEmissao, o estado do processo não é atualizado e o
+    evento volta a ser gerado no ciclo seguinte. Retorna o número de eventos emitidos.
+    """
+    grupos = carteira.por_tribunal()
+    estado = {processo[0]: processo[1:] for processos in grupos.values() for processo in processos}
+    tarefas = [
+        (tribunal, numeros, desde)
+        for tribunal, processos in grupos.items()
+        for numeros, desde in _buscas_do_tribunal(processos)
+    ]
+
+    eventos = 0
+    with ThreadPoolExecutor(max_workers=max(1, concorrencia)) as executor:
+        respostas = executor.map(lambda t: (t[0], client.buscar_atualizados(*t)), tarefas)
+        for tribunal, documentos in respostas:
+            if documentos is None:
+                continue  # Erro no tribunal: tenta de novo no próximo ciclo
+
+            por_numero: Dict[str, List[Dict[str, Any]]] = {}
+            for documento in documentos:
+                numero = somente_digitos(documento.get('numeroProcesso', ''))
+                if numero in estado:
+                    por_numero.setdefault(numero, []).append(documento)
+
+            for numero, documentos_do_numero in por_numero.items():
+                ultima_vista, movimento_visto, no_limite = estado[numero]
+                ultima = max(
+                    (d.get('dataHoraUltimaAtualizacao') or '' for d in documentos_do_numero), key=chave_data
+                ) or None
+                if ultima_vista and ultima and chave_data(ultima) <= chave_data(ultima_vista):
+                    continue
+                movimentos = sorted(
+                    (m for d in documentos_do_numero for m in d.get('movimentos') or []),
+                    key=lambda m: chave_data(m.get('dataHora')),
+                )
+                novos = movimentos_novos(movimentos, movimento_visto, no_limite)
+                if movimentos:
+                    ultimo_movimento = movimentos[-1].get('dataHora')
+                    limite = chave_data(ultimo_movimento)
+                    no_limite = [_assinatura(m) for m in movimentos if chave_data(m.get('dataHora')) == limite]
+                else:
+                    ultimo_movimento = movimento_visto
+                if ultima_vista and novos:
+                    try:
+                        emitir({
+                            "numero": numero,
+                            "tribunal": tribunal,
+                            "dataHoraUltimaAtualizacao": ultima,
+                            "novos_movimentos": novos,
+                        })
+                    except FalhaEmissao as e:
+                        click.echo(str(e), err=True)
+                        continue
+                    eventos += 1
+                carteira.atualizar(numero, ultima, ultimo_movimento, no_limite)
+                estado[numero] = (ultima, ultimo_movimento, no_limite)
+    return eventos
+
+
+def vigiar(
+    client,
+    carteira: Carteira,
+    emitir: Callable[[Dict[str, Any]], None],
+    intervalo: float = 300,
+    ciclos: Optional[int] = None,
+    concorrencia: int = 8,
+    ao_concluir_ciclo: Optional[Callable[[int, int], None]] = None,
+):
+    """Repete `executar_ciclo` a cada `intervalo` segundos (indefinidamente se `ciclos` for None)."""
+    ciclo = 0
+    while ciclos is None or ciclo < ciclos:
+        inicio = time.monotonic()
+        eventos = executar_ciclo(client, carteira, emitir, concorrencia)
+        ciclo += 1
+        if ao_concluir_ciclo:
+            ao_concluir_ciclo(ciclo, eventos)
+        if ciclos is not None and ciclo >= ciclos:
+            break
+        time.sleep(max(0.0, intervalo - (time.monotonic() - inicio)))
+
+
+def emissor_ndjson(saida) -> Callable[[Dict[str, Any]], None]:
+    """Emite cada evento como uma linha NDJSON em `saida`."""
+    def emitir(evento):
+        saida.write(json.dumps(evento, ensure_ascii=False) + '\n')
+        saida.flush()
+    return emitir
+
+
+def emissor_callback(
+    url: str, timeout: float = 10, tentativas: int = 3, backoff_base: float = 0.5
+) -> Callable[[Dict[str, Any]], None]:
+    """Envia cada evento por POST (JSON) para `url`, no estilo de um webhook.
+
+    Falhas de rede e respostas de erro são repetidas com backoff; esgotadas as
+    `tentativas`, levanta FalhaEmissao.
+    """
+    session = requests.Session()
+
+    def emitir(evento):
+        for tentativa in range(max(1, tentativas)):
+            try:
+                session.post(url, json=evento, timeout=timeout).raise_for_status()
+                return
+            except requests.exceptions.RequestException as e:
+                if tentativa + 1 >= tentativas:
+                    raise FalhaEmissao(f"Erro ao enviar evento de {evento['numero']} para {url}: {e}") from e
+            time.sleep(espera_backoff(tentativa, backoff_base))
+    return emitir